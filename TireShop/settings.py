@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sitemaps',
+    'django.contrib.postgres',
     'store.apps.StoreConfig',
     'users.apps.UsersConfig',
 ]
@@ -108,6 +109,18 @@ WHITENOISE_MANIFEST_STRICT = False
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Файли фонових імпортів з адмінки — спільний диск веб-воркерів і run_import_jobs
+IMPORT_DIR = os.environ.get('IMPORT_DIR', os.path.join(MEDIA_ROOT, 'imports'))
+
+# Спільний кеш для всіх воркерів gunicorn і management-команд (sync_omega тощо)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', '/tmp/r16_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CART_SESSION_ID = 'cart_final_fix'
 
@@ -9,13 +9,14 @@ from django.http import HttpResponse
 from store.views import fix_product_names_view, robots_txt, google_shopping_feed, redirect_old_store_product_urls
 
 # Імпортуємо Sitemap класи
-from store.sitemaps import ProductSitemap, StaticViewSitemap, BrandSitemap
+from store.sitemaps import ProductSitemap, StaticViewSitemap, BrandSitemap, SizeLandingSitemap
 
 # Налаштування карти сайту
 sitemaps = {
     'products': ProductSitemap,
     'static': StaticViewSitemap,
     'brands': BrandSitemap,
+    'sizes': SizeLandingSitemap,
 }
 
 urlpatterns = [
@@ -20,4 +20,7 @@ echo "Running migrations for OUR apps..."
 python manage.py migrate store
 python manage.py migrate users
 
+python manage.py backfill_attributes
+python manage.py refresh_order_totals
+
 echo "Build script finished."
@@ -1,92 +1,21 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, reverse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
 from django import forms
-from django.http import HttpResponse, FileResponse
-from django.utils.html import format_html
-from django.template.loader import render_to_string
-from django.db.models import Q 
-from django.conf import settings
-import openpyxl
-import re
-import gc
+from django.http import HttpResponse, FileResponse, JsonResponse
+from django.utils.html import format_html, format_html_join
+from django.db.models import Prefetch
 import io
-import os
-import tempfile
-import urllib.request
 import traceback
-from xhtml2pdf import pisa
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-from .models import Product, Brand, Order, OrderItem, ProductImage, SiteSettings, AboutImage, Review
-
-# ==========================================
-# 🔥 ЛОГІКА ГЕНЕРАЦІЇ PDF-ЧЕКА (КАТАЛОГ + ШРИФТИ) 🔥
-# ==========================================
-
-def get_cyrillic_font_path():
-    sys_fonts = [
-        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-        '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
-        '/usr/share/fonts/truetype/freefont/FreeSans.ttf'
-    ]
-    for f in sys_fonts:
-        if os.path.exists(f):
-            return f
-            
-    font_path = os.path.join(tempfile.gettempdir(), 'Roboto-Regular.ttf')
-    if not os.path.exists(font_path):
-        try:
-            url = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Regular.ttf"
-            urllib.request.urlretrieve(url, font_path)
-        except Exception as e:
-            print("Помилка завантаження шрифту:", e)
-            
-    return font_path if os.path.exists(font_path) else None
-
-def link_callback(uri, rel):
-    if uri.startswith('file://'):
-        return uri.replace('file://', '')
-    return uri
-
-def generate_order_pdf(order):
-    font_path = get_cyrillic_font_path()
-    font_uri = ""
-    
-    if font_path:
-        try:
-            pdfmetrics.registerFont(TTFont('CyrillicFont', font_path))
-        except:
-            pass
-        clean_path = font_path.replace('\\', '/')
-        if not clean_path.startswith('/'):
-            clean_path = '/' + clean_path
-        font_uri = 'file://' + clean_path
-
-    total_cost = sum(item.get_cost() for item in order.items.all())
-    
-    context = {
-        'order': order, 
-        'total_cost': total_cost,
-        'font_uri': font_uri 
-    }
-    
-    html_string = render_to_string('store/pdf/invoice.html', context)
-    result = io.BytesIO()
-    
-    pisa_status = pisa.CreatePDF(
-        io.BytesIO(html_string.encode("UTF-8")), 
-        dest=result, 
-        encoding='UTF-8',
-        link_callback=link_callback 
-    )
-    
-    if pisa_status.err:
-        return None
-    result.seek(0)
-    return result
+
+from .models import Product, Brand, Order, OrderItem, ProductImage, SiteSettings, AboutImage, Review, ProductChange, PriceRule, ImportJob
+from .pricing import reprice, format_summary
+from .catalog_stats import refresh_catalog_stats
+from .import_jobs import enqueue
+from .invoice import invoice_pdf
+from .exports import streaming_export, unique_model_rows, catalog_rows, UNIQUE_MODELS_HEADER, CATALOG_HEADER
 
 # --- ЗАМОВЛЕННЯ ---
 class OrderItemInline(admin.TabularInline):
@@ -97,18 +26,25 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['get_cost_display']
     
     def get_cost_display(self, obj):
+        if obj.price_at_purchase is None: return "-"
         return f"{obj.get_cost():.2f} грн"
     get_cost_display.short_description = "Сума"
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ['id', 'status', 'created_at', 'full_name', 'phone', 'shipping_type', 'order_items_summary', 'total_cost', 'print_invoice_button']
+    list_display = ['id', 'status', 'created_at', 'full_name', 'phone', 'shipping_type', 'order_items_summary', 'items_count', 'total_cost', 'print_invoice_button']
     list_filter = ['status', 'created_at', 'shipping_type']
     search_fields = ['id', 'full_name', 'phone', 'email']
     inlines = [OrderItemInline]
     list_editable = ['status']
     readonly_fields = ['created_at', 'total_cost_detailed']
 
+    def get_queryset(self, request):
+        # Позиції сторінки з товарами і брендами — одним запитом на всю сторінку
+        items = OrderItem.objects.select_related('product__brand').only(
+            'order', 'quantity', 'product__display_name', 'product__brand__name')
+        return super().get_queryset(request).prefetch_related(Prefetch('items', queryset=items))
+
     def get_changelist_form(self, request, **kwargs):
         form = super().get_changelist_form(request, **kwargs)
         if 'status' in form.base_fields:
@@ -123,13 +59,12 @@ class OrderAdmin(admin.ModelAdmin):
     )
 
     def total_cost(self, obj):
-        sum_val = sum(item.get_cost() for item in obj.items.all())
-        return format_html("<b>{} грн</b>", f"{sum_val:.2f}")
+        return format_html("<b>{} грн</b>", f"{obj.total_amount:.2f}")
     total_cost.short_description = 'Сума'
+    total_cost.admin_order_field = 'total_amount'
 
     def total_cost_detailed(self, obj):
-        sum_val = sum(item.get_cost() for item in obj.items.all())
-        return f"{sum_val:.2f} грн"
+        return f"{obj.total_amount:.2f} грн"
     total_cost_detailed.short_description = 'Разом до сплати'
 
     def order_items_summary(self, obj):
@@ -155,17 +90,18 @@ class OrderAdmin(admin.ModelAdmin):
 
     def get_urls(self):
         urls = super().get_urls()
-        my_urls = [path('<int:order_id>/print/', self.admin_print_invoice, name="order_print_invoice")]
+        my_urls = [path('<int:order_id>/print/', self.admin_site.admin_view(self.admin_print_invoice),
+                        name="order_print_invoice")]
         return my_urls + urls
 
     def admin_print_invoice(self, request, order_id):
         try:
             order = get_object_or_404(Order, id=order_id)
-            pdf_file = generate_order_pdf(order)
-            
-            if pdf_file:
+            pdf = invoice_pdf(order)
+
+            if pdf:
                 filename = f"check_R16_{order.id}.pdf"
-                return FileResponse(pdf_file, as_attachment=False, content_type='application/pdf', filename=filename)
+                return FileResponse(io.BytesIO(pdf), as_attachment=False, content_type='application/pdf', filename=filename)
             else:
                 return HttpResponse("Помилка: Бібліотека PDF повернула пустий файл.")
         except Exception as e:
@@ -183,16 +119,55 @@ class ProductImageInline(admin.TabularInline):
         if obj.image: return format_html('<img src="{}" style="height: 50px; border-radius: 4px;"/>', obj.image.url)
         return "-"
 
+def preview_reprice_message(request):
+    # Після зміни націнки показуємо, що зміниться; застосування — окремою дією
+    summary = reprice(dry_run=True, sample=5)
+    if not summary['changed']:
+        messages.info(request, "💲 Ціни каталогу вже відповідають правилам націнки.")
+        return
+    lines = format_summary(summary)
+    messages.warning(request, format_html(
+        "🔍 {}<br>{}<br>Ціни ще не змінені — застосуйте дією «💲 Перерахувати ціни каталогу» у Правилах націнки "
+        "або <code>manage.py reprice</code>.",
+        lines[0], format_html_join('<br>', '{}', ((line,) for line in lines[1:]))))
+
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
-    list_display = ['global_markup']
+    list_display = ['global_markup', 'price_rounding']
     def has_add_permission(self, request): return not SiteSettings.objects.exists()
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        preview_reprice_message(request)
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'brand', 'brand_category', 'seasonality', 'diameter_min', 'diameter_max',
+                    'markup', 'rounding', 'priority', 'is_active']
+    list_editable = ['markup', 'rounding', 'priority', 'is_active']
+    list_filter = ['is_active', 'brand_category', 'seasonality']
+    list_select_related = ['brand']
+    autocomplete_fields = ['brand']
+    actions = ['preview_reprice', 'apply_reprice']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        preview_reprice_message(request)
+
+    @admin.action(description="🔍 Перевірити перерахунок (весь каталог, без змін)")
+    def preview_reprice(self, request, queryset):
+        preview_reprice_message(request)
+
+    @admin.action(description="💲 Перерахувати ціни каталогу")
+    def apply_reprice(self, request, queryset):
+        summary = reprice()
+        messages.success(request, format_html_join('<br>', '{}', ((line,) for line in format_summary(summary))))
+
 # --- ФОРМИ ІМПОРТУ ---
 class ExcelImportForm(forms.Form):
     excel_file = forms.FileField(label="Прайс-лист (Товари)")
     start_row = forms.IntegerField(initial=2, min_value=2, label="Почати з рядка")
-    end_row = forms.IntegerField(initial=2000, min_value=2, label="Закінчити рядком")
+    end_row = forms.IntegerField(required=False, min_value=2, label="Закінчити рядком (порожньо — до кінця)")
 
 class PhotoImportForm(forms.Form):
     excel_file = forms.FileField(label="Файл з ФОТО (Brand, Model, URL)")
@@ -200,13 +175,13 @@ class PhotoImportForm(forms.Form):
 class SeoImportForm(forms.Form):
     excel_file = forms.FileField(label="SEO Файл (.xlsx)")
     start_row = forms.IntegerField(initial=2, min_value=2, label="Почати з рядка")
-    end_row = forms.IntegerField(initial=500, min_value=2, label="Закінчити рядком")
+    end_row = forms.IntegerField(required=False, min_value=2, label="Закінчити рядком (порожньо — до кінця)")
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ['name', 'brand', 'width', 'profile', 'diameter', 'price_display', 'discount_percent', 'stock_quantity', 'photo_preview']
-    list_filter = ['brand', 'seasonality', 'diameter', 'stud_type']
+    list_filter = ['brand', 'seasonality', 'diameter', 'stud_type', 'is_xl', 'is_runflat']
     search_fields = ['name', 'width', 'brand__name', 'slug']
     change_list_template = "store/admin_changelist.html"
     readonly_fields = ["photo_preview", "final_price_preview"]
@@ -219,6 +194,13 @@ class ProductAdmin(admin.ModelAdmin):
         ('Фото', {'fields': ('photo', 'photo_url', 'photo_preview')}),
         ('Хар-ки', {'fields': ('country', 'year', 'load_index', 'speed_index', 'stud_type', 'vehicle_type')}),
     )
+    def save_model(self, request, obj, form, change):
+        old_size = None
+        if change:
+            old_size = Product.objects.filter(pk=obj.pk).values_list('width', 'profile', 'diameter').first()
+        super().save_model(request, obj, form, change)
+        refresh_catalog_stats({(obj.width, obj.profile, obj.diameter), old_size or (0, 0, 0)})
+
     def price_display(self, obj): return f"{obj.price} грн"
     price_display.short_description = "Ціна"
     def final_price_preview(self, obj): return f"{obj.price} грн"
@@ -229,283 +211,116 @@ class ProductAdmin(admin.ModelAdmin):
     def get_urls(self):
         urls = super().get_urls()
         my_urls = [
-            path('import-excel/', self.import_excel, name="import_excel"),
-            path('import-photos/', self.import_photos, name="import_photos"),
-            path('import-seo/', self.import_seo, name="import_seo"),
-            path('export-models/', self.export_unique_models, name="export_unique_models"),
+            path('import-excel/', self.admin_site.admin_view(self.import_excel), name="import_excel"),
+            path('import-photos/', self.admin_site.admin_view(self.import_photos), name="import_photos"),
+            path('import-seo/', self.admin_site.admin_view(self.import_seo), name="import_seo"),
+            path('export-models/', self.admin_site.admin_view(self.export_unique_models), name="export_unique_models"),
+            path('export-catalog/', self.admin_site.admin_view(self.export_catalog), name="export_catalog"),
         ]
         return my_urls + urls
 
     def export_unique_models(self, request):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Models"
-        ws.append(['Brand', 'Clean Model Name', 'Photo URL'])
-        
-        products = Product.objects.all().select_related('brand')
-        seen = set()
-        
-        for p in products:
-            brand_name = p.brand.name if p.brand else "Unknown"
-            raw_name = p.name
-            
-            clean = re.sub(r'шина', '', raw_name, flags=re.IGNORECASE)
-            clean = re.sub(r'\b\d{3}/\d{2}R?\d{0,2}\b', '', clean) 
-            clean = re.sub(r'\bR\d{2}C?\b', '', clean)
-            clean = re.sub(r'\b\d{2,3}[A-Z]\b', '', clean)
-            if p.brand:
-                clean = re.sub(rf'\({re.escape(p.brand.name)}\)', '', clean, flags=re.IGNORECASE)
-                clean = re.sub(rf'\b{re.escape(p.brand.name)}\b', '', clean, flags=re.IGNORECASE)
-            
-            clean = clean.replace('()', '').strip()
-            clean = re.sub(r'\s+', ' ', clean)
-            
-            if len(clean) < 2: clean = p.name
-
-            key = (brand_name.upper(), clean.upper())
-            if key not in seen:
-                ws.append([brand_name, clean, ''])
-                seen.add(key)
-            
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename=clean_models_for_photos.xlsx'
-        wb.save(response)
-        return response
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        return streaming_export('clean_models_for_photos', UNIQUE_MODELS_HEADER, unique_model_rows(),
+                                request.GET.get('format'))
+
+    def export_catalog(self, request):
+        # У вивантаженні собівартість — лише для тих, хто може редагувати товари
+        self.require_change_permission(request)
+        return streaming_export('catalog', CATALOG_HEADER, catalog_rows(), request.GET.get('format'))
+
+    def require_change_permission(self, request):
+        # Імпорти переписують товари — лише для тих, хто може їх редагувати
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+    def enqueue_import(self, request, kind, form):
+        # Файл — на диск і в чергу; обробляє manage.py run_import_jobs, а не цей запит
+        job = enqueue(kind, form.cleaned_data["excel_file"], request.user,
+                      form.cleaned_data.get("start_row"), form.cleaned_data.get("end_row"))
+        messages.success(request, f"⏳ Файл «{job.original_name}» поставлено в чергу імпорту (#{job.pk}).")
+        return redirect("admin:store_importjob_progress", job.pk)
 
     def import_photos(self, request):
+        self.require_change_permission(request)
         if request.method == "POST":
-            excel_file = request.FILES["excel_file"]
-            try:
-                wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
-                sheet = wb.active
-                updated_products = 0
-                
-                IGNORE_WORDS = [
-                    'serbia', 'china', 'korea', 'thailand', 'japan', 'turkey', 'germany', 'poland', 
-                    'dot', 'xl', 'new', 'demo', 'usa', 'hungary', 'romania', 'france', 'spain'
-                ]
-
-                for row in sheet.iter_rows(min_row=2, values_only=True):
-                    if not row or len(row) < 3: continue
-                    if not row[0] or not row[1] or not row[2]: continue
-                    
-                    brand_txt = str(row[0]).strip()
-                    model_txt = str(row[1]).strip()
-                    url_txt = str(row[2]).strip()
-                    
-                    if not url_txt.startswith('http'): continue
-
-                    query = Q(brand__name__icontains=brand_txt)
-                    
-                    clean_model_txt = re.sub(r'[(),]', ' ', model_txt)
-                    model_tokens = clean_model_txt.split()
-                    
-                    valid_tokens = []
-                    for token in model_tokens:
-                        t_lower = token.lower()
-                        if len(token) > 1 and t_lower not in IGNORE_WORDS:
-                            valid_tokens.append(token)
-                    
-                    if not valid_tokens: continue
-
-                    for token in valid_tokens:
-                        query &= Q(name__icontains=token)
-
-                    count = Product.objects.filter(query).update(photo_url=url_txt)
-                    updated_products += count
-                
-                messages.success(request, f"✅ Успіх! Фото оновлено для {updated_products} товарів!")
-            except Exception as e:
-                messages.error(request, f"Помилка: {e}")
-            return redirect("..")
-            
-        form = PhotoImportForm()
+            form = PhotoImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                return self.enqueue_import(request, 'photos', form)
+        else:
+            form = PhotoImportForm()
         return render(request, "store/admin_import_photos.html", {"form": form})
 
     def import_excel(self, request):
+        self.require_change_permission(request)
         if request.method == "POST":
             form = ExcelImportForm(request.POST, request.FILES)
             if form.is_valid():
-                excel_file = form.cleaned_data["excel_file"]
-                start_row_limit = form.cleaned_data["start_row"]
-                end_row_limit = form.cleaned_data["end_row"]
-                
-                try:
-                    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
-                    sheet = wb.active
-                    created_count = 0; updated_count = 0
-                    existing_brands = {b.name.upper(): b for b in Brand.objects.all()}
-                    rows_iter = sheet.iter_rows(values_only=True)
-                    try: header_row = next(rows_iter)
-                    except: return redirect("..")
-
-                    def find_col(aliases):
-                        for idx, cell in enumerate(header_row):
-                            val = str(cell or "").strip().lower()
-                            for alias in aliases:
-                                if val.startswith(alias): return idx
-                        return None
-
-                    c_brand = find_col(["бренд", "brand"]) or 0
-                    c_model = find_col(["модель", "model"]) or 1
-                    c_size = find_col(["типоразмер", "size"]) or 2
-                    c_season = find_col(["сезон", "season"]) or 3
-                    c_price = find_col(["цена", "price"]) or 4
-                    c_qty = find_col(["кол", "qty"]) or 5
-                    c_country = find_col(["країна", "country"]) or 6
-                    c_year = find_col(["рік", "year"]) or 7
-                    c_photo = find_col(["фото", "photo"])
-                    
-                    for i, row in enumerate(rows_iter):
-                        current_excel_row = i + 2
-                        if current_excel_row < start_row_limit: continue
-                        if current_excel_row > end_row_limit: break
-                        if i % 100 == 0: gc.collect()
-                        
-                        if not row or len(row) < 2: continue
-                        if not row[c_brand] and not row[c_model]: continue
-
-                        brand_name = str(row[c_brand]).strip()
-                        if not brand_name or brand_name == "None": brand_name = "Unknown"
-                        brand_key = brand_name.upper()
-                        if brand_key in existing_brands: brand_obj = existing_brands[brand_key]
-                        else:
-                            brand_obj = Brand.objects.create(name=brand_name)
-                            existing_brands[brand_key] = brand_obj
-
-                        model_name = str(row[c_model]).strip()
-                        size_raw = str(row[c_size]).strip()
-                        match = re.search(r'(\d+)/(\d+)\s*[a-zA-Z]*\s*(\d+)', size_raw)
-                        if match: w, p, d = int(match.group(1)), int(match.group(2)), int(match.group(3))
-                        else: w, p, d = 0, 0, 0
-
-                        unique_name = model_name
-                        if (w == 0 or p == 0 or d == 0) and size_raw: unique_name = f"{model_name} [{size_raw}]"
-
-                        season_raw = str(row[c_season]).lower() if row[c_season] else ""
-                        season_key = 'all-season'
-                        if 'зим' in season_raw or 'winter' in season_raw: season_key = 'winter'
-                        elif 'літ' in season_raw or 'summer' in season_raw: season_key = 'summer'
-
-                        try:
-                            raw_price = row[c_price]
-                            if isinstance(raw_price, (int, float)): cost = float(raw_price)
-                            else:
-                                clean_price = re.sub(r'[^\d,.]', '', str(raw_price)).replace(',', '.')
-                                if clean_price.count('.') > 1:
-                                    parts = clean_price.split('.')
-                                    clean_price = "".join(parts[:-1]) + "." + parts[-1]
-                                cost = float(clean_price)
-                        except: cost = 0.0
-
-                        try:
-                            qty_val = str(row[c_qty]).strip()
-                            if '>' in qty_val: qty = 20
-                            else: qty = int(re.sub(r'[^0-9]', '', qty_val) or 0)
-                        except: qty = 0
-
-                        country = str(row[c_country]).strip() if c_country and row[c_country] else "-"
-                        try: year = int(row[c_year]) if c_year and row[c_year] else 2024
-                        except: year = 2024
-                        
-                        photo_link = str(row[c_photo]).strip() if c_photo and row[c_photo] else None
-
-                        obj, created = Product.objects.update_or_create(
-                            name=unique_name, brand=brand_obj, width=w, profile=p, diameter=d,
-                            defaults={
-                                'seasonality': season_key, 'cost_price': cost, 'stock_quantity': qty,
-                                'country': country, 'year': year,
-                                'description': f"Шини {brand_name} {model_name}. {size_raw}. {season_raw}."
-                            }
-                        )
-                        if photo_link and not obj.photo_url:
-                            obj.photo_url = photo_link
-                            obj.save(update_fields=['photo_url'])
-
-                        if created: created_count += 1
-                        else: updated_count += 1
-
-                    messages.success(request, f"Частина оброблена! ({start_row_limit}-{end_row_limit}). ✅: {created_count}, 🔄: {updated_count}")
-                except Exception as e: messages.error(request, f"Помилка: {e}")
-                return redirect("..")
+                return self.enqueue_import(request, 'excel', form)
         else: form = ExcelImportForm()
         return render(request, "store/admin_import.html", {"form": form})
 
     def import_seo(self, request):
+        self.require_change_permission(request)
         if request.method == "POST":
             form = SeoImportForm(request.POST, request.FILES)
             if form.is_valid():
-                excel_file = form.cleaned_data["excel_file"]
-                start_row_limit = form.cleaned_data["start_row"]
-                end_row_limit = form.cleaned_data["end_row"]
-
-                try:
-                    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
-                    sheet = wb.active
-                    updated_count = 0
-                    not_found_count = 0
-                    
-                    rows_iter = sheet.iter_rows(values_only=True)
-                    
-                    try:
-                        header_row = next(rows_iter)
-                        header = [str(h).lower().strip() for h in header_row]
-                    except:
-                        messages.error(request, "Файл пустий")
-                        return redirect("..")
-
-                    try:
-                        idx_brand = header.index('brand')
-                        idx_model = header.index('model')
-                        idx_title = header.index('title')
-                        idx_h1 = header.index('h1')
-                        idx_text = header.index('seo text')
-                    except ValueError as e:
-                        messages.error(request, f"Не знайдено колонку: {e}")
-                        return redirect("..")
-
-                    for i, row in enumerate(rows_iter):
-                        current_excel_row = i + 2
-                        if current_excel_row < start_row_limit: continue
-                        if current_excel_row > end_row_limit: break
-                        if i % 100 == 0: gc.collect()
-
-                        if not row or len(row) < 2: continue
-                        
-                        brand_val = str(row[idx_brand]).strip()
-                        model_val = str(row[idx_model]).strip()
-                        
-                        if not brand_val or not model_val: continue
-
-                        seo_title = str(row[idx_title]).strip() if row[idx_title] else ""
-                        seo_h1 = str(row[idx_h1]).strip() if row[idx_h1] else ""
-                        seo_text = str(row[idx_text]).strip() if row[idx_text] else ""
-
-                        query = Q(brand__name__icontains=brand_val)
-                        for token in model_val.split():
-                             if len(token) > 1: query &= Q(name__icontains=token)
-
-                        product = Product.objects.filter(query).first()
-                        
-                        if product:
-                            product.seo_title = seo_title
-                            product.seo_h1 = seo_h1
-                            product.seo_text = seo_text
-                            product.save()
-                            updated_count += 1
-                        else:
-                            not_found_count += 1
-
-                    messages.success(request, f"✅ Оновлено SEO: {updated_count}. ❌ Не знайдено: {not_found_count}.")
-
-                except Exception as e:
-                    messages.error(request, f"Помилка: {e}")
-                return redirect("..")
+                return self.enqueue_import(request, 'seo', form)
         else:
             form = SeoImportForm()
-        
         return render(request, "store/admin_import.html", {"form": form, "title": "Імпорт SEO"})
 
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'status', 'progress_display', 'created_count', 'updated_count', 'unchanged_count',
+                    'skipped_count', 'error_count', 'created_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = [f.name for f in ImportJob._meta.fields]
+
+    def has_add_permission(self, request): return False
+    def has_change_permission(self, request, obj=None): return False
+
+    def progress_display(self, obj):
+        url = reverse("admin:store_importjob_progress", args=[obj.pk])
+        return format_html('<a href="{}">{}% · {} рядків/с</a>', url, obj.percent, f"{obj.rows_per_second:.0f}")
+    progress_display.short_description = "Прогрес"
+
+    def get_urls(self):
+        urls = super().get_urls()
+        my_urls = [
+            path('<int:job_id>/progress/', self.admin_site.admin_view(self.progress_view), name="store_importjob_progress"),
+            path('<int:job_id>/status/', self.admin_site.admin_view(self.status_view), name="store_importjob_status"),
+        ]
+        return my_urls + urls
+
+    def job_status(self, job):
+        return {
+            'id': job.pk, 'status': job.status, 'status_display': job.get_status_display(),
+            'active': job.is_active, 'percent': job.percent,
+            'position': job.position, 'total_rows': job.total_rows, 'processed': job.processed,
+            'created': job.created_count, 'updated': job.updated_count, 'unchanged': job.unchanged_count,
+            'skipped': job.skipped_count, 'errors_count': job.error_count,
+            'rows_per_second': round(job.rows_per_second, 1),
+            'message': job.message, 'errors': job.errors.splitlines()[-20:],
+        }
+
+    def require_view_permission(self, request):
+        # admin_view перевіряє лише is_staff; журнал імпорту — для тих, хто бачить задачі
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+    def progress_view(self, request, job_id):
+        self.require_view_permission(request)
+        job = get_object_or_404(ImportJob, pk=job_id)
+        context = {**self.admin_site.each_context(request), "job": job, "status": self.job_status(job),
+                   "title": f"Імпорт #{job.pk}", "opts": self.model._meta}
+        return render(request, "store/admin_import_job.html", context)
+
+    def status_view(self, request, job_id):
+        self.require_view_permission(request)
+        return JsonResponse(self.job_status(get_object_or_404(ImportJob, pk=job_id)))
+
 @admin.register(Brand)
 class BrandAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'country'] 
@@ -513,6 +328,16 @@ class BrandAdmin(admin.ModelAdmin):
     list_filter = ['category']
     search_fields = ['name']
 
+@admin.register(ProductChange)
+class ProductChangeAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'kind', 'product', 'old_value', 'new_value']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['product__name']
+    list_select_related = ['product']
+    readonly_fields = ['product', 'kind', 'old_value', 'new_value', 'created_at']
+
+    def has_add_permission(self, request): return False
+
 @admin.register(AboutImage)
 class AboutImageAdmin(admin.ModelAdmin):
     list_display = ['id', 'created_at', 'image_preview']
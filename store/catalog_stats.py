@@ -0,0 +1,124 @@
+from functools import reduce
+import operator
+
+from django.db import transaction
+from django.db.models import Min, Max, Count, Sum, Q
+from django.utils import timezone
+
+from .models import Product, CatalogStats
+
+# --- 📊 МАТЕРІАЛІЗОВАНА СТАТИСТИКА ЦІН ---
+# Рядки таблиці CatalogStats:
+#   (бренд, сезон, розмір) — базові, рахуються з store_product;
+#   (0 / бренд, '' / сезон, розмір) — зведення по розміру, з тих самих груп;
+#   (бренд або 0, сезон або '', 0-0-0) — зведення без розміру, з самої таблиці.
+# Інкрементальне оновлення перераховує тільки зачеплені розміри.
+
+STAT_FIELDS = ('min_price', 'max_price', 'in_stock_count', 'total_count')
+
+# Якщо зачеплено більше розмірів — простіше перерахувати все одним GROUP BY
+MAX_INCREMENTAL_SIZES = 300
+
+
+def _merge(target, row):
+    if row['min_price'] is not None:
+        target['min_price'] = row['min_price'] if target['min_price'] is None else min(target['min_price'], row['min_price'])
+    if row['max_price'] is not None:
+        target['max_price'] = row['max_price'] if target['max_price'] is None else max(target['max_price'], row['max_price'])
+    target['in_stock_count'] += row['in_stock_count']
+    target['total_count'] += row['total_count']
+
+
+def _empty():
+    return {'min_price': None, 'max_price': None, 'in_stock_count': 0, 'total_count': 0}
+
+
+def _size_level_stats(sizes):
+    products = Product.objects.filter(width__gt=0, diameter__gt=0)
+    if sizes is not None:
+        products = products.filter(reduce(operator.or_, (Q(width=w, profile=p, diameter=d) for w, p, d in sizes)))
+
+    groups = products.order_by().values('brand_id', 'seasonality', 'width', 'profile', 'diameter').annotate(
+        min_price=Min('price', filter=Q(price__gt=0)),
+        max_price=Max('price', filter=Q(price__gt=0)),
+        in_stock_count=Count('id', filter=Q(stock_quantity__gt=0)),
+        total_count=Count('id'),
+    )
+
+    stats = {}
+    for row in groups:
+        size = (row['width'], row['profile'], row['diameter'])
+        brand_keys = (row['brand_id'], 0) if row['brand_id'] else (0,)
+        for brand_key in brand_keys:
+            for season in (row['seasonality'], ''):
+                _merge(stats.setdefault((brand_key, season) + size, _empty()), row)
+    return stats
+
+
+def _apply(existing_qs, new_stats):
+    existing = {
+        (s.brand_key, s.seasonality, s.width, s.profile, s.diameter): s
+        for s in existing_qs
+    }
+    to_create, to_update = [], []
+    now = timezone.now()
+    for key, values in new_stats.items():
+        obj = existing.pop(key, None)
+        if obj is None:
+            to_create.append(CatalogStats(
+                brand_key=key[0], seasonality=key[1], width=key[2], profile=key[3], diameter=key[4], **values
+            ))
+        elif any(getattr(obj, f) != values[f] for f in STAT_FIELDS):
+            for f, v in values.items():
+                setattr(obj, f, v)
+            obj.updated_at = now
+            to_update.append(obj)
+
+    if existing:
+        CatalogStats.objects.filter(id__in=[s.id for s in existing.values()]).delete()
+    CatalogStats.objects.bulk_create(to_create, batch_size=1000)
+    CatalogStats.objects.bulk_update(to_update, STAT_FIELDS + ('updated_at',), batch_size=1000)
+    return len(to_create), len(to_update), len(existing)
+
+
+def refresh_catalog_stats(sizes=None):
+    """Перераховує статистику для вказаних розмірів [(w, p, d), ...] або всю."""
+    if sizes is not None:
+        sizes = {tuple(s) for s in sizes if s[0] and s[2]}
+        if not sizes:
+            return (0, 0, 0)
+        if len(sizes) > MAX_INCREMENTAL_SIZES:
+            sizes = None
+
+    with transaction.atomic():
+        existing = CatalogStats.objects.filter(width__gt=0)
+        if sizes is not None:
+            existing = existing.filter(reduce(operator.or_, (Q(width=w, profile=p, diameter=d) for w, p, d in sizes)))
+        created, updated, deleted = _apply(existing.select_for_update(), _size_level_stats(sizes))
+
+        # Зведення без розміру — з уже порахованих рядків, без store_product
+        rollups = {}
+        size_rows = CatalogStats.objects.filter(width__gt=0).order_by().values('brand_key', 'seasonality').annotate(
+            min_price=Min('min_price'),
+            max_price=Max('max_price'),
+            in_stock_count=Sum('in_stock_count'),
+            total_count=Sum('total_count'),
+        )
+        for row in size_rows:
+            rollups[(row['brand_key'], row['seasonality'], 0, 0, 0)] = {f: row[f] for f in STAT_FIELDS}
+        _apply(CatalogStats.objects.filter(width=0).select_for_update(), rollups)
+
+    return created, updated, deleted
+
+
+def get_catalog_stats(brand_id=None, season=None, width=None, profile=None, diameter=None):
+    """Один рядок статистики для комбінації фільтрів SEO-матриці.
+
+    Повертає None, якщо комбінація не матеріалізована (напр. задана лише ширина).
+    """
+    size = (width or 0, profile or 0, diameter or 0)
+    if any(size) and not all(size):
+        return None
+    key = dict(brand_key=brand_id or 0, seasonality=season or '', width=size[0], profile=size[1], diameter=size[2])
+    # Немає рядка — немає товарів з такою комбінацією
+    return CatalogStats.objects.filter(**key).first() or CatalogStats(**key)
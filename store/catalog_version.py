@@ -0,0 +1,23 @@
+import time
+
+from django.core.cache import cache
+
+# --- 🔖 ВЕРСІЯ КАТАЛОГУ ---
+# Одне число в спільному кеші. Все, що залежить від товарів (фасети, кеш
+# сторінок, лічильники пагінації), додає його до своїх ключів. Синк, імпорт
+# чи збереження товару/бренду просто змінюють версію — старі ключі більше
+# ніхто не читає, і вони самі вичищаються з кешу. Без перебору ключів.
+
+CATALOG_VERSION_KEY = 'catalog_version'
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY, 0)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
@@ -1,7 +1,11 @@
 from .cart import Cart
+from .page_cache import is_page_cache_render, CSRF_PLACEHOLDER
 
 def cart(request):
     # Ця функція просто бере поточний запит (request),
     # створює об'єкт кошика (з сесії)
     # і повертає його у словнику під ключем 'cart'.
+    if is_page_cache_render(request):
+        # Сторінка йде в спільний кеш: кошик і CSRF підставить page_cache
+        return {'cart': [], 'csrf_token': CSRF_PLACEHOLDER}
     return {'cart': Cart(request)}
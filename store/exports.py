@@ -0,0 +1,88 @@
+import re
+
+from django.http import StreamingHttpResponse
+
+from .models import Product
+from .xlsx_stream import stream_xlsx, stream_csv
+
+# --- 📤 ЕКСПОРТИ З АДМІНКИ ---
+# Товари читаються .iterator() лише потрібними колонками, рядки одразу
+# йдуть у потоковий запис (store/xlsx_stream.py) — весь каталог ніколи не
+# лежить у пам'яті ні як моделі, ні як книга openpyxl.
+
+EXPORT_CHUNK = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Чистка назви для таблиці фото — регулярки компілюються один раз
+TYRE_WORD_RE = re.compile(r'шина', re.IGNORECASE)
+SIZE_WITH_RIM_RE = re.compile(r'\b\d{3}/\d{2}R?\d{0,2}\b')
+RIM_RE = re.compile(r'\bR\d{2}C?\b')
+INDEX_RE = re.compile(r'\b\d{2,3}[A-Z]\b')
+SPACES_RE = re.compile(r'\s+')
+
+UNIQUE_MODELS_HEADER = ['Brand', 'Clean Model Name', 'Photo URL']
+CATALOG_HEADER = ['ID', 'Бренд', 'Назва', 'Ширина', 'Профіль', 'Діаметр', 'Сезон', 'Собівартість', 'Ціна',
+                  'Знижка %', 'Залишок', 'Країна', 'Рік', 'Індекс навантаження', 'Індекс швидкості', 'Шипи',
+                  'Фото', 'URL']
+
+
+_brand_res = {}
+
+
+def _brand_patterns(brand_name):
+    patterns = _brand_res.get(brand_name)
+    if patterns is None:
+        escaped = re.escape(brand_name)
+        patterns = _brand_res[brand_name] = (re.compile(rf'\({escaped}\)', re.IGNORECASE),
+                                             re.compile(rf'\b{escaped}\b', re.IGNORECASE))
+    return patterns
+
+
+def clean_model_name(name, brand_name=None):
+    clean = TYRE_WORD_RE.sub('', name)
+    clean = SIZE_WITH_RIM_RE.sub('', clean)
+    clean = RIM_RE.sub('', clean)
+    clean = INDEX_RE.sub('', clean)
+    if brand_name:
+        for pattern in _brand_patterns(brand_name):
+            clean = pattern.sub('', clean)
+    clean = SPACES_RE.sub(' ', clean.replace('()', '').strip())
+    return clean if len(clean) >= 2 else name
+
+
+def unique_model_rows():
+    seen = set()
+    products = Product.objects.order_by().values_list('name', 'brand__name').iterator(chunk_size=EXPORT_CHUNK)
+    for name, brand_name in products:
+        clean = clean_model_name(name, brand_name)
+        brand_name = brand_name or "Unknown"
+        key = (brand_name.upper(), clean.upper())
+        if key not in seen:
+            seen.add(key)
+            yield brand_name, clean, ''
+
+
+def catalog_rows():
+    seasons = dict(Product.SEASON_CHOICES)
+    products = Product.objects.order_by('id').values_list(
+        'id', 'brand__name', 'name', 'width', 'profile', 'diameter', 'seasonality', 'cost_price', 'price',
+        'discount_percent', 'stock_quantity', 'country', 'year', 'load_index', 'speed_index', 'stud_type',
+        'photo_url', 'slug',
+    ).iterator(chunk_size=EXPORT_CHUNK)
+    for row in products:
+        row = list(row)
+        row[6] = seasons.get(row[6], row[6])
+        yield row
+
+
+def streaming_export(filename, header, rows, fmt='xlsx'):
+    if fmt == 'csv':
+        response = StreamingHttpResponse(stream_csv(header, rows), content_type='text/csv; charset=utf-8')
+        filename += '.csv'
+    else:
+        response = StreamingHttpResponse(stream_xlsx(header, rows, sheet_name=filename[:31]),
+                                         content_type=XLSX_CONTENT_TYPE)
+        filename += '.xlsx'
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
@@ -0,0 +1,221 @@
+import threading
+from collections import namedtuple
+
+from .catalog_version import get_catalog_version
+from .tyre_attributes import SPEED_ORDER
+
+# --- 🗂️ ІНДЕКС ФАСЕТІВ КАТАЛОГУ ---
+# Списки ширин/профілів/діаметрів/брендів для фільтрів будуються один раз
+# і живуть у пам'яті процесу. Індекс прив'язаний до версії каталогу
+# (catalog_version): збереження товару, синк і імпорт її змінюють, а кожен
+# воркер перебудовує свою копію при першому ж запиті після зміни.
+
+BrandFacet = namedtuple('BrandFacet', ['id', 'name', 'slug'])
+
+# Фасети, по яких рахуємо кількість товарів у фільтрі каталогу
+COUNTED_FACETS = ('width', 'profile', 'diameter', 'season', 'brand')
+# Фільтри за характеристиками: кількостей не показують, але звужують усі інші
+ATTRIBUTE_FACETS = ('load', 'speed', 'stud', 'year', 'xl', 'runflat')
+FILTER_FACETS = COUNTED_FACETS + ATTRIBUTE_FACETS
+
+SEASON_FILTER_CHOICES = [('winter', '❄️ Зимові'), ('summer', '☀️ Літні'), ('all-season', '🌤️ Всесезонні')]
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def _bitmap(positions, size):
+    buf = bytearray((size + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class FacetIndex:
+    def __init__(self, all_sizes, stock_sizes, brands, products=(), attributes=None):
+        self.brands = [BrandFacet(*b) for b in brands]
+        # Значення характеристик товарів у наявності (індекс навантаження, швидкість, шипи, рік)
+        self.attributes = attributes or {}
+        self._brands_by_id = {b.id: b for b in self.brands}
+        self._brands_by_slug = {b.slug: b for b in self.brands if b.slug}
+        self._sizes = {False: self._build(all_sizes), True: self._build(stock_sizes)}
+        self._build_bitmaps(products)
+
+    def _build_bitmaps(self, products):
+        # Кожен товар отримує позицію (біт). Для кожного значення фасету
+        # тримаємо бітову маску товарів з цим значенням, тож будь-яка
+        # комбінація фільтрів — це кілька AND, а кількість — bit_count().
+        postings = {facet: {} for facet in FILTER_FACETS}
+        in_stock = []
+        self._positions = {}
+        size = 0
+        for i, (product_id, qty, *values) in enumerate(products):
+            for facet, value in zip(FILTER_FACETS, values):
+                postings[facet].setdefault(value, []).append(i)
+            if qty > 0:
+                in_stock.append(i)
+            self._positions[product_id] = i
+            size = i + 1
+        self._size = size
+
+        self._bitmaps = {
+            facet: {value: _bitmap(positions, size) for value, positions in values.items()}
+            for facet, values in postings.items()
+        }
+        self._in_stock = _bitmap(in_stock, size)
+
+    def mask(self, product_ids):
+        # Маска довільної вибірки (наприклад, результатів пошуку за текстом)
+        positions = self._positions
+        return _bitmap((positions[pid] for pid in product_ids if pid in positions), self._size)
+
+    def _match(self, selected, skip=None, restrict=None):
+        mask = self._in_stock if restrict is None else self._in_stock & restrict
+        for facet in FILTER_FACETS:
+            value = selected.get(facet)
+            if facet == skip or value in (None, '', False):
+                continue
+            mask &= self._bitmaps[facet].get(value, 0)
+            if not mask:
+                break
+        return mask
+
+    def count(self, selected, restrict=None):
+        return self._match(selected, restrict=restrict).bit_count()
+
+    def counts(self, selected, restrict=None):
+        # Кількість товарів у наявності для кожного значення кожного фасету
+        # з урахуванням усіх інших активних фільтрів (і маски пошуку)
+        result = {}
+        for facet in COUNTED_FACETS:
+            base = self._match(selected, skip=facet, restrict=restrict)
+            result[facet] = {
+                value: (base & bitmap).bit_count() if base else 0
+                for value, bitmap in self._bitmaps[facet].items()
+            }
+        return result
+
+    @staticmethod
+    def _build(rows):
+        widths, profiles, diameters = set(), set(), set()
+        combos = {}
+        for w, p, d in rows:
+            if w > 0: widths.add(w)
+            if p > 0: profiles.add(p)
+            if d > 0: diameters.add(d)
+            combos.setdefault(w, {}).setdefault(p, set()).add(d)
+        return {
+            'widths': sorted(widths),
+            'profiles': sorted(profiles),
+            'diameters': sorted(diameters),
+            'combos': combos,
+        }
+
+    def widths(self, in_stock=False):
+        return self._sizes[in_stock]['widths']
+
+    def profiles(self, in_stock=False):
+        return self._sizes[in_stock]['profiles']
+
+    def diameters(self, in_stock=False):
+        return self._sizes[in_stock]['diameters']
+
+    def profiles_for(self, width, in_stock=False):
+        return sorted(p for p in self._sizes[in_stock]['combos'].get(width, {}) if p > 0)
+
+    def diameters_for(self, width, profile, in_stock=False):
+        return sorted(d for d in self._sizes[in_stock]['combos'].get(width, {}).get(profile, ()) if d > 0)
+
+    def has_size(self, width, profile, diameter, in_stock=False):
+        return diameter in self._sizes[in_stock]['combos'].get(width, {}).get(profile, ())
+
+    def get_brand(self, brand_id=None, slug=None):
+        if brand_id is not None:
+            return self._brands_by_id.get(brand_id)
+        return self._brands_by_slug.get(slug)
+
+
+def _distinct(queryset, field):
+    values = queryset.order_by().values_list(field, flat=True).distinct()
+    return [v for v in values if v not in ('', None)]
+
+
+def _load_index():
+    from .models import Product, Brand
+
+    sizes = Product.objects.values_list('width', 'profile', 'diameter')
+    all_sizes = list(sizes.distinct().order_by())
+    stock_sizes = list(sizes.filter(stock_quantity__gt=0).distinct().order_by())
+    brands = list(Brand.objects.order_by('name').values_list('id', 'name', 'slug'))
+    products = Product.objects.filter(width__gt=0, diameter__gt=0).order_by().values_list(
+        'id', 'stock_quantity', 'width', 'profile', 'diameter', 'seasonality', 'brand_id',
+        'load_index', 'speed_index', 'stud_type', 'year', 'is_xl', 'is_runflat',
+    ).iterator(chunk_size=5000)
+
+    in_stock = Product.objects.filter(stock_quantity__gt=0, width__gt=0)
+    attributes = {
+        'load': sorted(_distinct(in_stock, 'load_index'), key=lambda v: (len(v), v)),
+        'speed': sorted(_distinct(in_stock, 'speed_index'), key=lambda v: (SPEED_ORDER.find(v) % (len(SPEED_ORDER) + 1), v)),
+        'stud': sorted(_distinct(in_stock, 'stud_type')),
+        'year': sorted(_distinct(in_stock, 'year'), reverse=True),
+    }
+    return FacetIndex(all_sizes, stock_sizes, brands, products, attributes)
+
+
+def get_facets():
+    global _index, _index_version
+
+    version = get_catalog_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            _index = _load_index()
+            _index_version = version
+    return _index
+
+
+def facet_context(in_stock=False):
+    # Готовий набір для шаблонів фільтрів (filter_form, home, brand_detail)
+    facets = get_facets()
+    return {
+        'all_widths': facets.widths(in_stock),
+        'all_profiles': facets.profiles(in_stock),
+        'all_diameters': facets.diameters(in_stock),
+        'all_brands': facets.brands,
+    }
+
+
+def facet_filter_options(selected, restrict_ids=None):
+    # Опції для includes/filter_form.html: "R16 (342)". Значення без жодного
+    # товару в наявності ховаємо, окрім уже вибраного. selected — усі активні
+    # фільтри (COUNTED_FACETS + ATTRIBUTE_FACETS); restrict_ids — id товарів,
+    # знайдених текстовим запитом (None — запиту немає).
+    facets = get_facets()
+    restrict = facets.mask(restrict_ids) if restrict_ids is not None else None
+    counts = facets.counts(selected, restrict)
+
+    def options(facet, values, labels=None):
+        result = []
+        for value in values:
+            count = counts[facet].get(value, 0)
+            if count or value == selected.get(facet):
+                option = {'value': value, 'count': count}
+                if labels:
+                    option['label'] = labels[value]
+                result.append(option)
+        return result
+
+    return {
+        'width_options': options('width', facets.widths()),
+        'profile_options': options('profile', facets.profiles()),
+        'diameter_options': options('diameter', facets.diameters()),
+        'season_options': options('season', [key for key, _ in SEASON_FILTER_CHOICES], dict(SEASON_FILTER_CHOICES)),
+        'brand_options': options('brand', [b.id for b in facets.brands], {b.id: b.name for b in facets.brands}),
+        'load_options': facets.attributes.get('load', []),
+        'speed_options': facets.attributes.get('speed', []),
+        'stud_options': facets.attributes.get('stud', []),
+        'year_options': facets.attributes.get('year', []),
+    }
@@ -0,0 +1,184 @@
+import os
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ImportJob
+from .importers import IMPORTERS
+
+# --- ⏳ ЧЕРГА ФОНОВИХ ІМПОРТІВ ---
+# Адмінка кладе файл у IMPORT_DIR і створює ImportJob; воркер
+# (manage.py run_import_jobs) забирає задачі по одній і обробляє файл
+# частинами (chunk_rows імпортера) — кожна частина в своїй транзакції
+# разом з прогресом задачі. Частина з помилкою відкочується і проходиться ще
+# раз по рядку, щоб пропустити лише зламані рядки. Задача, воркер якої
+# не відзвітувався STALE_AFTER, вважається покинутою і береться знову
+# з останнього збереженого рядка.
+
+STALE_AFTER = timedelta(minutes=10)
+# Рядків журналу (помилки, не знайдені/неоднозначні рядки) на задачу
+MAX_ERRORS_LOGGED = 500
+
+
+def enqueue(kind, uploaded_file, user=None, start_row=2, end_row=None):
+    os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+    ext = os.path.splitext(uploaded_file.name)[1].lower() or '.xlsx'
+    path = os.path.join(settings.IMPORT_DIR, f"{kind}-{uuid.uuid4().hex}{ext}")
+    with open(path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+    return ImportJob.objects.create(
+        kind=kind, file_path=path, original_name=uploaded_file.name[:255],
+        start_row=start_row or 2, end_row=end_row,
+        created_by=user if user and user.is_authenticated else None,
+    )
+
+
+def _claimable():
+    return Q(status='queued') | Q(status='running', heartbeat_at__lt=timezone.now() - STALE_AFTER)
+
+
+def claim_next():
+    """Забирає найстаршу задачу; умовний UPDATE — два воркери не візьмуть одну й ту саму."""
+    for pk in ImportJob.objects.filter(_claimable()).order_by('id').values_list('id', flat=True)[:5]:
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(_claimable(), pk=pk).update(
+            status='running', heartbeat_at=now, started_at=Coalesce(F('started_at'), now))
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+class JobRunner:
+    def __init__(self, job, chunk_rows=None, log=None):
+        self.job = job
+        self.log = log or (lambda message: None)
+        self.importer = None
+        self.chunk_rows = chunk_rows
+        self.errors = []
+
+    def run(self):
+        job = self.job
+        resumed = job.position > 0
+        try:
+            # Невідомий вид задачі чи зламаний файл — задача 'failed', а не падіння воркера
+            if job.kind not in IMPORTERS:
+                raise ValueError(f"Невідомий вид імпорту: {job.kind}")
+            self.importer = IMPORTERS[job.kind](job.file_path)
+            self.chunk_rows = self.chunk_rows or self.importer.chunk_rows
+            job.total_rows = self.importer.count_rows()
+            rows = iter(self.importer.iter_rows())
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("Файл пустий")
+            self.importer.start(header)
+
+            batch = []
+            for excel_row, row in enumerate(rows, start=2):
+                if excel_row < job.start_row or excel_row <= job.position:
+                    continue
+                if job.end_row and excel_row > job.end_row:
+                    break
+                batch.append((excel_row, row))
+                if len(batch) >= self.chunk_rows:
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+
+            self.importer.finish(resumed=resumed)
+            self.finish('done', f"✅: {job.created_count}, 🔄: {job.updated_count}, ⏸: {job.unchanged_count}, "
+                                f"⏭: {job.skipped_count}, "
+                                f"❌: {job.error_count}")
+        except Exception as e:
+            # ValueError — проблема файлу (нема колонки тощо), решта — баг: потрібен traceback у логах воркера
+            if not isinstance(e, ValueError):
+                traceback.print_exc()
+            self.finish('failed', f"Помилка: {e}")
+        finally:
+            # Файл потрібен лише незавершеній задачі: зупинений воркер (задача лишилась
+            # running) продовжить з нього, а після успіху чи помилки він не потрібен
+            if job.status != 'running' and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+        return job
+
+    def flush(self, batch):
+        try:
+            with transaction.atomic():
+                counts = self.importer.process(batch)
+                self.errors += self.importer.take_notes()
+                self.save_progress(batch, counts, self.importer.take_rejected())
+        except Exception:
+            self.importer.reset()
+            self.errors = []
+            self.retry_by_row(batch)
+        self.log(f"📥 #{self.job.pk}: рядок {self.job.position} з {self.job.total_rows or '?'} "
+                 f"({self.job.rows_per_second:.0f} рядків/с)")
+
+    def retry_by_row(self, batch):
+        # Частина впала — шукаємо зламані рядки, решту імпортуємо як звичайно
+        totals, failed = [0, 0, 0, 0], 0
+        for item in batch:
+            try:
+                with transaction.atomic():
+                    counts = self.importer.process([item])
+                self.errors += self.importer.take_notes()
+                failed += self.importer.take_rejected()
+            except Exception as e:
+                self.importer.reset()
+                failed += 1
+                self.errors.append(f"Рядок {item[0]}: {e}")
+                continue
+            totals = [a + b for a, b in zip(totals, counts)]
+        with transaction.atomic():
+            self.save_progress(batch, totals, failed)
+
+    def save_progress(self, batch, counts, failed):
+        job = self.job
+        created, updated, unchanged, skipped = counts
+        job.position = batch[-1][0]
+        job.processed += len(batch)
+        job.created_count += created
+        job.updated_count += updated
+        job.unchanged_count += unchanged
+        job.skipped_count += skipped
+        job.error_count += failed
+        job.heartbeat_at = timezone.now()
+        fields = ['position', 'processed', 'created_count', 'updated_count', 'unchanged_count', 'skipped_count',
+                  'error_count', 'heartbeat_at', 'total_rows']
+        if self.errors:
+            logged = job.errors.count('\n') + bool(job.errors)
+            new_lines = self.errors[:max(MAX_ERRORS_LOGGED - logged, 0)]
+            job.errors = "\n".join(filter(None, [job.errors] + new_lines))
+            self.errors = []
+            fields.append('errors')
+        job.save(update_fields=fields)
+
+    def finish(self, status, message):
+        job = self.job
+        job.status = status
+        job.message = message[:500]
+        job.finished_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'message', 'finished_at', 'heartbeat_at', 'total_rows'])
+        self.log(f"{'✅' if status == 'done' else '💥'} #{job.pk} {job.get_kind_display()}: {message}")
+
+
+def run_worker(once=False, poll=5, chunk_rows=None, log=None):
+    """Обробляє задачі з черги; once — лише те, що є зараз, і вийти."""
+    log = log or (lambda message: None)
+    while True:
+        job = claim_next()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll)
+            continue
+        log(f"⚙️ #{job.pk} {job.get_kind_display()}: {job.original_name}")
+        JobRunner(job, chunk_rows=chunk_rows, log=log).run()
@@ -0,0 +1,287 @@
+import abc
+import re
+
+from .models import Product, Brand
+from .pricing import get_pricing
+from .search import build_search_text
+from .slugs import SlugAllocator, product_slug_base
+from .suppliers import PriceListAdapter, read_rows, count_rows
+from .sync_engine import to_cost, require_identity_keys, BULK_BATCH
+from .product_matcher import ModelLineIndex, AMBIGUOUS, UNMATCHED
+from .tyre_attributes import identity_key, apply_name_attributes, NAME_ATTRIBUTE_FIELDS
+from .catalog_stats import refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+
+# --- 📥 ІМПОРТ ТАБЛИЦЬ З АДМІНКИ ---
+# Логіка імпортів прайсу, SEO і фото — без request: її викликає воркер
+# фонових імпортів (store/import_jobs.py) частинами по кількасот рядків.
+# Кожен імпортер: start(header) перевіряє заголовок, process(rows) обробляє
+# частину [(номер рядка, рядок), ...] і повертає лічильники, finish() —
+# один раз наприкінці (статистика каталогу, версія кешу).
+
+# Поля, які імпорт прайсу пише в існуючий товар (разом з розібраними з назви)
+PRICE_LIST_UPDATE_FIELDS = ['seasonality', 'cost_price', 'stock_quantity', 'country', 'description', 'year',
+                            'photo_url', 'price', 'supplier_fingerprint'] + [
+                               f for f in NAME_ATTRIBUTE_FIELDS if f != 'year']
+PRICE_LIST_TRACKED = [f for f in PRICE_LIST_UPDATE_FIELDS if f != 'supplier_fingerprint']
+PRICE_LIST_LOAD = ['id', 'name', 'brand_id', 'width', 'profile', 'diameter', 'discount_percent'] + PRICE_LIST_UPDATE_FIELDS
+
+
+class SpreadsheetImport(abc.ABC):
+    chunk_rows = 500
+
+    def __init__(self, path):
+        self.path = path
+        # Повідомлення про окремі рядки (не знайдено тощо) — в журнал задачі
+        self.notes = []
+        # Рядки з помилкою даних (ціна "abc") — лічильник ❌ задачі
+        self.rejected = 0
+
+    def iter_rows(self):
+        return read_rows(self.path)
+
+    def count_rows(self):
+        return count_rows(self.path)
+
+    def start(self, header_row):
+        pass
+
+    def reset(self):
+        """Після відкату частини: забути створене в ній (кеші брендів тощо)."""
+        self.notes = []
+        self.rejected = 0
+
+    @abc.abstractmethod
+    def process(self, rows):
+        """Повертає (created, updated, unchanged, skipped); рядки з помилкою даних — через reject()."""
+
+    def take_notes(self):
+        notes, self.notes = self.notes, []
+        return notes
+
+    def reject(self, excel_row, reason):
+        self.notes.append(f"Рядок {excel_row}: {reason}")
+        self.rejected += 1
+
+    def take_rejected(self):
+        rejected, self.rejected = self.rejected, 0
+        return rejected
+
+    def finish(self, resumed=False):
+        bump_catalog_version()
+
+
+class PriceListImport(SpreadsheetImport):
+    """Прайс пакетно: на частину — один запит пошуку товарів, bulk_create + bulk_update.
+
+    Product.save() не викликається, тож ціну, slug і розібрані атрибути
+    рахуємо тими ж функціями, що й save() (як синк постачальників).
+    """
+    chunk_rows = 2000
+
+    def start(self, header_row):
+        require_identity_keys()
+        self.columns = PriceListAdapter.find_columns(header_row)
+        self.touched_sizes = set()
+        self.pricing = get_pricing()
+        self.slugs = SlugAllocator()
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.brands = {}
+        self.brands_by_id = {}
+        for brand in Brand.objects.all():
+            self.brands[brand.name.upper()] = self.brands_by_id[brand.pk] = brand
+
+    def get_brand(self, brand_name):
+        brand = self.brands.get(brand_name.upper())
+        if brand is None:
+            brand = self.brands[brand_name.upper()] = Brand.objects.create(name=brand_name)
+            self.brands_by_id[brand.pk] = brand
+        return brand
+
+    def snapshot(self, obj):
+        return tuple(getattr(obj, field) for field in PRICE_LIST_TRACKED)
+
+    def process(self, rows):
+        items, rejected = [], 0
+        for excel_row, row in rows:
+            try:
+                item = PriceListAdapter.parse_row(row, self.columns, strict=True)
+            except ValueError as e:
+                self.reject(excel_row, e)
+                rejected += 1
+                continue
+            if not item:
+                continue
+            brand_obj = self.get_brand(item['brand'])
+            w, p, d = item['width'], item['profile'], item['diameter']
+            unique_name = item['model']
+            if (w == 0 or p == 0 or d == 0) and item['size_raw']: unique_name = f"{item['model']} [{item['size_raw']}]"
+            # Той самий ключ, що й у синку постачальників
+            key = identity_key(brand_obj.name, unique_name, w, p, d)
+            items.append((key, brand_obj, unique_name, item))
+        skipped = len(rows) - len(items) - rejected
+
+        # Всі існуючі товари частини — одним запитом по унікальному ключу
+        keys = {key for key, *_ in items}
+        found = {obj.identity_key: obj for obj in Product.objects.filter(identity_key__in=keys).only(*PRICE_LIST_LOAD)}
+
+        to_create, to_update = {}, {}
+        created_count = updated_count = unchanged_count = 0
+        for key, brand_obj, unique_name, item in items:
+            obj = found.get(key)
+            created = obj is None
+            if created:
+                obj = found[key] = Product(name=unique_name, brand=brand_obj, width=item['width'],
+                                           profile=item['profile'], diameter=item['diameter'])
+                before = None
+            else:
+                before = self.snapshot(obj)
+            obj.seasonality = item['season']
+            obj.cost_price = to_cost(item['cost'])
+            obj.stock_quantity = item['stock']
+            obj.country = item['country']
+            obj.description = item['info']
+            if item['image'] and not obj.photo_url: obj.photo_url = item['image']
+            brand = self.brands_by_id.get(obj.brand_id, brand_obj)
+            apply_name_attributes(obj, brand.name)
+            # Колонка року важить більше за назву; порожня — лишається рік з назви (DOT/2023 р.)
+            if item['year']: obj.year = item['year']
+            if obj.cost_price > 0 and obj.price == 0:
+                obj.price = self.pricing.price(obj.cost_price, obj.discount_percent, brand, obj.diameter, obj.seasonality)
+
+            if created:
+                obj.search_text = build_search_text(brand.name, obj.name)
+                to_create[key] = obj
+                created_count += 1
+            elif key in to_create or key in to_update or before != self.snapshot(obj):
+                # Ручна правка/імпорт — наступний синк перезапише товар даними прайсу
+                obj.supplier_fingerprint = ''
+                if key not in to_create:
+                    to_update[key] = obj
+                updated_count += 1
+            else:
+                unchanged_count += 1
+                continue
+            self.touched_sizes.add((obj.width, obj.profile, obj.diameter))
+
+        new_products = list(to_create.values())
+        bases = [product_slug_base(self.brands_by_id[p.brand_id].name, p.name) for p in new_products]
+        for product, slug in zip(new_products, self.slugs.allocate_many(bases)):
+            product.slug = slug
+        Product.objects.bulk_create(new_products, batch_size=BULK_BATCH)
+        Product.objects.bulk_update(list(to_update.values()), PRICE_LIST_UPDATE_FIELDS, batch_size=BULK_BATCH)
+        return created_count, updated_count, unchanged_count, skipped
+
+    def finish(self, resumed=False):
+        # Після перезапуску воркера не знаємо всіх розмірів попередніх частин — рахуємо все
+        refresh_catalog_stats(None if resumed else self.touched_sizes)
+        bump_catalog_version()
+
+
+class LineMatchImport(SpreadsheetImport):
+    """Імпорт по лінійках (SEO, фото): зіставлення в пам'яті, запис — bulk_update на частину."""
+    chunk_rows = 5000
+    update_fields = []
+
+    def start(self, header_row):
+        self.index = ModelLineIndex()
+
+    def resolve(self, excel_row, brand_name, model_name):
+        status, line, ids = self.index.match(brand_name, model_name)
+        if status == AMBIGUOUS:
+            self.notes.append(f"Рядок {excel_row}: неоднозначно — {brand_name} / {model_name} (кілька лінійок)")
+        elif status == UNMATCHED:
+            self.notes.append(f"Рядок {excel_row}: не знайдено — {brand_name} / {model_name}")
+        return ids
+
+    def apply(self, values):
+        # values: id товару -> {поле: значення}; пізніший рядок таблиці перемагає
+        Product.objects.bulk_update(
+            [Product(pk=pk, **fields) for pk, fields in values.items()], self.update_fields, batch_size=BULK_BATCH)
+
+
+class SeoImport(LineMatchImport):
+    COLUMNS = {'brand': 'brand', 'model': 'model', 'title': 'title', 'h1': 'h1', 'text': 'seo text'}
+    update_fields = ['seo_title', 'seo_h1', 'seo_text']
+
+    def start(self, header_row):
+        header = [str(h).lower().strip() for h in header_row]
+        try:
+            self.idx = {key: header.index(name) for key, name in self.COLUMNS.items()}
+        except ValueError as e:
+            raise ValueError(f"Не знайдено колонку: {e}")
+        super().start(header_row)
+
+    def process(self, rows):
+        values = {}
+        updated_count = not_found_count = 0
+        for excel_row, row in rows:
+            if not row or len(row) < 2: continue
+
+            def cell(key):
+                idx = self.idx[key]
+                value = row[idx] if idx < len(row) else None
+                return str(value).strip() if value else ""
+
+            brand_val, model_val = cell('brand'), cell('model')
+            if not brand_val or not model_val: continue
+
+            # SEO-текст — найстаршому товару лінійки
+            ids = self.resolve(excel_row, brand_val, model_val)
+            if ids:
+                values[ids[0]] = {'seo_title': cell('title'), 'seo_h1': cell('h1'), 'seo_text': cell('text')}
+                updated_count += 1
+            else:
+                not_found_count += 1
+        self.apply(values)
+        return 0, updated_count, 0, not_found_count
+
+
+class PhotoImport(LineMatchImport):
+    IGNORE_WORDS = [
+        'serbia', 'china', 'korea', 'thailand', 'japan', 'turkey', 'germany', 'poland',
+        'dot', 'xl', 'new', 'demo', 'usa', 'hungary', 'romania', 'france', 'spain'
+    ]
+    update_fields = ['photo_url']
+
+    def process(self, rows):
+        # updated — кількість товарів (одне фото йде на всі розміри лінійки)
+        values = {}
+        updated_products = skipped = 0
+        for excel_row, row in rows:
+            if not row or len(row) < 3 or not row[0] or not row[1] or not row[2]:
+                skipped += 1
+                continue
+
+            brand_txt = str(row[0]).strip()
+            model_txt = str(row[1]).strip()
+            url_txt = str(row[2]).strip()
+            if not url_txt.startswith('http'):
+                skipped += 1
+                continue
+
+            clean_model_txt = re.sub(r'[(),]', ' ', model_txt)
+            valid_tokens = [t for t in clean_model_txt.split() if len(t) > 1 and t.lower() not in self.IGNORE_WORDS]
+            if not valid_tokens:
+                skipped += 1
+                continue
+
+            ids = self.resolve(excel_row, brand_txt, ' '.join(valid_tokens))
+            if not ids:
+                skipped += 1
+                continue
+            for pk in ids:
+                values[pk] = {'photo_url': url_txt}
+            updated_products += len(ids)
+        self.apply(values)
+        return 0, updated_products, 0, skipped
+
+
+IMPORTERS = {
+    'excel': PriceListImport,
+    'seo': SeoImport,
+    'photos': PhotoImport,
+}
@@ -0,0 +1,172 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.formats import date_format
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFError
+from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# --- 🧾 ТОВАРНИЙ ЧЕК (PDF) ---
+# Чек малюється напряму примітивами reportlab (platypus), без HTML і
+# xhtml2pdf. Шрифт з кирилицею лежить у репозиторії (store/fonts, DejaVu)
+# і реєструється один раз на процес — ні системних шляхів, ні мережі.
+# Готовий PDF кешується за відбитком вмісту замовлення: поки дані клієнта
+# і позиції ті самі, повторний друк віддає байти з кешу.
+
+FONT_DIR = os.path.join(os.path.dirname(__file__), 'fonts')
+FONT, FONT_BOLD = 'InvoiceSans', 'InvoiceSans-Bold'
+INVOICE_CACHE_SECONDS = 60 * 60 * 24 * 7
+# Змінили вигляд чека — підніміть, щоб старі PDF з кешу не віддавались
+INVOICE_LAYOUT_VERSION = 1
+
+BLUE = colors.HexColor('#0d6efd')
+GREY_TEXT = colors.HexColor('#555555')
+SEASONS = {'winter': 'Зимові', 'summer': 'Літні'}
+
+SELLER = ['<b>ФОП Рябуха Д.О.</b>', 'ІПН: 3644805072', 'Тел: +38 (066) 688-14-91',
+          'Адреса: м. Київ, вул. Володимира Качали, 3']
+WARRANTY = ("<b>Гарантійні зобов'язання:</b><br/>"
+            "Гарантія на заводський брак діє згідно із законодавством України. Товар підлягає обміну або "
+            "поверненню протягом 14 днів з моменту покупки за умови збереження повного товарного вигляду, "
+            "комплектації та за відсутності слідів монтажу (шини не монтувалися на диски).")
+FOOTER = 'Дякуємо за покупку на R16.com.ua! Повертайтеся до нас знову.'
+
+ORDER_FIELDS = ('id', 'created_at', 'full_name', 'phone', 'shipping_type', 'city', 'nova_poshta_branch',
+                'total_amount')
+ITEM_FIELDS = ('quantity', 'price_at_purchase', 'product__brand__name', 'product__display_name', 'product__name',
+               'product__seasonality')
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_fonts = None
+
+
+def register_fonts():
+    """(звичайний, жирний) — реєструються в reportlab один раз на процес."""
+    global _fonts
+    if _fonts is None:
+        with _lock:
+            if _fonts is None:
+                try:
+                    pdfmetrics.registerFont(TTFont(FONT, os.path.join(FONT_DIR, 'DejaVuSans.ttf')))
+                    pdfmetrics.registerFont(TTFont(FONT_BOLD, os.path.join(FONT_DIR, 'DejaVuSans-Bold.ttf')))
+                    pdfmetrics.registerFontFamily(FONT, normal=FONT, bold=FONT_BOLD)
+                    _fonts = (FONT, FONT_BOLD)
+                except (OSError, TTFError) as e:
+                    # Без шрифту чек все одно друкується, але кирилиця буде порожня
+                    logger.error(f"Помилка шрифту чека: {e}")
+                    _fonts = ('Helvetica', 'Helvetica-Bold')
+    return _fonts
+
+
+def _styles(font, bold):
+    base = ParagraphStyle('base', fontName=font, fontSize=9, leading=13, textColor=colors.HexColor('#333333'))
+    return {
+        'base': base,
+        'logo': ParagraphStyle('logo', base, fontName=bold, fontSize=24, leading=30, textColor=BLUE,
+                               alignment=TA_CENTER),
+        'title': ParagraphStyle('title', base, fontName=bold, fontSize=15, leading=20, alignment=TA_CENTER),
+        'center': ParagraphStyle('center', base, alignment=TA_CENTER),
+        'label': ParagraphStyle('label', base, fontName=bold, textColor=GREY_TEXT),
+        'cell': ParagraphStyle('cell', base, fontSize=8.5, leading=11),
+        'head': ParagraphStyle('head', base, fontName=bold, fontSize=8.5, leading=11),
+        'money': ParagraphStyle('money', base, fontSize=8.5, leading=11, alignment=TA_RIGHT),
+        'money_head': ParagraphStyle('money_head', base, fontName=bold, fontSize=8.5, leading=11,
+                                     alignment=TA_RIGHT),
+        'total': ParagraphStyle('total', base, fontName=bold, fontSize=12, leading=18, alignment=TA_RIGHT),
+        'warranty': ParagraphStyle('warranty', base, fontSize=8, leading=11),
+        'footer': ParagraphStyle('footer', base, fontSize=7.5, alignment=TA_CENTER, textColor=colors.grey),
+    }
+
+
+def _text(value, default=''):
+    return escape(str(value)) if value else default
+
+
+def _item_name(brand, display_name, name, seasonality):
+    title = display_name or name or 'Товар'
+    return f"{_text(brand)} {_text(title)} ({SEASONS.get(seasonality, 'Всесезонні')})".strip()
+
+
+def render_invoice(order, items):
+    """PDF чека (bytes); items — рядки ITEM_FIELDS."""
+    font, bold = register_fonts()
+    st = _styles(font, bold)
+    created = date_format(timezone.localtime(order.created_at), 'd F Y') if order.created_at else ''
+
+    if order.shipping_type == 'nova_poshta':
+        delivery = f"Нова Пошта, {_text(order.city)}, {_text(order.nova_poshta_branch)}"
+    else:
+        delivery = 'Самовивіз (ВК3)'
+    buyer = [f"<b>{_text(order.full_name, 'Клієнт')}</b>", f"Тел: {_text(order.phone, '-')}",
+             f"Доставка: {delivery}"]
+    parties = Table(
+        [[[Paragraph('Продавець:', st['label'])] + [Paragraph(line, st['base']) for line in SELLER], '',
+          [Paragraph('Покупець:', st['label'])] + [Paragraph(line, st['base']) for line in buyer]]],
+        colWidths=['48%', '4%', '48%'])
+    parties.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP'), ('LEFTPADDING', (0, 0), (-1, -1), 0)]))
+
+    rows = [[Paragraph('№', st['head']), Paragraph('Найменування товару', st['head']),
+             Paragraph('К-сть', st['head']), Paragraph('Од.', st['head']),
+             Paragraph('Ціна (грн)', st['money_head']), Paragraph('Сума (грн)', st['money_head'])]]
+    for number, (quantity, price, brand, display_name, name, seasonality) in enumerate(items, start=1):
+        cost = price * quantity
+        rows.append([Paragraph(str(number), st['cell']),
+                     Paragraph(_item_name(brand, display_name, name, seasonality), st['cell']),
+                     Paragraph(str(quantity), st['cell']), Paragraph('шт.', st['cell']),
+                     Paragraph(f"{price:.2f}", st['money']), Paragraph(f"{cost:.2f}", st['money'])])
+    table = Table(rows, colWidths=['5%', '45%', '10%', '10%', '15%', '15%'], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+
+    warranty = Table([[Paragraph(WARRANTY, st['warranty'])]], colWidths=['100%'])
+    warranty.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0f7ff')),
+        ('BOX', (0, 0), (-1, -1), 0.75, colors.HexColor('#cce0ff')),
+        ('TOPPADDING', (0, 0), (-1, -1), 8), ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+
+    story = [
+        Paragraph('R16.com.ua', st['logo']),
+        Paragraph(f"Товарний чек № {order.pk}", st['title']),
+        Paragraph(f"від {created} р.", st['center']),
+        Spacer(1, 6), HRFlowable(width='100%', thickness=1, color=BLUE), Spacer(1, 14),
+        parties, Spacer(1, 14), table, Spacer(1, 14),
+        # Сума — збережена в замовленні (Order.total_amount), та сама, що в адмінці
+        Paragraph(f"Разом до сплати: <font color='#0d6efd' size='14'>{order.total_amount:.2f} грн</font>",
+                  st['total']),
+        Spacer(1, 20), warranty, Spacer(1, 20), Paragraph(FOOTER, st['footer']),
+    ]
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+                            topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+                            title=f"Товарний чек № {order.pk}", author='R16.com.ua')
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def invoice_pdf(order):
+    """PDF чека з кешу; ключ — відбиток полів замовлення і позицій (один запит до БД)."""
+    items = list(order.items.order_by('id').values_list(*ITEM_FIELDS))
+    fingerprint = repr((INVOICE_LAYOUT_VERSION, [getattr(order, f) for f in ORDER_FIELDS], items))
+    key = f"invoice_pdf:{order.pk}:{hashlib.md5(fingerprint.encode()).hexdigest()}"
+    pdf = cache.get(key)
+    if pdf is None:
+        pdf = render_invoice(order, items)
+        cache.set(key, pdf, INVOICE_CACHE_SECONDS)
+    return pdf
@@ -0,0 +1,98 @@
+import codecs
+import json
+import re
+
+# --- 🌊 ПОТОКОВИЙ РОЗБІР JSON ---
+# Велику відповідь API читаємо шматками і розбираємо значення по одному
+# (json.JSONDecoder.raw_decode на C): масив з тисяч товарів не лежить у
+# пам'яті ні цілим текстом, ні цілим списком словників.
+
+WHITESPACE_RE = re.compile(r'\s*')
+VALUE_END = frozenset(' \t\r\n,:]}')
+_decoder = json.JSONDecoder()
+
+
+class JsonStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _more(self):
+        while not self.eof:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self.eof = True
+                text = self.utf8.decode(b'', final=True)
+            else:
+                text = self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text or self.eof:
+                # Прочитане відкидаємо — буфер тримає лише недорозібраний хвіст
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError("Неочікуваний кінець JSON")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON: очікувався '{char}' на позиції {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Наступне значення цілком (рядок, число, об'єкт...)."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Число на межі шматка могло обірватись ("12" з "1234", "-0" з "-0.25") —
+                # приймаємо його лише з роздільником після, інакше дочитуємо
+                if self.eof or (end < len(self.buf) and (
+                        self.buf[end] in VALUE_END or not isinstance(value, (int, float)))):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._more():
+                raise ValueError("Неочікуваний кінець JSON")
+
+    def iter_object(self):
+        """Ключі об'єкта по черзі; значення кожного ключа має забрати викликач."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def iter_array(self):
+        """Елементи масиву по черзі; кожен елемент має забрати викликач."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
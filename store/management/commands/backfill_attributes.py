@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from store.models import Product
+from store.search import build_search_text
+from store.tyre_attributes import apply_name_attributes, NAME_ATTRIBUTE_FIELDS
+from store.catalog_version import bump_catalog_version
+from store.product_merge import merge_products
+
+class Command(BaseCommand):
+    help = 'Перераховує збережені атрибути з назви (вітринна назва, XL, RunFlat, індекси, ключ ідентичності) і search_text для всіх товарів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=1000, help='Розмір пакета bulk_update')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch']
+        update_fields = NAME_ATTRIBUTE_FIELDS + ['search_text']
+        fields = ['name', 'width', 'profile', 'diameter', 'brand__name'] + update_fields
+        products = Product.objects.select_related('brand').only(*fields).order_by('id')
+
+        # Змінені товари тримаємо як (id, значення) — не цілі об'єкти на весь каталог
+        changed, rekeyed, keepers, groups, total = [], [], {}, {}, 0
+        for product in products.iterator(chunk_size=batch_size):
+            before = [getattr(product, f) for f in update_fields]
+            old_key = product.identity_key
+            apply_name_attributes(product)
+            product.search_text = build_search_text(product.brand.name if product.brand else '', product.name)
+            total += 1
+            if product.identity_key:
+                keeper = keepers.setdefault(product.identity_key, product.pk)
+                if keeper != product.pk:
+                    # Новий парсер дав двом товарам один ключ — зливаємо в найстаріший
+                    groups.setdefault(keeper, []).append(product.pk)
+                    continue
+            values = [getattr(product, f) for f in update_fields]
+            if values != before:
+                changed.append((product.pk, values))
+                if product.identity_key != old_key:
+                    rekeyed.append(product.pk)
+
+        with transaction.atomic():
+            merged = merge_products(groups)
+            # Ключ унікальний: спершу знімаємо старі ключі, інакше новий ключ одного
+            # товару може збігтися зі старим ключем іншого, ще не оновленого
+            for start in range(0, len(rekeyed), batch_size):
+                Product.objects.filter(id__in=rekeyed[start:start + batch_size]).update(identity_key='')
+            for start in range(0, len(changed), batch_size):
+                batch = [Product(pk=pk, **dict(zip(update_fields, values)))
+                         for pk, values in changed[start:start + batch_size]]
+                Product.objects.bulk_update(batch, update_fields)
+                self.stdout.write(f"⏳ Оновлено {start + len(batch)} з {len(changed)}")
+
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"🏷️ Готово. Товарів: {total}, оновлено: {len(changed)}"))
+        if merged:
+            self.stdout.write(self.style.WARNING(f"🧬 Злито дублікатів (той самий ключ ідентичності): {merged}"))
@@ -0,0 +1,73 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from store.sync_engine import run_sync
+from store.omega_client import OmegaClient
+from store.omega_standin import SyntheticCatalog, StandinTransport
+from store.catalog_version import bump_catalog_version
+
+# Свій checkpoint і код постачальника: перерваний справжній sync_omega і його
+# стейджинг бенчмарк не зачіпає, а обнуляє лише створені ним товари
+BENCHMARK_CHECKPOINT_KEY = 'omega_sync_checkpoint:benchmark'
+BENCHMARK_SUPPLIER = 'benchmark'
+
+class Command(BaseCommand):
+    help = 'Бенчмарк sync_omega на синтетичному прайсі (локальна заміна Omega API, зміни відкочуються)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 200000])
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--rate', type=float, default=0, help='Ліміт запитів/с (0 — без ліміту)')
+        parser.add_argument('--latency', type=float, default=0.05, help='Затримка відповіді API, с')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Частка відповідей 503')
+        parser.add_argument('--mutate', type=float, default=0.05,
+                            help='Частка змінених цін/залишків для повторного прогону')
+        parser.add_argument('--keep', action='store_true', help='Не відкочувати записане (лише на тестовій БД!)')
+        parser.add_argument('--trace-memory', action='store_true', help='Пік пам\'яті на сторінку (tracemalloc)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING(
+            f"⏱ Бенчмарк синку: latency={options['latency']}s, помилки={options['error_rate']:.0%}, "
+            f"workers={options['workers']}"))
+        for size in options['sizes']:
+            with transaction.atomic():
+                # Перший прогін — імпорт з нуля, другий — той самий прайс з частиною змін
+                self.run_once(size, 'імпорт', SyntheticCatalog(size), options)
+                self.run_once(size, f"ресинк {options['mutate']:.0%}",
+                              SyntheticCatalog(size, mutate=options['mutate']), options)
+                if not options['keep']:
+                    transaction.set_rollback(True)
+        # Статистика та кеш каталогу рахувались по відкоченим даним
+        bump_catalog_version()
+
+    def run_once(self, size, label, catalog, options):
+        transport = StandinTransport(catalog, latency=options['latency'], error_rate=options['error_rate'])
+        client = OmegaClient('benchmark', url='standin://getTires', session=transport, rate_limit=options['rate'],
+                             retries=8, backoff=0.05, workers=options['workers'])
+
+        queries = [0]
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.monotonic()
+        with connection.execute_wrapper(count_queries):
+            result = run_sync(client, page_size=options['page_size'], restart=True,
+                              trace_memory=options['trace_memory'], checkpoint_key=BENCHMARK_CHECKPOINT_KEY,
+                              supplier=BENCHMARK_SUPPLIER)
+        wall = time.monotonic() - started
+
+        if result['error']:
+            self.stdout.write(self.style.ERROR(f"💥 {size} / {label}: {result['error']}"))
+            return
+        timings = result['timings']
+        self.stdout.write(self.style.SUCCESS(
+            f"📊 {size} шин / {label}: {result['items'] / wall:,.0f} шт/с, {wall:.1f}s, "
+            f"запитів до БД {queries[0]}, HTTP {transport.requests}, пік RSS {result['peak_rss_mb']:.0f} MB"
+            + (f", пік на сторінку {result['page_peak_mb']:.1f} MB" if result['page_peak_mb'] is not None else "")))
+        self.stdout.write(
+            f"   фази: load {timings['load']:.2f}s · fetch+stage {timings['fetch_stage']:.2f}s · "
+            f"apply {timings['apply']:.2f}s · stats {timings['stats']:.2f}s")
+        self.stdout.write(
+            f"   ➕ {result['created']}  🔄 {result['updated']}  🚫 {result['zeroed']}  ⏸ {result['unchanged']}")
@@ -123,15 +123,12 @@ class Command(BaseCommand):
             elif "зимов" in season_str: season_str = "зимова"
             elif "літн" in season_str: season_str = "літня"
 
+            # Індекси вже розібрані з назви при збереженні (store/tyre_attributes.py)
             speed_val = product.speed_index or ""
             load_val = product.load_index or ""
-            if not speed_val or not load_val:
-                match = re.search(r'\b(\d{2,3})([A-Z]{1,2})\b', product.name.upper())
-                if match:
-                    if not load_val: load_val = match.group(1)
-                    if not speed_val: speed_val = match.group(2)
 
-            speed_kmh = SPEED_INDICES.get(speed_val.upper(), "???")
+            # 94VR / 99WR — старе позначення: швидкість за першою літерою
+            speed_kmh = SPEED_INDICES.get(speed_val.upper()) or SPEED_INDICES.get(speed_val[:1].upper(), "???")
             load_kg = LOAD_INDICES.get(load_val, "???")
 
             brand_name = product.brand.name if product.brand else ""
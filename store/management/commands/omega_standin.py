@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from store.omega_standin import SyntheticCatalog, FixtureCatalog, serve
+
+class Command(BaseCommand):
+    help = 'Локальна заміна Omega API (getTires) для тестів і бенчмарку sync_omega'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Кількість синтетичних шин')
+        parser.add_argument('--fixture', help='JSONL з `sync_omega --record` замість синтетики')
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0, help='Затримка відповіді, с')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Частка відповідей 503 (0..1)')
+
+    def handle(self, *args, **options):
+        catalog = FixtureCatalog(options['fixture']) if options['fixture'] else SyntheticCatalog(options['size'])
+        server = serve(catalog, options['host'], options['port'], options['latency'], options['error_rate'])
+        url = f"http://{options['host']}:{options['port']}/"
+        self.stdout.write(self.style.SUCCESS(f"🧪 Omega stand-in: {catalog.total} шин на {url}"))
+        self.stdout.write(f"   python manage.py sync_omega --url {url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
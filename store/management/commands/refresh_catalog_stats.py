@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from store.catalog_stats import refresh_catalog_stats
+
+class Command(BaseCommand):
+    help = 'Повний перерахунок статистики цін (CatalogStats) для SEO-сторінок'
+
+    def handle(self, *args, **options):
+        created, updated, deleted = refresh_catalog_stats()
+        self.stdout.write(self.style.SUCCESS(f"📊 Статистику оновлено. ➕ {created} 🔄 {updated} 🗑 {deleted}"))
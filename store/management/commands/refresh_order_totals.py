@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from store.models import Order, OrderItem
+
+class Command(BaseCommand):
+    help = 'Перерахунок збережених сум і кількості шин у замовленнях (одним UPDATE)'
+
+    def handle(self, *args, **options):
+        items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        amount = items.annotate(amount=Sum(F('quantity') * F('price_at_purchase'))).values('amount')
+        count = items.annotate(count=Sum('quantity')).values('count')
+        updated = Order.objects.update(
+            total_amount=Coalesce(Subquery(amount), Value(0), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            items_count=Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+        )
+        self.stdout.write(self.style.SUCCESS(f"🧾 Підсумки перераховано: {updated} замовлень"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from store.pricing import reprice, format_summary
+
+class Command(BaseCommand):
+    help = 'Перераховує ціни всього каталогу за правилами націнки (кілька SQL UPDATE в одній транзакції)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати, які ціни зміняться')
+        parser.add_argument('--sample', type=int, default=10, help='Скільки прикладів показати')
+
+    def handle(self, *args, **options):
+        summary = reprice(dry_run=options['dry_run'], sample=options['sample'])
+        style = self.style.WARNING if options['dry_run'] else self.style.SUCCESS
+        lines = format_summary(summary)
+        self.stdout.write(style(("🔍 " if options['dry_run'] else "💲 ") + lines[0]))
+        for line in lines[1:]:
+            self.stdout.write(line)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from store.import_jobs import run_worker
+
+class Command(BaseCommand):
+    help = 'Воркер фонових імпортів з адмінки (прайс, SEO, фото): обробляє файли з черги частинами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Обробити те, що є в черзі, і вийти (для cron)')
+        parser.add_argument('--poll', type=float, default=5, help='Пауза між перевірками порожньої черги, с')
+        parser.add_argument('--chunk', type=int, default=None,
+                            help='Рядків в одній транзакції (за замовчуванням — свій для кожного імпорту)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("⏳ Воркер імпортів запущено"))
+        run_worker(once=options['once'], poll=options['poll'], chunk_rows=options['chunk'], log=self.stdout.write)
@@ -1,133 +1,63 @@
-import requests
+import json
 import os
-import re
-import time
-from django.core.management.base import BaseCommand
-from store.models import Product, Brand
-from django.utils.text import slugify
-from django import db
+from django.core.management.base import BaseCommand, CommandError
+from store.sync_engine import run_sync
+from store.omega_client import OmegaClient, OMEGA_URL
+from store.omega_standin import row_to_item
 
 class Command(BaseCommand):
     help = 'GOLD Універсальна синхронізація з виправленням дублікатів брендів (Без затирання ШІ-описів)'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Паралельних завантажень сторінок')
+        parser.add_argument('--rate', type=float, default=2.0, help='Максимум запитів до API на секунду')
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--retries', type=int, default=4, help='Повторів на сторінку при мережевих помилках')
+        parser.add_argument('--restart', action='store_true', help='Ігнорувати чекпоінт і почати з нуля')
+        parser.add_argument('--url', default=os.environ.get('OMEGA_URL', OMEGA_URL),
+                            help='Адреса getTires (напр. локальний omega_standin)')
+        parser.add_argument('--record', help='Записати отримані рядки прайсу у JSONL (для omega_standin --fixture)')
+        parser.add_argument('--trace-memory', action='store_true',
+                            help='Міряти пік пам\'яті на сторінку (tracemalloc, синк повільніший)')
+
     def handle(self, *args, **options):
         KEY = os.environ.get("OMEGA_API_KEY", "ORMX5xgdRK5aqkFU8nlKfRv1rtnJmwc7")
-        url = "https://public.omega.page/public/api/v1.0/searchcatalog/getTires"
-        
-        self.stdout.write(self.style.WARNING("🚀 Запуск виправленої GOLD-синхронізації..."))
-
-        # Скидаємо залишки перед оновленням
-        Product.objects.update(stock_quantity=0)
-
-        updated_count = 0
-        created_count = 0
-        current_from = 0
-        batch_size = 1000 
-
-        while True:
-            self.stdout.write(f"📥 Завантаження товарів з позиції {current_from}...")
-            
-            payload = {
-                "From": current_from,
-                "Count": batch_size,
-                "Key": KEY
-            }
-
-            try:
-                response = requests.post(url, json=payload, timeout=60)
-                data = response.json()
-                
-                if not data.get('Success'):
-                    self.stdout.write(self.style.ERROR(f"❌ Помилка API: {data.get('Errors')}"))
-                    break
-
-                result_data = data.get('Data', {})
-                items = result_data.get('Result', [])
-                total_available = result_data.get('Total', 0)
-
-                if not items:
-                    break
+        client = OmegaClient(KEY, url=options['url'], rate_limit=options['rate'],
+                             retries=options['retries'], workers=options['workers'])
 
-                for item in items:
-                    name_omega = item.get('DescriptionUkr', '')
-                    if not name_omega or "Шина" not in name_omega:
-                        continue
-
-                    brand_raw = item.get('BrandDescription', 'Unknown').strip()
-                    price_omega = item.get('CustomerPrice', 0)
-                    image_url = item.get('ImageUrl', '')
-                    
-                    # Розрахунок залишку
-                    total_stock = 0
-                    for rest in item.get('Rests', []):
-                        val = str(rest.get('Value', '0')).replace('>', '')
-                        try:
-                            total_stock += int(val)
-                        except: continue
-                    
-                    if total_stock > 20: total_stock = 20
-
-                    # Парсинг розмірів (Ширина/Профіль RДіаметр)
-                    size_match = re.search(r'(\d{3})/(\d{2,3})\s?[R|r](\d{2})', name_omega)
-                    w = int(size_match.group(1)) if size_match else 0
-                    p = int(size_match.group(2)) if size_match else 0
-                    d = int(size_match.group(3)) if size_match else 0
-
-                    clean_name = name_omega.replace('Шина ', '').strip()
-                    
-                    # 1. Спершу шукаємо бренд безпечно (ігноруючи регістр)
-                    brand_obj = Brand.objects.filter(name__iexact=brand_raw).first()
-                    if not brand_obj:
-                        # Створюємо бренд тільки якщо його slug точно не зайнятий
-                        new_slug = slugify(brand_raw)
-                        brand_obj, _ = Brand.objects.get_or_create(
-                            slug=new_slug, 
-                            defaults={'name': brand_raw}
-                        )
-
-                    # 2. Шукаємо або оновлюємо товар
-                    product = Product.objects.filter(name__iexact=clean_name).first()
-                    if not product:
-                        product = Product.objects.filter(name__iexact=name_omega).first()
-
-                    if product:
-                        product.stock_quantity = total_stock
-                        product.cost_price = price_omega
-                        
-                        # 🔥 ЗАКОМЕНТОВАНО: Щоб не затирати наші красиві ШІ-описи!
-                        # product.description = item.get('Info', '') 
-                        
-                        # Оновлюємо URL фото, якщо свого файлу ще немає
-                        if image_url and (not product.photo or product.photo == ''):
-                            product.photo_url = image_url
-                        
-                        product.price = 0 # Обнуляємо для спрацювання націнки у models.py
-                        product.save()
-                        updated_count += 1
-                    else:
-                        Product.objects.create(
-                            name=clean_name,
-                            brand=brand_obj,
-                            width=w, profile=p, diameter=d,
-                            cost_price=price_omega,
-                            stock_quantity=total_stock,
-                            description=item.get('Info', ''), # Новим товарам даємо хоч якийсь текст, потім ШІ його перепише
-                            photo_url=image_url
-                        )
-                        created_count += 1
-
-                current_from += batch_size
-                db.reset_queries()
-                
-                if current_from >= total_available:
-                    break
-                
-                time.sleep(0.5)
-
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"💥 Помилка на позиції {current_from}: {e}"))
-                break
+        self.stdout.write(self.style.WARNING("🚀 Запуск виправленої GOLD-синхронізації..."))
 
-        self.stdout.write(self.style.SUCCESS(f"\n🎉 GOLD-Синхронізація успішно завершена!"))
-        self.stdout.write(self.style.SUCCESS(f"🔄 Оновлено: {updated_count}"))
-        self.stdout.write(self.style.SUCCESS(f"➕ Створено: {created_count}"))
+        record = open(options['record'], 'w', encoding='utf-8') if options['record'] else None
+        def on_page(offset, rows):
+            for row in rows:
+                record.write(json.dumps(row_to_item(row), ensure_ascii=False) + "\n")
+
+        try:
+            result = run_sync(client, page_size=options['page_size'], restart=options['restart'],
+                              log=self.stdout.write, on_page=on_page if record else None,
+                              trace_memory=options['trace_memory'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if record:
+                record.close()
+
+        if result['error']:
+            self.stdout.write(self.style.ERROR(f"💥 Помилка: {result['error']}"))
+            self.stdout.write(self.style.ERROR("⏸ Прогрес збережено — повторний запуск продовжить з останньої записаної сторінки"))
+
+        if result['finished']:
+            self.stdout.write(self.style.SUCCESS(f"\n🎉 GOLD-Синхронізація успішно завершена!"))
+        else:
+            self.stdout.write(self.style.WARNING(f"\n⏸ Синк зупинено: залишки на вітрині не змінені, нові товари вже додано"))
+        self.stdout.write(self.style.SUCCESS(f"🔄 Оновлено: {result['updated']}"))
+        self.stdout.write(self.style.SUCCESS(f"➕ Створено: {result['created']}"))
+        self.stdout.write(self.style.SUCCESS(f"🚫 Обнулено (немає в прайсі): {result['zeroed']}"))
+        self.stdout.write(self.style.SUCCESS(f"⏸ Без змін у прайсі: {result['unchanged']}"))
+        memory = f"🧠 Пік RSS: {result['peak_rss_mb']:.0f} MB"
+        if result['page_peak_mb'] is not None:
+            memory += f", пік на сторінку: {result['page_peak_mb']:.1f} MB"
+        self.stdout.write(memory)
+        if result['error']:
+            # Ненульовий код виходу — cron/CI бачать, що синк не дійшов до кінця
+            raise CommandError(result['error'])
@@ -0,0 +1,58 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from store.omega_client import OmegaClient, OMEGA_URL
+from store.suppliers import OmegaAdapter, PriceListAdapter, run_suppliers
+from store.sync_engine import MERGE_RULES
+
+class Command(BaseCommand):
+    help = 'Синк з кількох постачальників одночасно (Omega API + прайси .xlsx/.csv) зі зведенням пропозицій'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--omega', action='store_true', help='Додати Omega API')
+        parser.add_argument('--price-list', action='append', default=[], metavar='КОД=ФАЙЛ',
+                            help='Прайс дистриб\'ютора, напр. --price-list vianor=/data/vianor.xlsx (можна кілька)')
+        parser.add_argument('--merge', choices=MERGE_RULES, default='cheapest',
+                            help='Одна шина в кількох постачальників: найдешевша пропозиція або сума залишків')
+        parser.add_argument('--workers', type=int, default=4, help='Паралельних завантажень сторінок Omega')
+        parser.add_argument('--rate', type=float, default=2.0, help='Максимум запитів до Omega API на секунду')
+        parser.add_argument('--page-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        adapters = []
+        if options['omega']:
+            client = OmegaClient(os.environ.get("OMEGA_API_KEY", "ORMX5xgdRK5aqkFU8nlKfRv1rtnJmwc7"),
+                                 url=os.environ.get('OMEGA_URL', OMEGA_URL),
+                                 rate_limit=options['rate'], workers=options['workers'])
+            adapters.append(OmegaAdapter(client, page_size=options['page_size']))
+        for spec in options['price_list']:
+            code, sep, path = spec.partition('=')
+            if not sep or not code or not os.path.exists(path):
+                raise CommandError(f"Очікується КОД=ФАЙЛ з існуючим файлом: {spec}")
+            adapters.append(PriceListAdapter(path, code, page_size=options['page_size']))
+        if not adapters:
+            raise CommandError("Не вказано жодного постачальника (--omega, --price-list)")
+        if len({a.code for a in adapters}) != len(adapters):
+            raise CommandError("Коди постачальників повторюються")
+
+        self.stdout.write(self.style.WARNING(
+            f"🚚 Синк постачальників: {', '.join(a.code for a in adapters)} (злиття: {options['merge']})"))
+        try:
+            result = run_suppliers(adapters, rule=options['merge'], log=self.stdout.write)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for code, stats in result['suppliers'].items():
+            style = self.style.ERROR if stats['error'] else self.style.SUCCESS
+            self.stdout.write(style(f"   {code}: рядків {stats['items']}, ➕ {stats['created']}, 📦 {stats['staged']}"
+                                    + (f", 💥 {stats['error']}" if stats['error'] else "")))
+        if result['finished']:
+            self.stdout.write(self.style.SUCCESS(f"\n🎉 Синк завершено!"))
+        else:
+            self.stdout.write(self.style.WARNING(f"\n⏸ Не всі прайси отримано: залишки на вітрині не змінені, нові товари вже додано"))
+        self.stdout.write(self.style.SUCCESS(f"🔀 Зведено пропозицій: {result['merged']}"))
+        self.stdout.write(self.style.SUCCESS(f"🔄 Оновлено: {result['updated']}"))
+        self.stdout.write(self.style.SUCCESS(f"🚫 Обнулено (зникли з прайсів своїх постачальників): {result['zeroed']}"))
+        self.stdout.write(self.style.SUCCESS(f"⏸ Без змін у прайсі: {result['unchanged']}"))
+        errors = [f"{code}: {stats['error']}" for code, stats in result['suppliers'].items() if stats['error']]
+        if errors:
+            raise CommandError('; '.join(errors))
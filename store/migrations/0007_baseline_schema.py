@@ -0,0 +1,367 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Моделі з вихідного коду (ціни, slug-и, SEO, банери, відгуки...) в робочу
+# БД потрапили колись поза цим ланцюжком міграцій, тож 0001–0006 описують
+# лише частину схеми. Ця міграція доганяє стан: на такій БД вона нічого не
+# виконує (колонки вже є), а на новій БД, зібраній лише з 0001–0006,
+# створює все по-справжньому. Ознака — наявність колонки store_product.slug.
+
+
+def _has_baseline_schema(schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = connection.introspection.get_table_description(cursor, 'store_product')
+    return any(column.name == 'slug' for column in columns)
+
+
+class BaselineSchema(migrations.SeparateDatabaseAndState):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _has_baseline_schema(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+
+BASELINE_OPERATIONS = [
+    migrations.CreateModel(
+        name='AboutImage',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('image', models.ImageField(upload_to='about_us/')),
+            ('image_url', models.URLField(blank=True, max_length=1024, null=True)),
+            ('created_at', models.DateTimeField(auto_now_add=True)),
+        ],
+        options={
+            'verbose_name': 'Фото про нас',
+            'verbose_name_plural': 'Фото про нас',
+        },
+    ),
+    migrations.CreateModel(
+        name='SiteBanner',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('title', models.CharField(max_length=100)),
+            ('image', models.ImageField(blank=True, null=True, upload_to='banners/', verbose_name='Фото (Файл)')),
+            ('image_url', models.URLField(blank=True, max_length=1024, null=True, verbose_name='Фото (Посилання)')),
+            ('link', models.CharField(blank=True, max_length=500, null=True, verbose_name='Куди вести при кліку')),
+            ('is_active', models.BooleanField(default=True)),
+            ('created_at', models.DateTimeField(auto_now_add=True)),
+        ],
+        options={
+            'verbose_name': 'Банер',
+            'verbose_name_plural': 'Банери',
+        },
+    ),
+    migrations.CreateModel(
+        name='SiteSettings',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('global_markup', models.DecimalField(decimal_places=2, default='1.30', max_digits=5, verbose_name='Націнка')),
+        ],
+        options={
+            'verbose_name': 'Налаштування',
+            'verbose_name_plural': 'Налаштування',
+        },
+    ),
+    migrations.AlterModelOptions(
+        name='brand',
+        options={'verbose_name': 'Бренд', 'verbose_name_plural': 'Бренди'},
+    ),
+    migrations.AlterModelOptions(
+        name='order',
+        options={'verbose_name': 'Замовлення', 'verbose_name_plural': 'Замовлення'},
+    ),
+    migrations.AlterModelOptions(
+        name='orderitem',
+        options={'verbose_name': 'Товар у замовленні', 'verbose_name_plural': 'Товари у замовленнях'},
+    ),
+    migrations.AlterModelOptions(
+        name='product',
+        options={'verbose_name': 'Товар', 'verbose_name_plural': 'Товари'},
+    ),
+    migrations.AlterModelOptions(
+        name='productimage',
+        options={'verbose_name': 'Фото галереї', 'verbose_name_plural': 'Фото галереї'},
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='category',
+        field=models.CharField(choices=[('budget', '💸 Економ'), ('medium', '⚖️ Ціна/Якість'), ('top', '💎 Топ')], default='budget', max_length=20, verbose_name='Категорія'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='cons',
+        field=models.TextField(blank=True, verbose_name='Слабкі сторони (Мінуси)'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='country',
+        field=models.CharField(blank=True, max_length=100, null=True, verbose_name='Країна бренду'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='description',
+        field=models.TextField(blank=True, verbose_name='Хто цей бренд (Опис)'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='image',
+        field=models.ImageField(blank=True, null=True, upload_to='brands/', verbose_name='Логотип'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='pros',
+        field=models.TextField(blank=True, verbose_name='Сильні сторони (Плюси)'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='seo_h1',
+        field=models.CharField(blank=True, max_length=255, verbose_name='SEO H1'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='seo_text',
+        field=models.TextField(blank=True, verbose_name='SEO Текст (знизу)'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='seo_title',
+        field=models.CharField(blank=True, max_length=255, verbose_name='SEO Title'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='slug',
+        field=models.SlugField(blank=True, max_length=100, null=True, unique=True, verbose_name='URL (Slug)'),
+    ),
+    migrations.AddField(
+        model_name='brand',
+        name='target_audience',
+        field=models.TextField(blank=True, verbose_name='Для кого підходить'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='country',
+        field=models.CharField(blank=True, max_length=50, null=True),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='discount_percent',
+        field=models.IntegerField(default=0),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='load_index',
+        field=models.CharField(blank=True, max_length=10, null=True),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='price',
+        field=models.DecimalField(decimal_places=0, default=0, max_digits=10, verbose_name='Ціна продажу'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='seo_h1',
+        field=models.CharField(blank=True, max_length=255, null=True, verbose_name='SEO H1'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='seo_text',
+        field=models.TextField(blank=True, null=True, verbose_name='SEO Текст'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='seo_title',
+        field=models.CharField(blank=True, max_length=500, null=True, verbose_name='SEO Title'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='slug',
+        field=models.SlugField(blank=True, max_length=255, unique=True, verbose_name='URL-адреса'),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='speed_index',
+        field=models.CharField(blank=True, max_length=10, null=True),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='stud_type',
+        field=models.CharField(default='Не шип', max_length=50),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='vehicle_type',
+        field=models.CharField(default='Легковий', max_length=50),
+    ),
+    migrations.AddField(
+        model_name='product',
+        name='year',
+        field=models.IntegerField(default=2024),
+    ),
+    migrations.AddField(
+        model_name='productimage',
+        name='image',
+        field=models.ImageField(blank=True, null=True, upload_to='product_gallery/'),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='city',
+        field=models.CharField(blank=True, max_length=100, null=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='created_at',
+        field=models.DateTimeField(auto_now_add=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='customer',
+        field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='email',
+        field=models.EmailField(blank=True, max_length=254, null=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='full_name',
+        field=models.CharField(blank=True, max_length=255, null=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='nova_poshta_branch',
+        field=models.CharField(blank=True, max_length=100, null=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='phone',
+        field=models.CharField(blank=True, max_length=20, null=True),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='shipping_type',
+        field=models.CharField(choices=[('pickup', 'Самовивіз'), ('nova_poshta', 'Нова Пошта')], default='pickup', max_length=20),
+    ),
+    migrations.AlterField(
+        model_name='order',
+        name='status',
+        field=models.CharField(choices=[('new', '🔴 Нове'), ('confirmed', '🟡 Підтверджено'), ('waiting_supplier', '⏳ Чекаємо від постачальника'), ('pickup_vk3', '🏢 Самовивіз ВК3'), ('waiting_payment', '💳 Очікує оплати / Передоплати'), ('shipped', '🚚 Передано в доставку (НП)'), ('completed', '✅ Успішно завершено'), ('canceled', '❌ Скасовано')], default='new', max_length=30),
+    ),
+    migrations.AlterField(
+        model_name='orderitem',
+        name='order',
+        field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='store.order'),
+    ),
+    migrations.AlterField(
+        model_name='orderitem',
+        name='price_at_purchase',
+        field=models.DecimalField(decimal_places=2, max_digits=10),
+    ),
+    migrations.AlterField(
+        model_name='orderitem',
+        name='product',
+        field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.product'),
+    ),
+    migrations.AlterField(
+        model_name='orderitem',
+        name='quantity',
+        field=models.IntegerField(default=1),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='brand',
+        field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.brand'),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='cost_price',
+        field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Собівартість'),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='description',
+        field=models.TextField(blank=True),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='diameter',
+        field=models.IntegerField(default=0),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='name',
+        field=models.CharField(max_length=255),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='photo',
+        field=models.ImageField(blank=True, null=True, upload_to='products/'),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='photo_url',
+        field=models.URLField(blank=True, max_length=1024, null=True),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='profile',
+        field=models.IntegerField(default=0),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='stock_quantity',
+        field=models.IntegerField(default=0),
+    ),
+    migrations.AlterField(
+        model_name='product',
+        name='width',
+        field=models.IntegerField(default=0),
+    ),
+    migrations.AlterField(
+        model_name='productimage',
+        name='image_url',
+        field=models.URLField(blank=True, max_length=1024, null=True),
+    ),
+    migrations.AlterField(
+        model_name='productimage',
+        name='product',
+        field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='store.product'),
+    ),
+    migrations.CreateModel(
+        name='Review',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('name', models.CharField(max_length=100, verbose_name="Ім'я")),
+            ('rating', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)], verbose_name='Оцінка')),
+            ('text', models.TextField(verbose_name='Текст відгуку')),
+            ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+            ('is_approved', models.BooleanField(default=False, verbose_name='Опубліковано')),
+            ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='store.product', verbose_name='Товар')),
+        ],
+        options={
+            'verbose_name': 'Відгук',
+            'verbose_name_plural': 'Відгуки',
+            'ordering': ['-created_at'],
+        },
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_product_description_alter_product_seasonality'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BaselineSchema(database_operations=BASELINE_OPERATIONS, state_operations=BASELINE_OPERATIONS),
+    ]
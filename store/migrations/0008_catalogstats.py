@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_baseline_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand_key', models.IntegerField(default=0, verbose_name='ID бренду (0 = всі)')),
+                ('seasonality', models.CharField(blank=True, default='', max_length=20, verbose_name="Сезон ('' = всі)")),
+                ('width', models.IntegerField(default=0)),
+                ('profile', models.IntegerField(default=0)),
+                ('diameter', models.IntegerField(default=0)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=0, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=0, max_digits=10, null=True)),
+                ('in_stock_count', models.IntegerField(default=0)),
+                ('total_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Статистика цін',
+                'verbose_name_plural': 'Статистика цін',
+                'unique_together': {('brand_key', 'seasonality', 'width', 'profile', 'diameter')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class AddTrigramIndex(migrations.AddIndex):
+    """GIN з gin_trgm_ops існує лише в PostgreSQL; на інших БД — тільки стан.
+
+    Індекс з такою назвою міг створити колишній `manage.py setup_search` —
+    тоді повторно не створюємо.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        connection = schema_editor.connection
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            if self.index.name in connection.introspection.get_constraints(cursor, 'store_product'):
+                return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_catalogstats'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        AddTrigramIndex(
+            model_name='product',
+            index=GinIndex(fields=['search_text'], name='store_product_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
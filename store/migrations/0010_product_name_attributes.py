@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_product_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='display_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='is_runflat',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='RunFlat'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='is_xl',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='XL'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='load_index',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='speed_index',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_product_name_attributes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='stud_type',
+            field=models.CharField(db_index=True, default='Не шип', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='year',
+            field=models.IntegerField(db_index=True, default=2024),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_product_year_stud_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_quantity', models.IntegerField(default=0)),
+                ('cost_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('price', models.DecimalField(decimal_places=0, default=0, max_digits=10)),
+                ('photo_url', models.URLField(blank=True, max_length=1024, null=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Стейджинг синку',
+                'verbose_name_plural': 'Стейджинг синку',
+            },
+        ),
+    ]
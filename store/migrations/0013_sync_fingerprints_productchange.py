@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_syncstage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='supplier_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='syncstage',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.CreateModel(
+            name='ProductChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('new', '🆕 Новий товар'), ('price_up', '📈 Ціна зросла'), ('price_down', '📉 Ціна знизилась'), ('in_stock', '✅ Знову в наявності'), ('out_of_stock', '⛔ Закінчився'), ('delisted', '🚫 Зник з прайсу')], db_index=True, max_length=20)),
+                ('old_value', models.DecimalField(blank=True, decimal_places=0, max_digits=10, null=True)),
+                ('new_value', models.DecimalField(blank=True, decimal_places=0, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Зміна товару',
+                'verbose_name_plural': 'Журнал змін товарів',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_omega_supplier(apps, schema_editor):
+    # Досі єдиним постачальником, що обнуляв каталог, був sync_omega — існуючі
+    # товари лишаються "його", щоб обнулення поводилось як раніше
+    Product = apps.get_model('store', 'Product')
+    Product.objects.update(supplier='omega')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_sync_fingerprints_productchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='supplier',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(assign_omega_supplier, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='syncstage',
+            name='supplier',
+            field=models.CharField(default='omega', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='syncstage',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='syncstage',
+            unique_together={('product', 'supplier')},
+        ),
+    ]
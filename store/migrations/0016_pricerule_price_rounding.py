@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0015_product_identity_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='price_rounding',
+            field=models.CharField(choices=[('floor', 'Вниз до гривні'), ('up10', 'Вгору до 10 грн'), ('up50', 'Вгору до 50 грн'), ('end9', 'Вгору, закінчення на 9 (1239)')], default='floor', max_length=10, verbose_name='Округлення ціни'),
+        ),
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Назва')),
+                ('brand_category', models.CharField(blank=True, choices=[('budget', '💸 Економ'), ('medium', '⚖️ Ціна/Якість'), ('top', '💎 Топ')], max_length=20, verbose_name='Категорія бренду')),
+                ('seasonality', models.CharField(blank=True, choices=[('winter', 'Зимові'), ('summer', 'Літні'), ('all-season', 'Всесезонні')], max_length=20, verbose_name='Сезон')),
+                ('diameter_min', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Діаметр від')),
+                ('diameter_max', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Діаметр до')),
+                ('markup', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Націнка')),
+                ('rounding', models.CharField(choices=[('floor', 'Вниз до гривні'), ('up10', 'Вгору до 10 грн'), ('up50', 'Вгору до 50 грн'), ('end9', 'Вгору, закінчення на 9 (1239)')], default='floor', max_length=10, verbose_name='Округлення')),
+                ('priority', models.IntegerField(default=0, help_text='Більший перевіряється раніше', verbose_name='Пріоритет')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активне')),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='store.brand', verbose_name='Бренд')),
+            ],
+            options={
+                'verbose_name': 'Правило націнки',
+                'verbose_name_plural': 'Правила націнки',
+                'ordering': ['-priority', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_pricerule_price_rounding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('excel', '📥 Прайс-лист'), ('seo', '🚀 SEO'), ('photos', '📸 Фото')], max_length=20)),
+                ('status', models.CharField(choices=[('queued', '⏳ В черзі'), ('running', '⚙️ Виконується'), ('done', '✅ Готово'), ('failed', '💥 Помилка')], db_index=True, default='queued', max_length=20)),
+                ('file_path', models.CharField(max_length=500)),
+                ('original_name', models.CharField(blank=True, default='', max_length=255)),
+                ('start_row', models.IntegerField(default=2)),
+                ('end_row', models.IntegerField(blank=True, null=True)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('position', models.IntegerField(default=0)),
+                ('processed', models.IntegerField(default=0)),
+                ('created_count', models.IntegerField(default=0)),
+                ('updated_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('errors', models.TextField(blank=True, default='')),
+                ('message', models.CharField(blank=True, default='', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Фоновий імпорт',
+                'verbose_name_plural': 'Фонові імпорти',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
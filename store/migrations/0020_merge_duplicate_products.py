@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations
+
+from store.product_merge import duplicate_groups, merge_products
+
+
+def merge_duplicate_products(apps, schema_editor):
+    # Дублі ключа зливаються в найстаріший товар до появи обмеження
+    merge_products(duplicate_groups(apps.get_model), apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_order_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_products, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_merge_duplicate_products'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(condition=models.Q(('identity_key', ''), _negated=True), fields=('identity_key',), name='store_product_identity_key_uniq'),
+        ),
+    ]
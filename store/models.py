@@ -2,12 +2,29 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.contrib.postgres.indexes import GinIndex
 import decimal
-import re
+import math
+
+from .catalog_version import bump_catalog_version
+from .search import build_search_text
+from .slugs import SlugAllocator, product_slug_base
+from .tyre_attributes import apply_name_attributes, NAME_ATTRIBUTE_FIELDS
 
 # --- 0. НАЛАШТУВАННЯ ---
+ROUNDING_CHOICES = [
+    ('floor', 'Вниз до гривні'),
+    ('up10', 'Вгору до 10 грн'),
+    ('up50', 'Вгору до 50 грн'),
+    ('end9', 'Вгору, закінчення на 9 (1239)'),
+]
+
 class SiteSettings(models.Model):
     global_markup = models.DecimalField(max_digits=5, decimal_places=2, default='1.30', verbose_name="Націнка")
+    price_rounding = models.CharField(max_length=10, choices=ROUNDING_CHOICES, default='floor', verbose_name="Округлення ціни")
 
     class Meta: 
         verbose_name = "Налаштування"
@@ -15,11 +32,40 @@ class SiteSettings(models.Model):
 
     def __str__(self): return f"Націнка: {self.global_markup}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .pricing import bump_pricing_version
+        bump_pricing_version()
+
     @classmethod
     def get_solo(cls):
         obj, _ = cls.objects.get_or_create(id=1)
         return obj
 
+def get_global_markup():
+    try:
+        return decimal.Decimal(str(SiteSettings.get_solo().global_markup))
+    except:
+        return decimal.Decimal('1.30')
+
+def round_price(value, rounding='floor'):
+    # Ті самі правила, що й SQL-вираз у store/pricing.py
+    if rounding == 'up10':
+        return math.ceil(value / 10) * 10
+    if rounding == 'up50':
+        return math.ceil(value / 50) * 50
+    if rounding == 'end9':
+        return math.ceil((value + 1) / 10) * 10 - 1
+    return int(value)
+
+def calculate_price(cost_price, markup, discount_percent=0, rounding='floor'):
+    # Ціна продажу = собівартість × націнка − знижка, далі округлення (за замовчуванням вниз до гривні)
+    base_price = decimal.Decimal(str(cost_price)) * decimal.Decimal(str(markup))
+    if discount_percent > 0:
+        factor = (decimal.Decimal('100') - decimal.Decimal(discount_percent)) / decimal.Decimal('100')
+        base_price = base_price * factor
+    return round_price(base_price, rounding)
+
 # --- 1. БРЕНД ---
 class Brand(models.Model):
     CATEGORY_CHOICES = [('budget', '💸 Економ'), ('medium', '⚖️ Ціна/Якість'), ('top', '💎 Топ')]
@@ -41,10 +87,26 @@ class Brand(models.Model):
     seo_h1 = models.CharField(max_length=255, blank=True, verbose_name="SEO H1")
     seo_text = models.TextField(blank=True, verbose_name="SEO Текст (знизу)")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get('name')
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)[:110]
         super().save(*args, **kwargs)
+        # Назва бренду входить у пошуковий текст і вітринну назву товарів —
+        # товари переписуємо лише коли назву змінили (опис/SEO їх не стосуються)
+        if self.name != getattr(self, '_loaded_name', None):
+            products = list(self.product_set.all())
+            for product in products:
+                product.search_text = build_search_text(self.name, product.name)
+                apply_name_attributes(product, self.name)
+            Product.objects.bulk_update(products, ['search_text'] + NAME_ATTRIBUTE_FIELDS, batch_size=1000)
+            self._loaded_name = self.name
+        bump_catalog_version()
 
     def __str__(self):
         return self.name
@@ -71,6 +133,16 @@ class Product(models.Model):
     seo_title = models.CharField(max_length=500, blank=True, null=True, verbose_name="SEO Title")
     seo_h1 = models.CharField(max_length=255, blank=True, null=True, verbose_name="SEO H1")
     seo_text = models.TextField(blank=True, null=True, verbose_name="SEO Текст")
+
+    # Відбиток останнього рядка прайсу (store/sync_engine.py) — синк пише лише реальні зміни
+    supplier_fingerprint = models.CharField(max_length=32, blank=True, default='', editable=False)
+    # Код постачальника, чия пропозиція востаннє потрапила в товар: синк обнуляє лише "свої" товари
+    supplier = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
+
+    # Нормалізований бренд + назва для пошуку (store/search.py), GIN-триграми на PostgreSQL
+    search_text = models.CharField(max_length=512, blank=True, default='', editable=False)
+    # Ключ ідентичності (бренд|лінійка|розмір|індекси|XL/RF) — зіставлення рядків прайсів з товарами
+    identity_key = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False)
     
     description = models.TextField(blank=True)
     
@@ -84,52 +156,16 @@ class Product(models.Model):
     photo_url = models.URLField(max_length=1024, blank=True, null=True)
     photo = models.ImageField(upload_to='products/', blank=True, null=True)
 
-    @property
-    def display_name(self):
-        text = self.name
-        text = text.replace("Шина", "").replace("шина", "")
-        if self.brand:
-            text = re.sub(f"^{self.brand.name}", "", text, flags=re.IGNORECASE)
-            text = re.sub(f"\({self.brand.name}\)", "", text, flags=re.IGNORECASE)
-
-        features = []
-        if re.search(r'\bXL\b', text, re.IGNORECASE) or "EXTRA LOAD" in text.upper():
-            features.append("XL")
-            text = re.sub(r'\bXL\b', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\bEXTRA LOAD\b', '', text, flags=re.IGNORECASE)
-            
-        if re.search(r'\bRunFlat\b', text, re.IGNORECASE) or re.search(r'\bRFT\b', text, re.IGNORECASE):
-            features.append("RunFlat")
-            text = re.sub(r'\bRunFlat\b', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\bRFT\b', '', text, flags=re.IGNORECASE)
-
-        index_match = re.search(r'\b\d{2,3}[A-Z]\b', text)
-        index_val = ""
-        if index_match:
-            index_val = index_match.group(0)
-            text = text.replace(index_val, "") 
-
-        text = re.sub(r'\d{3}/\d{2}\s?[R|Z|r|z]\d{1,2}', '', text)
-        model_name = text.strip()
-        model_name = re.sub(r'^\W+|\W+$', '', model_name)
-        model_name = re.sub(r'\s+', ' ', model_name).strip()
-
-        size_clean = f"{self.width}/{self.profile} R{self.diameter}"
-        
-        final_parts = []
-        if model_name: final_parts.append(model_name)
-        if features: final_parts.extend(features)
-        final_parts.append(size_clean)
-        if index_val: final_parts.append(index_val)
-
-        res = " ".join(final_parts)
-        return res if len(res) > 5 else self.name
+    # Розібрана назва (store/tyre_attributes.py) — рахується в save(), а не на кожен показ
+    display_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    is_xl = models.BooleanField(default=False, db_index=True, verbose_name="XL")
+    is_runflat = models.BooleanField(default=False, db_index=True, verbose_name="RunFlat")
         
     country = models.CharField(max_length=50, blank=True, null=True)
-    year = models.IntegerField(default=2024)
-    load_index = models.CharField(max_length=10, blank=True, null=True)
-    speed_index = models.CharField(max_length=10, blank=True, null=True)
-    stud_type = models.CharField(max_length=50, default="Не шип")
+    year = models.IntegerField(default=2024, db_index=True)
+    load_index = models.CharField(max_length=10, blank=True, null=True, db_index=True)
+    speed_index = models.CharField(max_length=10, blank=True, null=True, db_index=True)
+    stud_type = models.CharField(max_length=50, default="Не шип", db_index=True)
     vehicle_type = models.CharField(max_length=50, default="Легковий")
 
     @property
@@ -138,44 +174,252 @@ class Product(models.Model):
             return int(self.price * 100 / (100 - self.discount_percent))
         return None
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # slug з БД: якщо його не чіпали, save() не перевіряє унікальність
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
+    def clean(self):
+        super().clean()
+        # identity_key не в формі адмінки — дубль ловимо тут, а не IntegrityError при save()
+        apply_name_attributes(self, self.brand.name if self.brand else '')
+        if self.identity_key and Product.objects.filter(identity_key=self.identity_key).exclude(pk=self.pk).exists():
+            raise ValidationError("Такий товар уже є: той самий бренд, модель, розмір, індекси і XL/RunFlat.")
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            slug_candidate = f"{self.brand.name}-{self.name}" if self.brand else self.name
-            slug_candidate = slug_candidate.replace('/', '')
-            self.slug = slugify(slug_candidate)
+            brand_name = self.brand.name if self.brand else ''
+            self.slug = SlugAllocator(exclude_id=self.pk).allocate(product_slug_base(brand_name, self.name))
+        elif self.slug != getattr(self, '_loaded_slug', None):
+            self.slug = SlugAllocator(exclude_id=self.pk).allocate(self.slug)
 
-        original_slug = self.slug
-        counter = 1
-        while Product.objects.filter(slug=self.slug).exclude(id=self.id).exists():
-            self.slug = f"{original_slug}-{counter}"
-            counter += 1
+        # Ручна правка/імпорт — наступний синк перезапише товар даними прайсу
+        self.supplier_fingerprint = ''
 
-        # 🔥 РОЗУМНА ЛОГІКА ЦІНОУТВОРЕННЯ 🔥
+        # 🔥 РОЗУМНА ЛОГІКА ЦІНОУТВОРЕННЯ 🔥 (правила націнки кешуються в процесі)
         if self.cost_price > 0 and self.price == 0:
-            try:
-                settings = SiteSettings.get_solo()
-                markup = decimal.Decimal(str(settings.global_markup))
-            except:
-                markup = decimal.Decimal('1.30')
-            
-            cost = decimal.Decimal(str(self.cost_price))
-            base_price = cost * markup
-            
-            if self.discount_percent > 0:
-                factor = (decimal.Decimal('100') - decimal.Decimal(self.discount_percent)) / decimal.Decimal('100')
-                final_price = base_price * factor
-            else:
-                final_price = base_price
-                
-            self.price = int(final_price)
-            
+            from .pricing import get_pricing
+            self.price = get_pricing().price_for(self)
+
+        brand_name = self.brand.name if self.brand else ''
+        self.search_text = build_search_text(brand_name, self.name)
+        apply_name_attributes(self, brand_name)
+
         super().save(*args, **kwargs)
+        self._loaded_slug = self.slug
+        bump_catalog_version()
 
     def __str__(self): return self.slug
 
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товари"
+        # Триграмний пошук по search_text (лише PostgreSQL, див. міграцію 0009)
+        indexes = [GinIndex(fields=['search_text'], name='store_product_search_trgm', opclasses=['gin_trgm_ops'])]
+        # Один товар на ключ ідентичності; порожній ключ (ще не розібраний) не рахується
+        constraints = [models.UniqueConstraint(fields=['identity_key'], condition=~models.Q(identity_key=''),
+                                               name='store_product_identity_key_uniq')]
+
+# --- 2.1 СТАТИСТИКА ЦІН (матеріалізована) ---
+# Один рядок на (бренд, сезон, розмір) + зведення, де 0 / '' означає "всі".
+# Перераховується синком та імпортом (store/catalog_stats.py), а SEO-сторінки
+# читають звідси "ціна від X грн" одним запитом по індексу.
+class CatalogStats(models.Model):
+    brand_key = models.IntegerField(default=0, verbose_name="ID бренду (0 = всі)")
+    seasonality = models.CharField(max_length=20, blank=True, default='', verbose_name="Сезон ('' = всі)")
+    width = models.IntegerField(default=0)
+    profile = models.IntegerField(default=0)
+    diameter = models.IntegerField(default=0)
+
+    min_price = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)
+    in_stock_count = models.IntegerField(default=0)
+    total_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Статистика цін"
+        verbose_name_plural = "Статистика цін"
+        unique_together = ('brand_key', 'seasonality', 'width', 'profile', 'diameter')
+
+    def __str__(self):
+        return f"{self.brand_key}/{self.seasonality or '*'}/{self.width}-{self.profile}-R{self.diameter}"
+
+# --- 2.2 СТЕЙДЖИНГ СИНКУ ---
+# Залишки й ціни з прайсу постачальника спершу складаються сюди (по сторінках,
+# переживає перезапуск), а в store_product потрапляють одним коротким
+# set-based UPDATE наприкінці синку (store/sync_engine.apply_stage).
+# Кожен постачальник має свій рядок на товар; пропозиції кількох постачальників
+# зводяться в один рядок правилом злиття (store/sync_engine.merge_stage).
+class SyncStage(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    supplier = models.CharField(max_length=20, default='omega')
+    stock_quantity = models.IntegerField(default=0)
+    cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=0, default=0)
+    photo_url = models.URLField(max_length=1024, blank=True, null=True)
+    fingerprint = models.CharField(max_length=32, blank=True, default='')
+
+    class Meta:
+        verbose_name = "Стейджинг синку"
+        verbose_name_plural = "Стейджинг синку"
+        unique_together = ('product', 'supplier')
+
+# --- 2.3 ЖУРНАЛ ЗМІН ТОВАРІВ ---
+# Що саме змінив синк: кеші, фід і розсилки читають інкрементально
+# (id > останнього обробленого), а не переглядають весь каталог.
+class ProductChange(models.Model):
+    KIND_CHOICES = [
+        ('new', '🆕 Новий товар'),
+        ('price_up', '📈 Ціна зросла'),
+        ('price_down', '📉 Ціна знизилась'),
+        ('in_stock', '✅ Знову в наявності'),
+        ('out_of_stock', '⛔ Закінчився'),
+        ('delisted', '🚫 Зник з прайсу'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='changes')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, db_index=True)
+    old_value = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)
+    new_value = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Зміна товару"
+        verbose_name_plural = "Журнал змін товарів"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.product_id}"
+
+# --- 2.4 ПРАВИЛА НАЦІНКИ ---
+# Націнка й округлення для частини каталогу (бренд, категорія бренду, діаметр,
+# сезон). Товар отримує перше правило, що підійшло (більший пріоритет —
+# раніше), інакше глобальну націнку з налаштувань. Перерахунок усього
+# каталогу — кілька SQL UPDATE (store/pricing.reprice).
+class PriceRule(models.Model):
+    name = models.CharField(max_length=100, blank=True, verbose_name="Назва")
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Бренд")
+    brand_category = models.CharField(max_length=20, choices=Brand.CATEGORY_CHOICES, blank=True, verbose_name="Категорія бренду")
+    seasonality = models.CharField(max_length=20, choices=Product.SEASON_CHOICES, blank=True, verbose_name="Сезон")
+    diameter_min = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Діаметр від")
+    diameter_max = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Діаметр до")
+    markup = models.DecimalField(max_digits=5, decimal_places=2, verbose_name="Націнка")
+    rounding = models.CharField(max_length=10, choices=ROUNDING_CHOICES, default='floor', verbose_name="Округлення")
+    priority = models.IntegerField(default=0, verbose_name="Пріоритет", help_text="Більший перевіряється раніше")
+    is_active = models.BooleanField(default=True, verbose_name="Активне")
+
+    class Meta:
+        verbose_name = "Правило націнки"
+        verbose_name_plural = "Правила націнки"
+        ordering = ['-priority', 'id']
+
+    def __str__(self):
+        return self.name or f"Правило #{self.pk}: ×{self.markup}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .pricing import bump_pricing_version
+        bump_pricing_version()
+
+    def matches(self, brand, diameter, seasonality):
+        if self.brand_id and (brand is None or brand.pk != self.brand_id): return False
+        if self.brand_category and (brand is None or brand.category != self.brand_category): return False
+        if self.seasonality and seasonality != self.seasonality: return False
+        if self.diameter_min is not None and diameter < self.diameter_min: return False
+        if self.diameter_max is not None and diameter > self.diameter_max: return False
+        return True
+
+    def as_q(self):
+        """Той самий відбір, що й matches(), для SQL."""
+        q = models.Q()
+        if self.brand_id: q &= models.Q(brand_id=self.brand_id)
+        if self.brand_category: q &= models.Q(brand__category=self.brand_category)
+        if self.seasonality: q &= models.Q(seasonality=self.seasonality)
+        if self.diameter_min is not None: q &= models.Q(diameter__gte=self.diameter_min)
+        if self.diameter_max is not None: q &= models.Q(diameter__lte=self.diameter_max)
+        return q
+
+
+@receiver(post_delete, sender=PriceRule)
+def price_rule_deleted(sender, instance, **kwargs):
+    # Сигнал, а не PriceRule.delete: дія адмінки "видалити вибрані" і каскад від
+    # бренду видаляють правила queryset-ом, оминаючи delete() моделі
+    from .pricing import bump_pricing_version
+    bump_pricing_version()
+
+# --- 2.5 ФОНОВІ ІМПОРТИ ---
+# Завантажений в адмінці файл лягає на диск, а обробляє його воркер
+# (manage.py run_import_jobs) частинами — веб-воркер gunicorn не чекає.
+# position — останній оброблений рядок файлу: перерваний імпорт продовжується з нього.
+class ImportJob(models.Model):
+    KIND_CHOICES = [
+        ('excel', '📥 Прайс-лист'),
+        ('seo', '🚀 SEO'),
+        ('photos', '📸 Фото'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', '⏳ В черзі'),
+        ('running', '⚙️ Виконується'),
+        ('done', '✅ Готово'),
+        ('failed', '💥 Помилка'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    file_path = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255, blank=True, default='')
+    start_row = models.IntegerField(default=2)
+    end_row = models.IntegerField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    total_rows = models.IntegerField(null=True, blank=True)
+    position = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    unchanged_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.TextField(blank=True, default='')
+    message = models.CharField(max_length=500, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Фоновий імпорт"
+        verbose_name_plural = "Фонові імпорти"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()}: {self.original_name}"
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.processed:
+            return 0
+        end = self.finished_at or self.heartbeat_at or self.started_at
+        elapsed = (end - self.started_at).total_seconds()
+        return self.processed / elapsed if elapsed > 0 else 0
+
+    @property
+    def percent(self):
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        done = max(self.position - self.start_row + 1, 0)
+        total = (min(self.end_row, self.total_rows) if self.end_row else self.total_rows) - self.start_row + 1
+        return min(int(done * 100 / total), 99) if total > 0 else 0
 
 # --- 3. ЗАМОВЛЕННЯ ---
 class Order(models.Model):
@@ -200,9 +444,21 @@ class Order(models.Model):
     email = models.EmailField(blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
     nova_poshta_branch = models.CharField(max_length=100, blank=True, null=True)
-    
+
+    # Підсумки зберігаються в замовленні (перераховує сигнал order_item_changed) —
+    # список замовлень показує і сортує суму без JOIN-ів до позицій
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False, verbose_name="Сума")
+    items_count = models.IntegerField(default=0, editable=False, verbose_name="Шин, шт.")
+
     def __str__(self): return f"Замовлення #{self.id}"
 
+    def recalculate_totals(self):
+        totals = self.items.aggregate(amount=models.Sum(models.F('quantity') * models.F('price_at_purchase')),
+                                      count=models.Sum('quantity'))
+        self.total_amount = totals['amount'] or 0
+        self.items_count = totals['count'] or 0
+        Order.objects.filter(pk=self.pk).update(total_amount=self.total_amount, items_count=self.items_count)
+
     class Meta:
         verbose_name = "Замовлення"
         verbose_name_plural = "Замовлення"
@@ -219,6 +475,18 @@ class OrderItem(models.Model):
         verbose_name = "Товар у замовленні"
         verbose_name_plural = "Товари у замовленнях"
 
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def order_item_changed(sender, instance, **kwargs):
+    # Як і для PriceRule — сигнал, а не save()/delete() моделі: "видалити вибрані"
+    # в адмінці йде queryset-ом. bulk_create сигналів не шле — checkout рахує
+    # підсумки сам, один раз на замовлення.
+    origin = kwargs.get('origin')
+    if isinstance(origin, Order) or getattr(origin, 'model', None) is Order:
+        return  # каскад від видалення самого замовлення
+    order = instance.order if OrderItem.order.is_cached(instance) else Order(pk=instance.order_id)
+    order.recalculate_totals()
+
 # --- 4. ДОДАТКОВІ ТА ВІДГУКИ ---
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
@@ -0,0 +1,195 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.core.cache import cache
+
+from .json_stream import JsonStream
+from .supplier_row import SupplierRow
+
+# --- 🌐 КЛІЄНТ OMEGA API ---
+# Сторінки getTires качаються паралельно (обмежений пул потоків) через одну
+# keep-alive сесію, з лімітом запитів на секунду і повтором з backoff.
+# Споживач (запис у БД) отримує сторінки строго по порядку з обмеженої черги
+# завантажених наперед сторінок, тож мережа і база працюють одночасно.
+# Після кожної записаної сторінки зберігається чекпоінт — перерваний синк
+# продовжить з неї, а не з початку.
+# Відповідь читається потоком: товари розбираються по одному і одразу
+# стискаються в SupplierRow, тож ні повний текст сторінки, ні тисяча
+# словників з Info/Rests не тримаються в пам'яті разом.
+
+OMEGA_URL = "https://public.omega.page/public/api/v1.0/searchcatalog/getTires"
+SIZE_RE = re.compile(r'(\d{3})/(\d{2,3})\s?[R|r](\d{2})')
+CHECKPOINT_KEY = 'omega_sync_checkpoint'
+CHECKPOINT_TIMEOUT = 60 * 60 * 6
+STREAM_CHUNK = 64 * 1024
+
+
+class OmegaError(Exception):
+    """Помилка, яку повтор не виправить (напр. API повернув Success: false)."""
+
+
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second and per_second > 0 else 0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+class OmegaClient:
+    # Предикат row -> bool: чи тримати повний опис рядка (None — тримати всі).
+    # Синк ставить ProductSyncEngine.wants_info — опис лише для нових товарів.
+    keep_info = None
+
+    def __init__(self, key, url=OMEGA_URL, session=None, timeout=60, rate_limit=2.0,
+                 retries=4, backoff=1.0, workers=4):
+        self.key = key
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_limit)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+    def parse(self, item):
+        """Рядок getTires -> SupplierRow для ProductSyncEngine (None — не шина)."""
+        name_omega = item.get('DescriptionUkr', '')
+        if not name_omega or "Шина" not in name_omega:
+            return None
+
+        # Розрахунок залишку
+        total_stock = 0
+        for rest in item.get('Rests', []):
+            val = str(rest.get('Value', '0')).replace('>', '')
+            try:
+                total_stock += int(val)
+            except: continue
+
+        if total_stock > 20: total_stock = 20
+
+        # Парсинг розмірів (Ширина/Профіль RДіаметр)
+        size_match = SIZE_RE.search(name_omega)
+
+        row = SupplierRow(
+            name=name_omega.replace('Шина ', '').strip(),
+            brand=item.get('BrandDescription', 'Unknown').strip(),
+            width=int(size_match.group(1)) if size_match else 0,
+            profile=int(size_match.group(2)) if size_match else 0,
+            diameter=int(size_match.group(3)) if size_match else 0,
+            cost=item.get('CustomerPrice', 0),
+            stock=total_stock,
+            image=item.get('ImageUrl', ''),
+            # Новим товарам даємо хоч якийсь текст, потім ШІ його перепише
+            # (існуючим опис не чіпаємо, щоб не затирати ШІ-описи)
+            info=item.get('Info', ''),
+        )
+        if self.keep_info is not None and not self.keep_info(row):
+            row.info = ''
+        return row
+
+    def read_page(self, chunks):
+        """Потоковий розбір відповіді -> (rows, кількість товарів у відповіді, total)."""
+        stream = JsonStream(chunks)
+        success, errors, total, count, rows = None, None, 0, 0, []
+        for key in stream.iter_object():
+            if key == 'Data' and stream.peek() == '{':
+                for data_key in stream.iter_object():
+                    if data_key == 'Result' and stream.peek() == '[':
+                        for _ in stream.iter_array():
+                            row = self.parse(stream.value())
+                            count += 1
+                            if row:
+                                rows.append(row)
+                    elif data_key == 'Total':
+                        total = stream.value() or 0
+                    else:
+                        stream.value()
+            elif key == 'Success':
+                success = stream.value()
+            elif key == 'Errors':
+                errors = stream.value()
+            else:
+                stream.value()
+        if not success:
+            raise OmegaError(f"Помилка API: {errors}")
+        return rows, count, total
+
+    def fetch_page(self, start, count):
+        """Повертає (rows, кількість товарів у відповіді, total) для сторінки з позиції start."""
+        payload = {"From": start, "Count": count, "Key": self.key}
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout, stream=True)
+                try:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        raise requests.HTTPError(f"HTTP {response.status_code}")
+                    return self.read_page(response.iter_content(chunk_size=STREAM_CHUNK))
+                finally:
+                    response.close()
+            except (requests.RequestException, ValueError) as e:
+                if attempt >= self.retries:
+                    raise OmegaError(f"Сторінка {start}: {e}") from e
+                time.sleep(self.backoff * (2 ** attempt) + random.uniform(0, self.backoff))
+
+    def iter_pages(self, start=0, page_size=1000, prefetch=None):
+        """Генератор (offset, rows, count, total) по порядку; наступні сторінки вже качаються."""
+        rows, count, total = self.fetch_page(start, page_size)
+        yield start, rows, count, total
+        if not count:
+            return
+
+        offsets = iter(range(start + page_size, total, page_size))
+        prefetch = prefetch or self.workers * 2
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='omega')
+        pending = deque()
+        try:
+            for offset in offsets:
+                pending.append((offset, pool.submit(self.fetch_page, offset, page_size)))
+                if len(pending) >= prefetch:
+                    break
+            while pending:
+                offset, future = pending.popleft()
+                rows, count, total = future.result()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append((next_offset, pool.submit(self.fetch_page, next_offset, page_size)))
+                yield offset, rows, count, total
+                if not count:
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def load_checkpoint(key=CHECKPOINT_KEY):
+    return cache.get(key)
+
+
+def save_checkpoint(next_from, page_size, key=CHECKPOINT_KEY):
+    cache.set(key, {'next_from': next_from, 'page_size': page_size, 'saved_at': time.time()}, CHECKPOINT_TIMEOUT)
+
+
+def clear_checkpoint(key=CHECKPOINT_KEY):
+    cache.delete(key)
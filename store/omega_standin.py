@@ -0,0 +1,147 @@
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- 🧪 ЛОКАЛЬНА ЗАМІНА OMEGA API ---
+# Віддає сторінки getTires у форматі справжнього API без мережі і без
+# бойового ключа: синтетичний каталог заданого розміру або записаний
+# `sync_omega --record` JSONL. Затримка і частка помилок налаштовуються.
+#   StandinTransport — підставляється в OmegaClient(session=...) в тому ж процесі;
+#   serve()          — HTTP-сервер для `sync_omega --url http://127.0.0.1:8765/`.
+
+BRANDS = ['Michelin', 'Continental', 'Bridgestone', 'Goodyear', 'Nokian', 'Pirelli', 'Hankook', 'Yokohama',
+          'Dunlop', 'Kumho', 'Nexen', 'Toyo', 'Leao', 'Rosava', 'Premiorri', 'Matador', 'Barum', 'Kormoran',
+          'Sava', 'Debica', 'Lassa', 'Petlas', 'Sailun', 'Triangle']
+MODELS = ['Alpin', 'WinterContact', 'Blizzak', 'UltraGrip', 'Hakkapeliitta', 'Cinturato', 'Ventus', 'BluEarth',
+          'SP Sport', 'Ecsta', 'N\'blue', 'Proxes', 'Nova-Force', 'Snowgard', 'Solazo', 'MP 47', 'Polaris']
+SIZES = [(175, 70, 13), (185, 65, 14), (185, 65, 15), (195, 65, 15), (205, 55, 16), (205, 60, 16),
+         (215, 55, 17), (215, 60, 16), (225, 45, 17), (225, 55, 17), (235, 55, 18), (245, 45, 18)]
+SUFFIXES = ['91T', '94H XL', '88T', '95V', '99W XL', '91H', '96T шип', '94V RunFlat']
+
+
+def _rand(i, salt):
+    # Детерміноване "випадкове" число для i-го товару — сторінки однакові між запусками
+    return zlib.crc32(f"{salt}:{i}".encode())
+
+
+class SyntheticCatalog:
+    def __init__(self, total, mutate=0.0, mutate_seed=1):
+        self.total = total
+        self.mutate = mutate
+        self.mutate_seed = mutate_seed
+
+    def item(self, i):
+        brand = BRANDS[i % len(BRANDS)]
+        w, p, d = SIZES[_rand(i, 'size') % len(SIZES)]
+        price = 1500 + _rand(i, 'price') % 6000
+        stock = _rand(i, 'stock') % 24
+        if self.mutate and _rand(i, f'mut{self.mutate_seed}') % 10000 < self.mutate * 10000:
+            price = int(price * 1.05)
+            stock = (stock + 3) % 24
+        return {
+            'DescriptionUkr': f"Шина {brand} {MODELS[_rand(i, 'model') % len(MODELS)]} {i} {w}/{p}R{d} "
+                              f"{SUFFIXES[_rand(i, 'sfx') % len(SUFFIXES)]}",
+            'BrandDescription': brand,
+            'CustomerPrice': price,
+            'ImageUrl': f"https://img.example.com/tyres/{i}.jpg" if i % 3 else '',
+            'Info': f"Синтетична шина #{i}",
+            'Rests': [{'Value': str(stock)}, {'Value': '>4' if i % 5 == 0 else '0'}],
+        }
+
+    def page(self, start, count):
+        return [self.item(i) for i in range(start, min(start + count, self.total))]
+
+
+class FixtureCatalog:
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.items = [json.loads(line) for line in f if line.strip()]
+        self.total = len(self.items)
+
+    def page(self, start, count):
+        return self.items[start:start + count]
+
+
+def _page_payload(catalog, payload):
+    start, count = int(payload.get('From', 0)), int(payload.get('Count', 1000))
+    return {'Success': True, 'Errors': [], 'Data': {'Total': catalog.total, 'Result': catalog.page(start, count)}}
+
+
+def row_to_item(row):
+    """SupplierRow -> рядок getTires (для запису фікстури `sync_omega --record`)."""
+    return {
+        'DescriptionUkr': f"Шина {row.name}",
+        'BrandDescription': row.brand,
+        'CustomerPrice': float(row.cost or 0),
+        'ImageUrl': row.image or '',
+        'Info': row.info or '',
+        'Rests': [{'Value': str(row.stock)}],
+    }
+
+
+class StandinResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        body = json.dumps(self._data, ensure_ascii=False).encode()
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class StandinTransport:
+    """Замінник requests.Session для OmegaClient: лише post()."""
+
+    def __init__(self, catalog, latency=0.0, error_rate=0.0, seed=0):
+        self.catalog = catalog
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return StandinResponse(503, {'Success': False, 'Errors': ['Service Unavailable']})
+        return StandinResponse(200, _page_payload(self.catalog, json or {}))
+
+
+def serve(catalog, host='127.0.0.1', port=8765, latency=0.0, error_rate=0.0):
+    transport = StandinTransport(catalog, latency=latency, error_rate=error_rate)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                payload = {}
+            response = transport.post(self.path, json=payload)
+            body = json.dumps(response.json(), ensure_ascii=False).encode()
+            self.send_response(response.status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,98 @@
+import hashlib
+import re
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .cart import Cart
+from .catalog_version import get_catalog_version
+from .pagination import SEO_PAGES
+
+# --- 🧊 КЕШ СТОРІНОК SEO-МАТРИЦІ ---
+# Анонімні GET-и на /shiny/... та /catalog/ кешуються цілою сторінкою. Ключ =
+# версія каталогу + шлях + нормалізований query string, тож синк чи імпорт
+# "скидає" всі сторінки простою зміною версії.
+# Персональні шматки (лічильник кошика, CSRF-токен) у кеш потрапляють як
+# плейсхолдери і підставляються для кожного відвідувача окремо.
+# У ключ йдуть лише параметри фільтрів і сортування каталогу; запит з
+# курсором, невідомим параметром чи глибокою сторінкою рендериться без кешу —
+# інакше боти з унікальними query string витісняють зі спільного кешу справжні сторінки.
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+CSRF_PLACEHOLDER = '__R16_CSRF_TOKEN__'
+
+IGNORED_PARAMS = ('gclid', 'fbclid', 'yclid', '_ga')
+# Фільтри (в т.ч. ATTRIBUTE_FILTERS з store/views.py), пошук, сортування, номер сторінки
+CACHED_PARAMS = ('season', 'brand', 'width', 'profile', 'diameter', 'query', 'ordering', 'page',
+                 'load', 'speed', 'stud', 'year', 'xl', 'runflat')
+CACHED_PAGES = {str(number) for number in range(1, SEO_PAGES + 1)}
+CART_BADGE_RE = re.compile(r'(<span id="cart-badge(?:-mobile)?">)\(\d+\)(</span>)')
+
+
+def normalized_query(request):
+    """Query string для ключа кешу; None — сторінку не кешуємо."""
+    params = []
+    for key in sorted(request.GET.keys()):
+        if key.startswith('utm_') or key in IGNORED_PARAMS:
+            continue
+        if key not in CACHED_PARAMS:
+            return None
+        if key == 'page' and not set(request.GET.getlist(key)) <= CACHED_PAGES:
+            return None
+        for value in sorted(request.GET.getlist(key)):
+            if value != '':
+                params.append(f"{key}={value}")
+    return '&'.join(params)
+
+
+def page_cache_key(request):
+    query = normalized_query(request)
+    if query is None:
+        return None
+    raw = f"{request.path}?{query}"
+    return f"page_{get_catalog_version()}_{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def is_page_cache_render(request):
+    return getattr(request, 'page_cache_render', False)
+
+
+def _personalize(request, content):
+    cart_len = len(Cart(request))
+    content = CART_BADGE_RE.sub(lambda m: f"{m.group(1)}({cart_len}){m.group(2)}", content)
+    return content.replace(CSRF_PLACEHOLDER, get_token(request))
+
+
+def catalog_page_cache(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        if key is None:
+            return view(request, *args, **kwargs)
+        cached = cache.get(key)
+        if cached is None:
+            request.page_cache_render = True
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                request.page_cache_render = False
+            if response.status_code != 200 or getattr(response, 'streaming', False):
+                return response
+            cached = {
+                'content': response.content.decode(response.charset),
+                'content_type': response['Content-Type'],
+            }
+            cache.set(key, cached, PAGE_CACHE_TIMEOUT)
+            state = 'MISS'
+        else:
+            state = 'HIT'
+
+        response = HttpResponse(_personalize(request, cached['content']), content_type=cached['content_type'])
+        response['X-Page-Cache'] = state
+        return response
+    return wrapper
@@ -0,0 +1,205 @@
+import base64
+import hashlib
+import json
+import math
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .catalog_version import get_catalog_version
+
+# --- 📄 KEYSET-ПАГІНАЦІЯ КАТАЛОГУ ---
+# Перші сторінки віддаємо звичайним ?page=N (їх індексує Google, OFFSET там
+# дешевий). Далі переходимо на непрозорий ?cursor=..., який містить ключ
+# сортування останнього/першого товару сторінки, тож глибокі сторінки — це
+# WHERE (ключ) > (...) LIMIT 13 без OFFSET. Загальна кількість рахується
+# COUNT(*) раз на COUNT_CACHE_TIMEOUT (або до зміни версії каталогу).
+# ?page=N далі за SEO_PAGES обрізається до SEO_PAGES: глибше — лише курсором,
+# тож бот, що перебирає номери сторінок, не запускає OFFSET-скан.
+# Курсор приходить від клієнта: ключ приводиться до типів полів сортування,
+# підроблений чи зламаний курсор — просто перша сторінка.
+
+SEO_PAGES = 5
+COUNT_CACHE_TIMEOUT = 60 * 10
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('k'), list):
+        return None
+    return data
+
+
+class KeysetPaginator:
+    ELLIPSIS = '…'
+
+    def __init__(self, queryset, per_page, ordering, seo_pages=SEO_PAGES):
+        # ordering — поля сортування; останнє має бути унікальним (id)
+        self.ordering = list(ordering)
+        self.fields = [(f.lstrip('-'), f.startswith('-')) for f in self.ordering]
+        self.object_list = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+        self.seo_pages = seo_pages
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+        key = f"keyset_count_{get_catalog_version()}_{digest}"
+        return cache.get_or_set(key, self.object_list.count, COUNT_CACHE_TIMEOUT)
+
+    @cached_property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def ordering_key(self):
+        return ','.join(self.ordering)
+
+    def _key_of(self, obj):
+        return [str(getattr(obj, name)) for name, _ in self.fields]
+
+    def _field(self, name):
+        # Поле сортування — колонка моделі або анотація (status_order, search_rank)
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def _coerce_key(self, key):
+        """Ключ з курсора -> значення типів полів; None — курсор підроблений."""
+        try:
+            values = [self._field(name).to_python(value) for (name, _), value in zip(self.fields, key)]
+        except (ValidationError, FieldDoesNotExist, TypeError, ValueError):
+            return None
+        if any(value is None for value in values):
+            return None
+        return values
+
+    def _seek(self, key, forward=True):
+        # (a, b, c) "після" (x, y, z) з урахуванням напрямку кожного поля:
+        # a>x OR (a=x AND b>y) OR (a=x AND b=y AND c>z)
+        condition = Q()
+        equal = {}
+        for (name, desc), value in zip(self.fields, key):
+            lookup = 'lt' if desc == forward else 'gt'
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def page_from_request(self, request):
+        cursor = decode_cursor(request.GET.get('cursor', ''))
+        if cursor and cursor.get('o') == self.ordering_key and len(cursor['k']) == len(self.fields):
+            key = self._coerce_key(cursor['k'])
+            if key is not None:
+                return self._cursor_page(cursor, key)
+            return self._offset_page(1)
+
+        try:
+            number = max(1, int(request.GET.get('page', 1)))
+        except (TypeError, ValueError):
+            number = 1
+        return self._offset_page(min(number, self.seo_pages))
+
+    def _offset_page(self, number):
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            # Сторінка за межами (напр. старе посилання) — перша, без COUNT
+            number = 1
+            rows = list(self.object_list[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], number, self, has_next=has_next, has_previous=number > 1)
+
+    def _cursor_page(self, cursor, key):
+        number = cursor.get('p') if isinstance(cursor.get('p'), int) else 1
+        forward = cursor.get('d') != 'prev'
+        qs = self.object_list.filter(self._seek(key, forward))
+        if forward:
+            rows = list(qs[:self.per_page + 1])
+            has_next, has_previous = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            rows = list(qs.reverse()[:self.per_page + 1])
+            has_next, has_previous = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+        if not has_previous or number < 1:
+            number = 1
+        return KeysetPage(rows, number, self, has_next=has_next, has_previous=has_previous)
+
+
+class KeysetPage:
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def _query_for(self, number, obj, direction):
+        if number <= self.paginator.seo_pages:
+            return f"page={number}"
+        return "cursor=" + encode_cursor({
+            'p': number,
+            'd': direction,
+            'o': self.paginator.ordering_key,
+            'k': self.paginator._key_of(obj),
+        })
+
+    @property
+    def next_query(self):
+        if not self._has_next:
+            return ""
+        return self._query_for(self.number + 1, self.object_list[-1], 'next')
+
+    @property
+    def previous_query(self):
+        if not self._has_previous:
+            return ""
+        return self._query_for(self.number - 1, self.object_list[0], 'prev')
+
+    @property
+    def page_range(self):
+        # 1 2 3 4 5 … 9 … — на глибоких сторінках лише поточна без посилань
+        paginator = self.paginator
+        last_known = max(paginator.num_pages, self.number + (1 if self._has_next else 0))
+        pages = list(range(1, min(paginator.seo_pages, last_known) + 1))
+        if self.number > paginator.seo_pages:
+            if self.number > paginator.seo_pages + 1:
+                pages.append(paginator.ELLIPSIS)
+            pages.append(self.number)
+        if last_known > pages[-1]:
+            pages.append(paginator.ELLIPSIS)
+        return pages
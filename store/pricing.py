@@ -0,0 +1,175 @@
+import decimal
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Value, Count, Sum, DecimalField, ExpressionWrapper
+from django.db.models.functions import Ceil, Floor
+
+from .models import Product, PriceRule, ProductChange, SiteSettings, calculate_price
+from .catalog_stats import refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+
+# --- 💲 ЦІНОУТВОРЕННЯ ---
+# Правила націнки (PriceRule) + глобальна націнка з налаштувань живуть у
+# пам'яті процесу і перечитуються лише коли змінилась версія цін у спільному
+# кеші — Product.save і синк більше не ходять у SiteSettings на кожен товар.
+# reprice() перераховує весь каталог set-based: по одному UPDATE на правило
+# (товари, які не забрало правило з вищим пріоритетом) + один на решту,
+# в одній транзакції; dry_run лише рахує, що зміниться.
+
+PRICING_VERSION_KEY = 'pricing_version'
+BULK_BATCH = 1000
+# Захист від похибки float у SQLite: точні значення мають ≤ 6 знаків після коми
+EPSILON = decimal.Decimal('0.0000001')
+PRICE_FIELD = DecimalField(max_digits=16, decimal_places=6)
+
+_lock = threading.Lock()
+_pricing = None
+_pricing_version = None
+
+
+def get_pricing_version():
+    version = cache.get(PRICING_VERSION_KEY)
+    if version is None:
+        cache.add(PRICING_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PRICING_VERSION_KEY, 0)
+    return version
+
+
+def bump_pricing_version():
+    cache.set(PRICING_VERSION_KEY, time.time_ns(), None)
+
+
+class Pricing:
+    def __init__(self, markup, rounding, rules):
+        self.markup = decimal.Decimal(str(markup))
+        self.rounding = rounding
+        self.rules = rules
+        raw = f"{self.markup}|{rounding}|" + "|".join(
+            f"{r.pk}:{r.brand_id}:{r.brand_category}:{r.seasonality}:{r.diameter_min}:{r.diameter_max}:{r.markup}:{r.rounding}"
+            for r in rules)
+        # Входить у відбиток рядка прайсу: зміна правил = товар переписується синком
+        self.signature = hashlib.md5(raw.encode()).hexdigest()[:12]
+
+    @classmethod
+    def load(cls):
+        settings = SiteSettings.get_solo()
+        rules = list(PriceRule.objects.filter(is_active=True).select_related('brand'))
+        return cls(settings.global_markup, settings.price_rounding, rules)
+
+    def terms(self, brand, diameter, seasonality):
+        for rule in self.rules:
+            if rule.matches(brand, diameter, seasonality):
+                return rule.markup, rule.rounding
+        return self.markup, self.rounding
+
+    def price(self, cost, discount_percent, brand, diameter, seasonality):
+        if not cost or cost <= 0:
+            return 0
+        markup, rounding = self.terms(brand, diameter, seasonality)
+        return calculate_price(cost, markup, discount_percent, rounding)
+
+    def price_for(self, product):
+        return self.price(product.cost_price, product.discount_percent, product.brand,
+                          product.diameter, product.seasonality)
+
+
+def get_pricing():
+    global _pricing, _pricing_version
+    version = get_pricing_version()
+    with _lock:
+        if _pricing is None or _pricing_version != version:
+            _pricing = Pricing.load()
+            _pricing_version = version
+        return _pricing
+
+
+def price_expression(markup, rounding):
+    """SQL-вираз ціни: собівартість × націнка × (100 − знижка)/100 з округленням як round_price()."""
+    # × 0.01, а не / 100: у SQLite ціле / ціле — ціле ділення (1 грн × 95 / 100 = 0)
+    raw = ExpressionWrapper(
+        F('cost_price') * Value(decimal.Decimal(str(markup))) * (Value(100) - F('discount_percent'))
+        * Value(decimal.Decimal('0.01')),
+        output_field=PRICE_FIELD,
+    )
+    eps = Value(EPSILON, output_field=PRICE_FIELD)
+    if rounding == 'up10':
+        return Ceil((raw - eps) / Value(10)) * Value(10)
+    if rounding == 'up50':
+        return Ceil((raw - eps) / Value(50)) * Value(50)
+    if rounding == 'end9':
+        return Ceil((raw + Value(1) - eps) / Value(10)) * Value(10) - Value(1)
+    return Floor(raw + eps)
+
+
+def _steps(pricing):
+    # (назва, queryset, вираз): кожен товар потрапляє рівно в один крок
+    base = Product.objects.filter(cost_price__gt=0)
+    claimed = Q()
+    steps = []
+    for rule in pricing.rules:
+        rule_q = rule.as_q()
+        steps.append((str(rule), base.filter(rule_q).exclude(claimed), price_expression(rule.markup, rule.rounding)))
+        claimed |= rule_q
+    steps.append(("Глобальна націнка", base.exclude(claimed) if pricing.rules else base,
+                  price_expression(pricing.markup, pricing.rounding)))
+    return steps
+
+
+def reprice(dry_run=False, sample=10):
+    """Перерахунок цін усього каталогу за поточними правилами.
+
+    Повертає зведення: скільки цін зміниться/змінилось (вгору/вниз), сума
+    різниці, розбивка по правилах і приклади (id, назва, стара, нова ціна).
+    """
+    pricing = Pricing.load()
+    summary = {'changed': 0, 'up': 0, 'down': 0, 'delta': 0, 'rules': [], 'samples': [], 'dry_run': dry_run}
+
+    with transaction.atomic():
+        log = []
+        for name, queryset, expression in _steps(pricing):
+            changed = queryset.exclude(price=expression)
+            preview = changed.annotate(new_price=expression)
+            stats = preview.aggregate(
+                n=Count('id'),
+                up=Count('id', filter=Q(new_price__gt=F('price'))),
+                delta=Sum(F('new_price') - F('price'), output_field=PRICE_FIELD),
+            )
+            if not stats['n']:
+                continue
+            summary['rules'].append((name, stats['n']))
+            summary['changed'] += stats['n']
+            summary['up'] += stats['up']
+            summary['down'] += stats['n'] - stats['up']
+            summary['delta'] += int(stats['delta'] or 0)
+            if len(summary['samples']) < sample:
+                summary['samples'] += list(preview.values_list('id', 'name', 'price', 'new_price')
+                                           .order_by('id')[:sample - len(summary['samples'])])
+            if dry_run:
+                continue
+            log += [
+                ProductChange(product_id=pid, kind='price_up' if new > old else 'price_down',
+                              old_value=old, new_value=new)
+                for pid, old, new in preview.values_list('id', 'price', 'new_price')
+                if old
+            ]
+            changed.update(price=expression)
+        if not dry_run:
+            ProductChange.objects.bulk_create(log, batch_size=BULK_BATCH)
+
+    if summary['changed'] and not dry_run:
+        refresh_catalog_stats()
+        bump_catalog_version()
+    return summary
+
+
+def format_summary(summary):
+    verb = "Зміниться" if summary['dry_run'] else "Змінено"
+    lines = [f"{verb} цін: {summary['changed']} (↑ {summary['up']}, ↓ {summary['down']}), "
+             f"сумарна різниця {summary['delta']:+} грн"]
+    lines += [f"  • {name}: {count}" for name, count in summary['rules']]
+    lines += [f"  {pid} {name}: {old} → {new}" for pid, name, old, new in summary['samples']]
+    return lines
@@ -0,0 +1,58 @@
+from array import array
+
+from .models import Product
+from .search import normalize_words
+from .tyre_attributes import parse_name, model_line_key
+
+# --- 🧩 ЗІСТАВЛЕННЯ РЯДКІВ ТАБЛИЦЬ З ЛІНІЙКАМИ ТОВАРІВ ---
+# Імпорт фото і SEO шукає не товар, а лінійку (бренд + модель, усі розміри).
+# Товари завантажуються один раз: лінійка (префікс ключа ідентичності) ->
+# id товарів, і інвертований індекс (бренд, слово назви) -> лінійки.
+# Рядок таблиці спершу шукається точним ключем лінійки, а якщо такої нема —
+# перетином списків лінійок по словах моделі (як колишній ланцюжок
+# name__icontains, але в пам'яті). Кілька лінійок — неоднозначний рядок,
+# його не застосовуємо, а показуємо в журналі імпорту.
+
+MATCHED, AMBIGUOUS, UNMATCHED = 'matched', 'ambiguous', 'unmatched'
+
+
+class ModelLineIndex:
+    def __init__(self, rows=None):
+        """rows — (id, identity_key, search_text), за зростанням id; None — весь каталог."""
+        if rows is None:
+            rows = (Product.objects.exclude(identity_key='').order_by('id')
+                    .values_list('id', 'identity_key', 'search_text').iterator(chunk_size=5000))
+        self.lines = {}
+        self.postings = {}
+        for product_id, key, text in rows:
+            brand, model, _ = key.split('|', 2)
+            line = f"{brand}|{model}"
+            ids = self.lines.get(line)
+            if ids is None:
+                ids = self.lines[line] = array('q')
+                for word in set(text.split()):
+                    self.postings.setdefault((brand, word), set()).add(line)
+            ids.append(product_id)
+
+    def match(self, brand_name, model_name):
+        """(статус, лінійка, id товарів лінійки від найстаршого)."""
+        model_name = parse_name(model_name, brand_name)['model_name']
+        line = model_line_key(brand_name, model_name)
+        brand, model = line.split('|', 1)
+        if not brand or not model:
+            return UNMATCHED, None, ()
+        if line in self.lines:
+            return MATCHED, line, self.lines[line]
+
+        # Назва в таблиці записана інакше — усі слова моделі мають бути в назві товару
+        words = set(normalize_words(model_name)) - {brand}
+        postings = [self.postings.get((brand, word)) for word in words]
+        if not postings or not all(postings):
+            return UNMATCHED, None, ()
+        candidates = set.intersection(*sorted(postings, key=len))
+        if len(candidates) == 1:
+            line = candidates.pop()
+            return MATCHED, line, self.lines[line]
+        if candidates:
+            return AMBIGUOUS, None, ()
+        return UNMATCHED, None, ()
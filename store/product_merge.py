@@ -0,0 +1,41 @@
+from django.apps import apps as global_apps
+from django.db.models import Count
+
+# --- 🧬 ЗЛИТТЯ ДУБЛІКАТІВ ТОВАРІВ ---
+# Ключ ідентичності (Product.identity_key) унікальний серед непорожніх. Товари,
+# що до цього (чи після зміни парсера назв) отримали однаковий ключ, зливаються
+# в найстаріший: замовлення, фото, відгуки і журнал змін переходять на нього,
+# стейджинг синку дубліката відкидається (наступний синк заповнить заново),
+# сам дублікат видаляється.
+# get_model — apps.get_model: глобальний реєстр або історичний з міграції 0020.
+
+RELATED = (('OrderItem', 'product'), ('ProductImage', 'product'), ('Review', 'product'),
+           ('ProductChange', 'product'))
+
+
+def duplicate_groups(get_model=global_apps.get_model):
+    """Найстаріший id -> id дублікатів, по ключах з кількома товарами."""
+    Product = get_model('store', 'Product')
+    keys = (Product.objects.exclude(identity_key='').values('identity_key')
+            .annotate(n=Count('id')).filter(n__gt=1).values_list('identity_key', flat=True))
+    groups = {}
+    rows = Product.objects.filter(identity_key__in=list(keys)).order_by('identity_key', 'id')
+    keeper_by_key = {}
+    for product_id, key in rows.values_list('id', 'identity_key'):
+        keeper = keeper_by_key.setdefault(key, product_id)
+        if keeper != product_id:
+            groups.setdefault(keeper, []).append(product_id)
+    return groups
+
+
+def merge_products(groups, get_model=global_apps.get_model):
+    """groups — найстаріший id -> id дублікатів. Повертає кількість видалених дублікатів."""
+    merged = 0
+    for keeper, duplicates in groups.items():
+        for model_name, field in RELATED:
+            get_model('store', model_name).objects.filter(**{f"{field}_id__in": duplicates}).update(
+                **{f"{field}_id": keeper})
+        get_model('store', 'SyncStage').objects.filter(product_id__in=duplicates).delete()
+        get_model('store', 'Product').objects.filter(id__in=duplicates).delete()
+        merged += len(duplicates)
+    return merged
@@ -0,0 +1,168 @@
+import re
+import threading
+from array import array
+
+from django.db import connection
+from django.db.models import Case, When, Value, FloatField
+
+from .catalog_version import get_catalog_version
+
+# --- 🔎 ПОШУК ТОВАРІВ ---
+# Текст для пошуку (бренд + назва) нормалізується однаково для товарів і для
+# запиту: нижній регістр, кирилиця -> латиниця, народні назви брендів
+# ("мішлен" -> "michelin"). Далі:
+#   PostgreSQL — pg_trgm: Product.search_text %> запит по GIN-індексу
+#                (індекс — міграція 0009, текст заповнює backfill_attributes);
+#   інші БД    — інвертований індекс слів у пам'яті процесу + триграми по
+#                словнику для опечаток ("michelen"), перебудова за версією каталогу.
+
+TRANSLIT = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ґ': 'g', 'д': 'd', 'е': 'e', 'є': 'e', 'ё': 'e',
+    'ж': 'zh', 'з': 'z', 'и': 'i', 'і': 'i', 'ї': 'i', 'й': 'i', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'h',
+    'ц': 'c', 'ч': 'ch', 'ш': 'sh', 'щ': 'sch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya',
+}
+
+# Як покупці пишуть бренди кирилицею
+BRAND_ALIASES = {
+    'мішлен': 'michelin', 'мишлен': 'michelin', 'мішелін': 'michelin', 'мишелин': 'michelin',
+    'континенталь': 'continental', 'континентал': 'continental', 'конті': 'continental',
+    'бріджстоун': 'bridgestone', 'бриджстоун': 'bridgestone',
+    'гудієр': 'goodyear', 'гудиер': 'goodyear', 'гудьір': 'goodyear', 'гудир': 'goodyear',
+    'нокіан': 'nokian', 'нокиан': 'nokian',
+    'пірелі': 'pirelli', 'пирелли': 'pirelli', 'пірелли': 'pirelli',
+    'ханкук': 'hankook', 'хенкок': 'hankook', 'ханкок': 'hankook',
+    'йокогама': 'yokohama', 'йокохама': 'yokohama',
+    'данлоп': 'dunlop', 'кумхо': 'kumho', 'нексен': 'nexen', 'тойо': 'toyo',
+    'лео': 'leao', 'леао': 'leao', 'росава': 'rosava', 'премиорри': 'premiorri', 'преміоррі': 'premiorri',
+    'матадор': 'matador', 'барум': 'barum', 'корморан': 'kormoran', 'тигар': 'tigar',
+    'фулда': 'fulda', 'сава': 'sava', 'дебіца': 'debica', 'дебица': 'debica',
+    'ласса': 'lassa', 'петлас': 'petlas', 'саілун': 'sailun', 'сайлун': 'sailun',
+    'тріангл': 'triangle', 'триангл': 'triangle', 'лінглонг': 'linglong', 'линглонг': 'linglong',
+    'максис': 'maxxis', 'фалкен': 'falken', 'віатті': 'viatti', 'виатти': 'viatti',
+}
+
+# Слова, що є в кожній назві і лише заважають ранжуванню
+STOP_WORDS = {'shina', 'shini', 'shiny', 'шина', 'шини'}
+
+WORD_RE = re.compile(r'[0-9a-zа-яіїєґё]+')
+
+# Мінімальна схожість слова запиту і слова зі словника (частка спільних триграм)
+MIN_WORD_SIMILARITY = 0.45
+MAX_RESULTS = 1000
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def _translit(word):
+    return ''.join(TRANSLIT.get(ch, ch) for ch in word)
+
+
+def normalize_words(text):
+    words = []
+    for word in WORD_RE.findall((text or '').lower()):
+        word = BRAND_ALIASES.get(word, word)
+        word = _translit(word)
+        if word and word not in STOP_WORDS:
+            words.append(word)
+    return words
+
+
+def build_search_text(brand_name, name):
+    return ' '.join(normalize_words(f"{brand_name or ''} {name or ''}"))[:512]
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, rows):
+        postings = {}
+        for product_id, text in rows:
+            for word in set(text.split()):
+                postings.setdefault(word, array('q')).append(product_id)
+        self.postings = postings
+        self.trigram_words = {}
+        for word in postings:
+            for gram in _trigrams(word):
+                self.trigram_words.setdefault(gram, []).append(word)
+
+    def similar_words(self, word):
+        # Точний збіг і префікс ("alpin" -> "alpin6") — 1.0, інакше частка триграм
+        grams = _trigrams(word)
+        shared = {}
+        for gram in grams:
+            for candidate in self.trigram_words.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        result = {}
+        for candidate, common in shared.items():
+            if candidate == word or (len(word) >= 3 and candidate.startswith(word)):
+                result[candidate] = 1.0
+            elif not any(ch.isdigit() for ch in word):
+                # Номери моделей/індекси (model3, 94h) — лише точно або префіксом
+                score = common / len(grams | _trigrams(candidate))
+                if score >= MIN_WORD_SIMILARITY:
+                    result[candidate] = score
+        return result
+
+    def search(self, words):
+        # Кожне слово запиту має знайтися (AND), бал — сума найкращих збігів
+        scores = None
+        for word in words:
+            word_scores = {}
+            for candidate, similarity in self.similar_words(word).items():
+                for product_id in self.postings[candidate]:
+                    if similarity > word_scores.get(product_id, 0):
+                        word_scores[product_id] = similarity
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {pid: s + word_scores[pid] for pid, s in scores.items() if pid in word_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+
+def _get_index():
+    global _index, _index_version
+    from .models import Product
+
+    version = get_catalog_version()
+    if _index is not None and _index_version == version:
+        return _index
+    with _lock:
+        if _index is None or _index_version != version:
+            rows = Product.objects.order_by().values_list('id', 'brand__name', 'name').iterator(chunk_size=5000)
+            _index = SearchIndex((pid, build_search_text(brand, name)) for pid, brand, name in rows)
+            _index_version = version
+    return _index
+
+
+def search_products(queryset, query):
+    """Фільтрує queryset за вільним текстом і додає анотацію search_rank."""
+    words = normalize_words(query)
+    if not words:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        text = ' '.join(words)
+        return queryset.filter(search_text__trigram_word_similar=text).annotate(
+            search_rank=TrigramWordSimilarity(text, 'search_text'),
+        )
+
+    scores = _get_index().search(words)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:MAX_RESULTS]
+    if not best:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.filter(id__in=[pid for pid, _ in best]).annotate(
+        search_rank=Case(
+            *[When(id=pid, then=Value(round(score, 4))) for pid, score in best],
+            default=Value(0.0), output_field=FloatField(),
+        )
+    )
@@ -1,6 +1,7 @@
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
-from .models import Product, Brand
+from .models import Product, Brand, CatalogStats
+from .views import DB_TO_SLUG_MAP
 
 class BrandSitemap(Sitemap):
     changefreq = "weekly"
@@ -24,6 +25,25 @@ class ProductSitemap(Sitemap):
     def location(self, obj):
         return reverse('store:product_detail', args=[obj.slug])
 
+class SizeLandingSitemap(Sitemap):
+    changefreq = "daily"
+    priority = 0.7
+
+    def items(self):
+        # Лендінги "розмір" і "сезон + розмір", де є товар у наявності (з CatalogStats)
+        return CatalogStats.objects.filter(
+            brand_key=0, width__gt=0, profile__gt=0, diameter__gt=0, in_stock_count__gt=0,
+        ).order_by('width', 'profile', 'diameter', 'seasonality')
+
+    def location(self, obj):
+        size = {'width': obj.width, 'profile': obj.profile, 'diameter': obj.diameter}
+        if obj.seasonality:
+            return reverse('store:seo_season_size', kwargs={'season_slug': DB_TO_SLUG_MAP[obj.seasonality], **size})
+        return reverse('store:seo_size', kwargs=size)
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
 class StaticViewSitemap(Sitemap):
     priority = 0.5
     changefreq = 'monthly'
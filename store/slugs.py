@@ -0,0 +1,83 @@
+from django.db.models import Q
+from django.utils.text import slugify
+
+# --- 🔗 РОЗПОДІЛ SLUG-ІВ ---
+# Вільний суфікс (-1, -2, ...) шукаємо в пам'яті: для пачки нових товарів
+# зайняті slug-и з тими ж префіксами тягнемо разом, а не по exists() на
+# кожну спробу. Один SlugAllocator живе весь синк/імпорт і пам'ятає, що
+# вже роздав, тож дублі в межах пачки теж не виникають.
+
+SLUG_MAX_LENGTH = 255
+# Запас під суфікс "-NNNNN"
+BASE_MAX_LENGTH = SLUG_MAX_LENGTH - 10
+SLUGS_PER_QUERY = 1000
+PREFIXES_PER_QUERY = 100
+
+
+def product_slug_base(brand_name, name):
+    slug_candidate = f"{brand_name}-{name}" if brand_name else name
+    return slugify(slug_candidate.replace('/', ''))[:BASE_MAX_LENGTH].strip('-')
+
+
+class SlugAllocator:
+    def __init__(self, model=None, exclude_id=None):
+        if model is None:
+            from .models import Product
+            model = Product
+        self.model = model
+        self.exclude_id = exclude_id
+        self.taken = set()
+        self.loaded = set()
+        self.prefixed = set()
+        # Наступний суфікс для кожної бази — популярна назва не перебирає 1..N щоразу
+        self.next_suffix = {}
+
+    def _taken(self, condition):
+        queryset = self.model.objects.filter(condition)
+        if self.exclude_id:
+            queryset = queryset.exclude(pk=self.exclude_id)
+        return set(queryset.values_list('slug', flat=True))
+
+    def _load_prefixes(self, bases):
+        bases = sorted(set(bases) - self.prefixed)
+        for start in range(0, len(bases), PREFIXES_PER_QUERY):
+            chunk = bases[start:start + PREFIXES_PER_QUERY]
+            condition = Q()
+            for base in chunk:
+                condition |= Q(slug__startswith=f"{base}-")
+            self.taken |= self._taken(condition)
+            self.prefixed.update(chunk)
+
+    def reserve(self, bases):
+        """Підтягує зайняті slug-и для баз, яких ще не бачили.
+
+        Спершу точний збіг по унікальному індексу для всієї пачки; пошук за
+        префіксом (LIKE, без індексу) — лише для баз, яким потрібен суфікс.
+        """
+        bases = [base for base in dict.fromkeys(bases) if base not in self.loaded]
+        for start in range(0, len(bases), SLUGS_PER_QUERY):
+            chunk = bases[start:start + SLUGS_PER_QUERY]
+            busy = self._taken(Q(slug__in=chunk))
+            self.taken |= busy
+            self.loaded.update(chunk)
+            self._load_prefixes(busy)
+
+    def allocate(self, base):
+        base = base or 'product'
+        self.reserve([base])
+        slug = base
+        if slug in self.taken:
+            # База вільна в БД, але вже роздана в цій пачці — суфікси ще не перевіряли
+            self._load_prefixes([base])
+            counter = self.next_suffix.get(base, 1)
+            slug = f"{base}-{counter}"
+            while slug in self.taken:
+                counter += 1
+                slug = f"{base}-{counter}"
+            self.next_suffix[base] = counter + 1
+        self.taken.add(slug)
+        return slug
+
+    def allocate_many(self, bases):
+        self.reserve([base or 'product' for base in bases])
+        return [self.allocate(base) for base in bases]
@@ -0,0 +1,43 @@
+import hashlib
+
+# --- 📦 РЯДОК ПРАЙСУ ---
+# Компактний запис (без __dict__) з тими полями прайсу, які потрібні синку.
+# Сирий JSON/рядок таблиці відкидається одразу після розбору, тож сторінка
+# з тисяч товарів займає в пам'яті в рази менше, ніж список словників.
+# Опис (Info) буває на кілобайти, а існуючим товарам він потрібен лише для
+# відбитку — тож у рядку лежить його md5, а сам текст лише в рядків, що
+# стануть новими товарами (див. OmegaClient.keep_info).
+
+
+def info_digest(info):
+    return hashlib.md5((info or '').encode()).hexdigest()
+
+
+class SupplierRow:
+    # Аргументи конструктора (PriceListAdapter збирає рядок з розібраного словника)
+    FIELDS = ('name', 'brand', 'width', 'profile', 'diameter', 'cost', 'stock', 'image', 'info',
+              'season', 'country', 'year')
+    __slots__ = ('name', 'brand', 'width', 'profile', 'diameter', 'cost', 'stock', 'image', 'info', 'info_hash',
+                 'season', 'country', 'year', 'key')
+
+    def __init__(self, name, brand, width=0, profile=0, diameter=0, cost=0, stock=0, image='', info='',
+                 season=None, country=None, year=None):
+        self.name = name
+        self.brand = brand
+        self.width = width
+        self.profile = profile
+        self.diameter = diameter
+        self.cost = cost
+        self.stock = stock
+        self.image = image
+        self.info_hash = info_digest(info)
+        self.info = info
+        # Лише для нових товарів (прайси з колонками сезону/країни/року)
+        self.season = season
+        self.country = country
+        self.year = year
+        # Ключ ідентичності, якщо вже пораховано при розборі (ProductSyncEngine.wants_info)
+        self.key = None
+
+    def __repr__(self):
+        return f"<SupplierRow {self.brand} / {self.name}: {self.cost} × {self.stock}>"
@@ -0,0 +1,307 @@
+import abc
+import csv
+import os
+import queue
+import re
+import threading
+import time
+
+import openpyxl
+
+from .sync_engine import ProductSyncEngine, merge_stage, apply_stage, clear_stage, MERGE_RULES, OMEGA_SUPPLIER
+from .omega_client import clear_checkpoint
+from .supplier_row import SupplierRow
+from .catalog_stats import refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+
+# --- 🚚 ПОСТАЧАЛЬНИКИ ---
+# Кожне джерело прайсу — адаптер з одним методом iter_pages(), що віддає
+# сторінки рядків у спільному форматі ProductSyncEngine.process_page().
+# run_suppliers() качає/читає всіх постачальників паралельно (по потоку на
+# адаптер, у БД вони не ходять), а пише один потік — через той самий
+# пакетний конвеєр і стейджинг, що й sync_omega. Якщо шину пропонує кілька
+# постачальників, merge_stage() зводить пропозиції за правилом злиття.
+
+QUEUE_PAGES = 8
+SIZE_RE = re.compile(r'(\d+)/(\d+)\s*[a-zA-Z]*\s*(\d+)')
+
+# Колонки прайсу: аліаси заголовка (початок назви) і позиція за замовчуванням
+COLUMNS = {
+    'brand': (["бренд", "brand"], 0),
+    'model': (["модель", "model"], 1),
+    'size': (["типоразмер", "типорозмір", "size"], 2),
+    'season': (["сезон", "season"], 3),
+    'price': (["цена", "ціна", "price"], 4),
+    'qty': (["кол", "к-сть", "qty"], 5),
+    'country': (["країна", "country"], 6),
+    'year': (["рік", "year"], 7),
+    'photo': (["фото", "photo"], None),
+}
+
+
+# --- 🧹 Розбір значень прайсу (спільний для імпорту з адмінки і адаптерів) ---
+def parse_size(raw):
+    match = SIZE_RE.search(raw or '')
+    if match:
+        return int(match.group(1)), int(match.group(2)), int(match.group(3))
+    return 0, 0, 0
+
+
+def parse_season(raw):
+    raw = (raw or '').lower()
+    if 'зим' in raw or 'winter' in raw:
+        return 'winter'
+    if 'літ' in raw or 'лет' in raw or 'summer' in raw:
+        return 'summer'
+    return 'all-season'
+
+
+# strict — непорожнє значення без числа (напр. "abc") є помилкою рядка, а не нулем
+def parse_quantity(raw, strict=False):
+    raw = str(raw if raw is not None else '').strip()
+    if '>' in raw:
+        return 20
+    digits = re.sub(r'[^0-9]', '', raw)
+    if strict and raw and not digits:
+        raise ValueError(f"кількість не розпізнана — {raw}")
+    return int(digits or 0)
+
+
+def parse_cost(raw, strict=False):
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    clean_price = re.sub(r'[^\d,.]', '', str(raw or '')).replace(',', '.')
+    if clean_price.count('.') > 1:
+        parts = clean_price.split('.')
+        clean_price = "".join(parts[:-1]) + "." + parts[-1]
+    try:
+        return float(clean_price)
+    except ValueError:
+        if strict and str(raw or '').strip():
+            raise ValueError(f"ціна не розпізнана — {raw}")
+        return 0.0
+
+
+def clean_brand(raw):
+    brand_name = str(raw or '').strip().replace('“', '').replace('”', '')
+    return brand_name if brand_name and brand_name != "None" else "Unknown"
+
+
+def read_rows(path):
+    """Рядки таблиці (.xlsx або .csv) по одному, разом із заголовком."""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            yield from csv.reader(f)
+    else:
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from wb.active.iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+
+def count_rows(path):
+    """Номер останнього рядка (з розмітки .xlsx, без читання аркуша); None — невідомо."""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return wb.active.max_row
+    finally:
+        wb.close()
+
+
+class SupplierAdapter(abc.ABC):
+    code = ''
+
+    @abc.abstractmethod
+    def iter_pages(self):
+        """Генератор сторінок: списки SupplierRow для ProductSyncEngine.process_page()."""
+
+
+class OmegaAdapter(SupplierAdapter):
+    code = 'omega'
+
+    def __init__(self, client, page_size=1000):
+        self.client = client
+        self.page_size = page_size
+
+    def iter_pages(self):
+        for offset, rows, count, total in self.client.iter_pages(0, self.page_size):
+            if not count:
+                return
+            yield rows
+
+
+class PriceListAdapter(SupplierAdapter):
+    """Прайс дистриб'ютора у .xlsx або .csv (колонки як у імпорті з адмінки)."""
+
+    def __init__(self, path, code, start_row=2, end_row=None, page_size=1000):
+        self.path = path
+        self.code = code
+        self.start_row = start_row
+        self.end_row = end_row
+        self.page_size = page_size
+
+    @staticmethod
+    def find_columns(header_row):
+        header = [str(cell or "").strip().lower() for cell in header_row]
+        columns = {}
+        for key, (aliases, default) in COLUMNS.items():
+            found = next((idx for idx, val in enumerate(header) if val.startswith(tuple(aliases))), None)
+            columns[key] = found or default
+        return columns
+
+    @staticmethod
+    def parse_row(row, columns, strict=False):
+        """Рядок прайсу -> словник (поля SupplierRow + model, size_raw); None — порожній рядок.
+
+        strict — нерозпізнана ціна чи кількість піднімає ValueError (імпорт з адмінки).
+        """
+        def cell(key):
+            idx = columns[key]
+            value = row[idx] if idx is not None and idx < len(row) else None
+            return value if value is not None else ''
+
+        if not row or len(row) < 2 or (not cell('brand') and not cell('model')):
+            return None
+        brand_name = clean_brand(cell('brand'))
+        model_name = str(cell('model')).strip()
+        size_raw = str(cell('size')).strip()
+        w, p, d = parse_size(size_raw)
+        season_raw = str(cell('season')).lower()
+        try: year = int(cell('year')) or None
+        except (TypeError, ValueError): year = None
+
+        return {
+            'name': f"{brand_name} {model_name} {f'{w}/{p}R{d}' if w and p and d else size_raw}".strip(),
+            'brand': brand_name,
+            'model': model_name,
+            'size_raw': size_raw,
+            'width': w, 'profile': p, 'diameter': d,
+            'season': parse_season(season_raw),
+            'cost': parse_cost(cell('price'), strict),
+            'stock': parse_quantity(cell('qty'), strict),
+            'country': str(cell('country')).strip() or "-",
+            'year': year,
+            'image': str(cell('photo')).strip(),
+            'info': f"Шини {brand_name} {model_name}. {size_raw}. {season_raw}.",
+        }
+
+    def iter_pages(self):
+        rows_iter = read_rows(self.path)
+        header_row = next(rows_iter, None)
+        if header_row is None:
+            return
+        columns = self.find_columns(header_row)
+        page = []
+        for excel_row, row in enumerate(rows_iter, start=2):
+            if excel_row < self.start_row: continue
+            if self.end_row and excel_row > self.end_row: break
+            parsed = self.parse_row(row, columns)
+            if parsed:
+                page.append(SupplierRow(**{field: parsed[field] for field in SupplierRow.FIELDS}))
+            if len(page) >= self.page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+class _Finished:
+    def __init__(self, error=None):
+        self.error = error
+
+
+def run_suppliers(adapters, rule='cheapest', log=None):
+    """Синк з кількох постачальників: паралельне читання, один пакетний запис, злиття, перенос.
+
+    Залишки на вітрині змінюються лише якщо всі постачальники віддали прайс
+    повністю. Повертає лічильники по постачальниках і час фаз.
+    """
+    if rule not in MERGE_RULES:
+        raise ValueError(f"Невідоме правило злиття: {rule}")
+    log = log or (lambda message: None)
+    timings = {}
+    suppliers = {a.code: {'items': 0, 'created': 0, 'staged': 0, 'error': None} for a in adapters}
+    result = {'suppliers': suppliers, 'merged': 0, 'updated': 0, 'zeroed': 0, 'finished': False, 'timings': timings}
+
+    started = time.monotonic()
+    engine = ProductSyncEngine()
+    timings['load'] = time.monotonic() - started
+    for adapter in adapters:
+        if isinstance(adapter, OmegaAdapter):
+            adapter.client.keep_info = engine.wants_info
+
+    # Стейджинг лише постачальників цього запуску; checkpoint sync_omega
+    # скидаємо тільки коли Omega серед них (його сторінки в стейджингу стираються)
+    codes = list(suppliers)
+    if OMEGA_SUPPLIER in suppliers:
+        clear_checkpoint()
+    clear_stage(codes)
+
+    started = time.monotonic()
+    pages = queue.Queue(maxsize=QUEUE_PAGES)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(adapter):
+        error = None
+        try:
+            for rows in adapter.iter_pages():
+                if not put((adapter.code, rows)):
+                    return
+        except Exception as e:
+            error = e
+        put((adapter.code, _Finished(error)))
+
+    threads = [threading.Thread(target=produce, args=(a,), name=f"supplier-{a.code}", daemon=True) for a in adapters]
+    for thread in threads:
+        thread.start()
+
+    try:
+        remaining = len(threads)
+        while remaining:
+            code, item = pages.get()
+            if isinstance(item, _Finished):
+                remaining -= 1
+                suppliers[code]['error'] = item.error
+                log(f"{'💥' if item.error else '✅'} {code}: {item.error or 'прайс отримано'}")
+                continue
+            created, staged = engine.process_page(item, supplier=code)
+            stats = suppliers[code]
+            stats['items'] += len(item)
+            stats['created'] += created
+            stats['staged'] += staged
+            log(f"📥 {code}: {stats['items']} рядків (➕ {created}  📦 {staged})")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    timings['fetch_stage'] = time.monotonic() - started
+
+    started = time.monotonic()
+    if not any(s['error'] for s in suppliers.values()):
+        # Одна пропозиція на товар -> той самий короткий set-based перенос
+        result['merged'] = merge_stage(codes, rule)
+        result['updated'], result['zeroed'] = apply_stage(codes)
+        result['finished'] = True
+    clear_stage(codes)
+    timings['apply'] = time.monotonic() - started
+
+    started = time.monotonic()
+    refresh_catalog_stats()
+    bump_catalog_version()
+    timings['stats'] = time.monotonic() - started
+
+    result.update(created=engine.created, staged=engine.staged, unchanged=engine.unchanged)
+    return result
@@ -0,0 +1,424 @@
+import decimal
+import hashlib
+import time
+import tracemalloc
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django import db
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Product, Brand, SyncStage, ProductChange
+from .pricing import get_pricing
+from .search import build_search_text
+from .slugs import SlugAllocator, product_slug_base
+from .tyre_attributes import apply_name_attributes, identity_key
+from .catalog_stats import refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+from .omega_client import load_checkpoint, save_checkpoint, clear_checkpoint, CHECKPOINT_KEY
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- 🔄 ПАКЕТНИЙ СИНК ТОВАРІВ ПОСТАЧАЛЬНИКА ---
+# Бренди і товари (за ключем ідентичності) завантажуються один раз, а
+# зайняті slug-и — пачкою під нові товари сторінки (store/slugs.py).
+# Кожен рядок прайсу класифікується в пам'яті: новий товар створюється
+# bulk_create, а залишок/ціна існуючого йде в SyncStage.
+# Наприкінці apply_stage() переносить зміни в товари і обнуляє відсутні в
+# прайсі одним коротким UPDATE — вітрина не "порожніє" на час синку.
+# Product.save() тут не викликається, тож ціну (правила націнки), slug і
+# розібрані атрибути рахуємо самі (тими ж функціями, що й save()).
+# Кожен товар пам'ятає відбиток свого рядка прайсу (собівартість, залишок,
+# фото, хеш опису, версія правил цін): якщо він не змінився — товар не переписується.
+# Кожна реальна зміна потрапляє в журнал ProductChange.
+# Кілька постачальників пишуть у стейджинг кожен своїм рядком; перед
+# перенесенням merge_stage() зводить пропозиції одного товару правилом злиття.
+# Стейджинг, злиття і обнулення обмежені кодами постачальників запуску:
+# синк одного постачальника не чіпає рядки іншого, а обнуляє лише товари,
+# які востаннє прийшли від нього (Product.supplier).
+
+UPDATE_FIELDS = ['stock_quantity', 'cost_price', 'price', 'photo_url']
+STAGE_FIELDS = UPDATE_FIELDS + ['fingerprint']
+BULK_BATCH = 500
+CHANGE_LOG_DAYS = 30
+OMEGA_SUPPLIER = 'omega'
+# cheapest — береться найдешевша пропозиція в наявності (її ціна і залишок);
+# sum_stock — ціна найдешевшої, а залишки всіх складів додаються
+MERGE_RULES = ('cheapest', 'sum_stock')
+CENT = decimal.Decimal('0.01')
+
+# Поля товару, потрібні для класифікації (без описів і SEO-текстів)
+# Додаткові колонки прайсу (Excel/CSV), які заповнюються лише новим товарам
+NEW_PRODUCT_EXTRAS = {'season': 'seasonality', 'country': 'country', 'year': 'year'}
+
+IDENTITY_FIELDS = ('id', 'name', 'slug', 'brand_id', 'stock_quantity', 'cost_price', 'price',
+                   'discount_percent', 'photo', 'photo_url', 'supplier_fingerprint', 'supplier', 'identity_key',
+                   'diameter', 'seasonality')
+
+
+def peak_rss_mb():
+    # ru_maxrss на Linux у КБ — пік процесу за весь час його роботи
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0
+
+
+def to_cost(value):
+    try:
+        return decimal.Decimal(str(value or 0)).quantize(CENT)
+    except decimal.InvalidOperation:
+        return decimal.Decimal('0.00')
+
+
+def require_identity_keys():
+    # Без ключа товар не знайдеться за рядком прайсу і синк/імпорт створить дубль
+    missing = Product.objects.filter(identity_key='').count()
+    if missing:
+        raise ValueError(f"Товарів без ключа ідентичності: {missing} — спершу запустіть manage.py backfill_attributes")
+
+
+class ProductSyncEngine:
+    def __init__(self, pricing=None):
+        require_identity_keys()
+        self.pricing = pricing or get_pricing()
+
+        self.brands_by_name = {}
+        self.brands_by_slug = {}
+        self.brands_by_id = {}
+        for brand in Brand.objects.all():
+            self.brands_by_name[brand.name.lower()] = brand
+            self.brands_by_slug[brand.slug] = brand
+            self.brands_by_id[brand.pk] = brand
+
+        self.products = {}
+        for product in Product.objects.only(*IDENTITY_FIELDS).order_by('id').iterator(chunk_size=5000):
+            # Ключ унікальний (порожній — лише ще не розібраний товар)
+            if product.identity_key:
+                self.products[product.identity_key] = product
+        # Зайняті slug-и — лише під префікси нових товарів, по запиту на сторінку
+        self.slugs = SlugAllocator()
+
+        self.created = self.staged = self.unchanged = 0
+
+    def get_brand(self, raw_name):
+        brand = self.brands_by_name.get(raw_name.lower())
+        if brand is None:
+            # Створюємо бренд тільки якщо його slug точно не зайнятий
+            slug = slugify(raw_name)
+            brand = self.brands_by_slug.get(slug)
+            if brand is None:
+                brand = Brand.objects.create(name=raw_name, slug=slug)
+                self.brands_by_slug[slug] = brand
+                self.brands_by_id[brand.pk] = brand
+            self.brands_by_name[raw_name.lower()] = brand
+        return brand
+
+    def price_for(self, product, cost):
+        return self.pricing.price(cost, product.discount_percent, self.brands_by_id.get(product.brand_id),
+                                  product.diameter, product.seasonality)
+
+    def fingerprint(self, row, cost):
+        raw = f"{cost}|{row.stock}|{row.image or ''}|{row.info_hash}|{self.pricing.signature}"
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def row_key(self, row):
+        if row.key:
+            return row.key
+        # Назва бренду — як у товару (вже зіставлений Brand), інакше ключі розійдуться
+        brand_name = self.get_brand(row.brand).name
+        return identity_key(brand_name, row.name, row.width, row.profile, row.diameter)
+
+    def wants_info(self, row):
+        """OmegaClient.keep_info: опис потрібен лише рядку, що стане новим товаром.
+
+        Викликається в потоках завантаження, тож лише читає словники в пам'яті
+        (без get_brand, який створює бренди). Невідомий бренд — точно новий товар.
+        """
+        brand = self.brands_by_name.get(row.brand.lower())
+        if brand is None:
+            return True
+        row.key = identity_key(brand.name, row.name, row.width, row.profile, row.diameter)
+        return row.key not in self.products
+
+    def find(self, key):
+        return self.products.get(key)
+
+    def process_page(self, rows, supplier=OMEGA_SUPPLIER):
+        """rows — SupplierRow (store/supplier_row.py).
+
+        Нові товари створюються одразу, а залишки/ціни існуючих лише
+        складаються в SyncStage — вітрина їх побачить після apply_stage().
+        """
+        to_create, staged = [], {}
+
+        for row in rows:
+            cost = to_cost(row.cost)
+            fingerprint = self.fingerprint(row, cost)
+            key = self.row_key(row)
+            product = self.find(key)
+
+            if product is None:
+                brand = self.get_brand(row.brand)
+                product = Product(
+                    name=row.name, brand=brand,
+                    width=row.width, profile=row.profile, diameter=row.diameter,
+                    cost_price=cost, stock_quantity=row.stock,
+                    description=row.info or '', photo_url=row.image or '', supplier=supplier,
+                    **{field: getattr(row, key) for key, field in NEW_PRODUCT_EXTRAS.items() if getattr(row, key)}
+                )
+                product.price = self.price_for(product, cost)
+                product.supplier_fingerprint = fingerprint
+                product.search_text = build_search_text(brand.name, product.name)
+                apply_name_attributes(product, brand.name)
+                # Рік з колонки прайсу важить більше за рік з назви
+                if row.year:
+                    product.year = row.year
+                self.products[key] = product
+                to_create.append(product)
+                staged[key] = product
+                continue
+
+            photo_url = product.photo_url
+            if row.image and not product.photo:
+                photo_url = row.image
+            values = {
+                'stock_quantity': row.stock,
+                'cost_price': cost,
+                'price': self.price_for(product, cost),
+                'photo_url': photo_url,
+            }
+            if product.pk:
+                # Рядок у стейджингу потрібен і без змін — як ознака "є в прайсі"
+                if product.supplier_fingerprint == fingerprint:
+                    self.unchanged += 1
+                staged[key] = SyncStage(product_id=product.pk, supplier=supplier,
+                                                         fingerprint=fingerprint, **values)
+            else:
+                # Дубль нового товару в тій самій сторінці — просто свіжіші значення
+                for field, value in values.items():
+                    setattr(product, field, value)
+                product.supplier_fingerprint = fingerprint
+
+        # Вільні slug-и для всіх нових товарів сторінки — один запит на пачку префіксів
+        bases = [product_slug_base(p.brand.name, p.name) for p in to_create]
+        for product, slug in zip(to_create, self.slugs.allocate_many(bases)):
+            product.slug = slug
+
+        with transaction.atomic():
+            Product.objects.bulk_create(to_create, batch_size=BULK_BATCH)
+            stage_rows = [
+                SyncStage(product_id=obj.pk, supplier=supplier, fingerprint=obj.supplier_fingerprint,
+                          **{f: getattr(obj, f) for f in UPDATE_FIELDS}) if isinstance(obj, Product) else obj
+                for obj in staged.values()
+            ]
+            SyncStage.objects.bulk_create(
+                stage_rows, batch_size=BULK_BATCH,
+                update_conflicts=True, unique_fields=['product', 'supplier'], update_fields=STAGE_FIELDS,
+            )
+            ProductChange.objects.bulk_create(
+                [ProductChange(product_id=p.pk, kind='new', new_value=p.price) for p in to_create],
+                batch_size=BULK_BATCH,
+            )
+
+        self.created += len(to_create)
+        self.staged += len(stage_rows)
+        return len(to_create), len(stage_rows)
+
+
+def clear_stage(suppliers):
+    SyncStage.objects.filter(supplier__in=suppliers).delete()
+
+
+def _merge_offers(offers, rule):
+    # Ціна — з найдешевшої пропозиції в наявності (нульова собівартість = ціни немає)
+    best = min([o for o in offers if o.stock_quantity > 0] or offers,
+               key=lambda o: (o.cost_price <= 0, o.cost_price))
+    stock = sum(o.stock_quantity for o in offers) if rule == 'sum_stock' else best.stock_quantity
+    raw = '|'.join(f"{o.supplier}:{o.fingerprint}" for o in offers) + f"|{rule}"
+    # Зведений рядок записується від імені постачальника найкращої пропозиції
+    return SyncStage(
+        product_id=best.product_id, supplier=best.supplier,
+        stock_quantity=stock, cost_price=best.cost_price, price=best.price,
+        photo_url=best.photo_url or next((o.photo_url for o in offers if o.photo_url), None),
+        fingerprint=hashlib.md5(raw.encode()).hexdigest(),
+    )
+
+
+def merge_stage(suppliers, rule='cheapest'):
+    """Зводить пропозиції постачальників suppliers на один товар в один рядок стейджингу.
+
+    Товари з однією пропозицією не чіпаються. Повертає кількість зведених товарів.
+    """
+    if rule not in MERGE_RULES:
+        raise ValueError(f"Невідоме правило злиття: {rule}")
+    offers_stage = SyncStage.objects.filter(supplier__in=suppliers)
+    multi = offers_stage.values('product_id').annotate(offers=Count('id')).filter(offers__gt=1)
+    product_ids = list(multi.values_list('product_id', flat=True))
+    if not product_ids:
+        return 0
+
+    merged = []
+    for start in range(0, len(product_ids), BULK_BATCH):
+        chunk = product_ids[start:start + BULK_BATCH]
+        offers = offers_stage.filter(product_id__in=chunk).order_by('product_id', 'supplier')
+        merged += [_merge_offers(list(group), rule) for _, group in groupby(offers, key=attrgetter('product_id'))]
+
+    with transaction.atomic():
+        for start in range(0, len(product_ids), BULK_BATCH):
+            offers_stage.filter(product_id__in=product_ids[start:start + BULK_BATCH]).delete()
+        SyncStage.objects.bulk_create(merged, batch_size=BULK_BATCH)
+    return len(merged)
+
+
+def _change_rows(product_id, old_stock, old_price, new_stock, new_price):
+    if new_price != old_price and old_price and new_price:
+        yield ProductChange(product_id=product_id, kind='price_up' if new_price > old_price else 'price_down',
+                            old_value=old_price, new_value=new_price)
+    if old_stock <= 0 < new_stock:
+        yield ProductChange(product_id=product_id, kind='in_stock', old_value=old_stock, new_value=new_stock)
+    elif old_stock > 0 >= new_stock:
+        yield ProductChange(product_id=product_id, kind='out_of_stock', old_value=old_stock, new_value=new_stock)
+
+
+def apply_stage(suppliers, zero_missing=True):
+    """Переносить SyncStage постачальників suppliers у товари одним коротким UPDATE.
+
+    Оновлюються лише товари, чий відбиток прайсу (або постачальник) змінився;
+    товари цих постачальників, яких немає в їхніх прайсах, отримують нульовий
+    залишок. Кожна зміна пишеться в ProductChange. Очікує один рядок на товар
+    (див. merge_stage). Повертає (оновлено, обнулено).
+    """
+    stage = SyncStage.objects.filter(product_id=OuterRef('pk'), supplier__in=suppliers)
+    changed = Product.objects.filter(Exists(stage.exclude(fingerprint=OuterRef('supplier_fingerprint'),
+                                                          supplier=OuterRef('supplier'))))
+
+    with transaction.atomic():
+        deltas = changed.annotate(
+            new_stock=Subquery(stage.values('stock_quantity')[:1]),
+            new_price=Subquery(stage.values('price')[:1]),
+        ).values_list('id', 'stock_quantity', 'price', 'new_stock', 'new_price')
+        log = [change for row in deltas for change in _change_rows(*row)]
+
+        updated = changed.update(
+            supplier_fingerprint=Subquery(stage.values('fingerprint')[:1]),
+            supplier=Subquery(stage.values('supplier')[:1]),
+            **{f: Subquery(stage.values(f)[:1]) for f in UPDATE_FIELDS}
+        )
+
+        zeroed = 0
+        if zero_missing:
+            missing = Product.objects.filter(stock_quantity__gt=0, supplier__in=suppliers).filter(~Exists(stage))
+            log += [
+                ProductChange(product_id=pid, kind='delisted', old_value=stock, new_value=0)
+                for pid, stock in missing.values_list('id', 'stock_quantity')
+            ]
+            # Відбиток скидаємо, щоб повернення в прайс з тим самим рядком не вважалось "без змін"
+            zeroed = missing.update(stock_quantity=0, supplier_fingerprint='')
+
+        ProductChange.objects.bulk_create(log, batch_size=BULK_BATCH)
+
+    ProductChange.objects.filter(created_at__lt=timezone.now() - timedelta(days=CHANGE_LOG_DAYS)).delete()
+    return updated, zeroed
+
+
+def changes_since(last_id=0, kinds=None):
+    """Нові записи журналу після last_id — для інкрементальних споживачів (фід, кеші, розсилки)."""
+    changes = ProductChange.objects.filter(id__gt=last_id).order_by('id')
+    if kinds:
+        changes = changes.filter(kind__in=kinds)
+    return changes
+
+
+def run_sync(client, page_size=1000, restart=False, log=None, on_page=None, trace_memory=False,
+             checkpoint_key=CHECKPOINT_KEY, supplier=OMEGA_SUPPLIER):
+    """Повний синк: стейджинг сторінок -> атомарний перенос -> статистика.
+
+    client — OmegaClient (або сумісний iter_pages). Повертає словник з
+    лічильниками, часом кожної фази і піком пам'яті (trace_memory — ще й
+    пік Python-алокацій на сторінку через tracemalloc, повільніше).
+    checkpoint_key — ключ кешу для продовження перерваного запуску;
+    supplier — код постачальника: стейджинг і обнулення лише його товарів.
+    """
+    log = log or (lambda message: None)
+    timings = {}
+    result = {'created': 0, 'staged': 0, 'unchanged': 0, 'updated': 0, 'zeroed': 0,
+              'items': 0, 'finished': False, 'error': None, 'timings': timings,
+              'peak_rss_mb': 0, 'page_peak_mb': None}
+
+    started = time.monotonic()
+    # Бренди/товари/slug-и в пам'ять один раз — далі запис пакетами на сторінку
+    # (і перевірка ключів ідентичності — до будь-яких змін стейджингу)
+    engine = ProductSyncEngine()
+    timings['load'] = time.monotonic() - started
+    if on_page is None:
+        # Повний опис — лише рядкам нових товарів (on_page, напр. --record, бачить усі)
+        client.keep_info = engine.wants_info
+
+    checkpoint = None if restart else load_checkpoint(checkpoint_key)
+    if checkpoint and checkpoint.get('page_size') == page_size:
+        # Перерваний запуск: записані в стейджинг сторінки не повторюємо
+        current_from = checkpoint['next_from']
+        log(f"⏯ Продовжуємо перерваний синк з позиції {current_from}...")
+    else:
+        current_from = 0
+        # Залишки на вітрині не чіпаємо до кінця — все йде в стейджинг
+        clear_stage([supplier])
+        save_checkpoint(0, page_size, checkpoint_key)
+
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    page_peaks = []
+
+    started = time.monotonic()
+    try:
+        for offset, rows, count, total in client.iter_pages(current_from, page_size):
+            if not count:
+                result['finished'] = True
+                break
+            log(f"📥 Позиція {offset} з {total}...")
+            if on_page:
+                on_page(offset, rows)
+            created, staged = engine.process_page(rows, supplier)
+            result['items'] += count
+            log(f"   ➕ {created}  📦 {staged}")
+
+            save_checkpoint(offset + page_size, page_size, checkpoint_key)
+            db.reset_queries()
+            if trace_memory and tracemalloc.is_tracing():
+                page_peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+        else:
+            result['finished'] = True
+    except Exception as e:
+        result['error'] = e
+    finally:
+        if tracing:
+            tracemalloc.stop()
+    timings['fetch_stage'] = time.monotonic() - started
+
+    started = time.monotonic()
+    if result['finished']:
+        # Прайс отримано повністю — одна коротка транзакція замість хвилин "порожньої" вітрини
+        result['updated'], result['zeroed'] = apply_stage([supplier])
+        clear_checkpoint(checkpoint_key)
+        clear_stage([supplier])
+    timings['apply'] = time.monotonic() - started
+
+    started = time.monotonic()
+    # Залишки змінювались по всьому каталогу, тож статистику рахуємо повністю
+    refresh_catalog_stats()
+    # Фільтри та кеш сторінок каталогу оновляться одним махом
+    bump_catalog_version()
+    timings['stats'] = time.monotonic() - started
+
+    if page_peaks:
+        result['page_peak_mb'] = max(page_peaks) / 1024 / 1024
+    result['peak_rss_mb'] = peak_rss_mb()
+    result.update(created=engine.created, staged=engine.staged, unchanged=engine.unchanged)
+    return result
@@ -0,0 +1,874 @@
+import csv
+import decimal
+import io
+import itertools
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import openpyxl
+
+import requests
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Max, Min
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from .catalog_stats import STAT_FIELDS, get_catalog_stats, refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+from .exports import CATALOG_HEADER, UNIQUE_MODELS_HEADER
+from .facets import COUNTED_FACETS, FILTER_FACETS, FacetIndex, facet_filter_options, get_facets
+from .import_jobs import JobRunner, claim_next, enqueue, run_worker
+from .importers import PriceListImport
+from .invoice import invoice_pdf
+from .json_stream import JsonStream
+from .models import (Brand, CatalogStats, ImportJob, Order, OrderItem, Product, PriceRule, ProductChange, SyncStage, ROUNDING_CHOICES,
+                     calculate_price)
+from .page_cache import CSRF_PLACEHOLDER
+from .omega_client import OmegaClient, OmegaError, load_checkpoint
+from .omega_standin import StandinTransport, SyntheticCatalog
+from .pagination import KeysetPaginator, encode_cursor
+from .product_matcher import AMBIGUOUS, MATCHED, UNMATCHED, ModelLineIndex
+from .pricing import get_pricing_version, price_expression
+from .search import normalize_words, search_products
+from .slugs import SlugAllocator, product_slug_base
+from .supplier_row import SupplierRow
+from .sync_engine import ProductSyncEngine, apply_stage, clear_stage, merge_stage, run_sync
+from .tyre_attributes import identity_key, parse_name
+
+COSTS = ['0.01', '1', '99.99', '100', '123.45', '999.5', '1000', '1234.56', '2499.99', '10000']
+MARKUPS = ['1', '1.15', '1.2', '1.25', '1.333']
+DISCOUNTS = [0, 5, 10, 33]
+
+
+class PriceRoundingTest(TestCase):
+    """price_expression (SQL, reprice) і round_price (Python, синк/save) мають давати ту саму ціну."""
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Test', slug='test')
+        Product.objects.bulk_create(
+            Product(name=f"Test {i}", slug=f"test-{i}", brand=brand, cost_price=decimal.Decimal(cost),
+                    discount_percent=discount)
+            for i, (cost, discount) in enumerate(itertools.product(COSTS, DISCOUNTS)))
+
+    def test_sql_matches_python(self):
+        for rounding, _ in ROUNDING_CHOICES:
+            for markup in MARKUPS:
+                rows = Product.objects.annotate(sql_price=price_expression(markup, rounding)).values_list(
+                    'cost_price', 'discount_percent', 'sql_price')
+                for cost, discount, sql_price in rows:
+                    with self.subTest(rounding=rounding, markup=markup, cost=cost, discount=discount):
+                        self.assertEqual(int(sql_price), calculate_price(cost, markup, discount, rounding))
+
+
+class PriceRuleVersionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_queryset_delete_bumps_pricing_version(self):
+        PriceRule.objects.create(markup=decimal.Decimal('1.3'))
+        version = get_pricing_version()
+        # Так видаляє дія адмінки "видалити вибрані" — без PriceRule.delete()
+        PriceRule.objects.all().delete()
+        self.assertNotEqual(get_pricing_version(), version)
+
+
+class FacetIndexTest(TestCase):
+    """Бітові маски фасетів мають рахувати те саме, що перебір товарів."""
+
+    PRODUCTS = [
+        # id, qty, width, profile, diameter, season, brand, load, speed, stud, year, xl, runflat
+        (1, 4, 205, 55, 16, 'winter', 1, '91', 'H', 'Шип', 2024, False, False),
+        (2, 0, 205, 55, 16, 'winter', 1, '91', 'H', 'Шип', 2024, False, False),
+        (3, 8, 205, 55, 16, 'summer', 2, '94', 'V', 'Не шип', 2023, True, False),
+        (4, 2, 215, 60, 17, 'winter', 2, '98', 'T', 'Не шип', 2024, False, True),
+        (5, 1, 195, 65, 15, 'all-season', 1, '91', 'T', 'Не шип', 2022, False, False),
+        (6, 6, 215, 60, 16, 'winter', 1, '94', 'H', 'Під шип', 2024, True, False),
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.index = FacetIndex([], [], [(1, 'A', 'a'), (2, 'B', 'b')], self.PRODUCTS)
+
+    def brute_count(self, selected, ids=None):
+        count = 0
+        for product_id, qty, *values in self.PRODUCTS:
+            if qty <= 0 or (ids is not None and product_id not in ids):
+                continue
+            row = dict(zip(FILTER_FACETS, values))
+            if all(value in (None, '', False) or row[facet] == value for facet, value in selected.items()):
+                count += 1
+        return count
+
+    def test_counts_match_brute_force(self):
+        for selected in ({}, {'season': 'winter'}, {'width': 205, 'brand': 1}, {'xl': True},
+                         {'diameter': 16, 'stud': 'Шип'}, {'width': 999}):
+            with self.subTest(selected=selected):
+                self.assertEqual(self.index.count(selected), self.brute_count(selected))
+                counts = self.index.counts(selected)
+                for facet in COUNTED_FACETS:
+                    for value, count in counts[facet].items():
+                        others = {k: v for k, v in selected.items() if k != facet}
+                        self.assertEqual(count, self.brute_count({**others, facet: value}), (facet, value))
+
+    def test_restrict_mask(self):
+        ids = {3, 4, 99}
+        restrict = self.index.mask(ids)
+        self.assertEqual(self.index.count({}, restrict), self.brute_count({}, ids))
+        self.assertEqual(self.index.counts({}, restrict)['season'], {'winter': 1, 'summer': 1, 'all-season': 0})
+
+    def test_rebuilt_after_catalog_change(self):
+        brand = Brand.objects.create(name='Facet', slug='facet')
+        Product.objects.create(name='Facet A 205/55R16 91H', brand=brand, width=205, profile=55, diameter=16,
+                               stock_quantity=4)
+        self.assertEqual(get_facets().count({'width': 205}), 1)
+        # save() змінює версію каталогу — індекс перебудовується
+        Product.objects.create(name='Facet B 205/55R16 94V', brand=brand, width=205, profile=55, diameter=16,
+                               stock_quantity=2)
+        self.assertEqual(get_facets().count({'width': 205}), 2)
+        self.assertEqual(facet_filter_options({'width': 205})['brand_options'],
+                         [{'value': brand.pk, 'count': 2, 'label': 'Facet'}])
+
+
+class KeysetPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Page', slug='page')
+        # Однакові ціни — порядок усередині визначає id
+        Product.objects.bulk_create(
+            Product(name=f"Page {i}", slug=f"page-{i}", brand=brand, price=100 + i % 4) for i in range(40))
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def paginator(self):
+        return KeysetPaginator(Product.objects.all(), 3, ['-price', 'id'], seo_pages=2)
+
+    def page(self, query=''):
+        return self.paginator().page_from_request(self.factory.get(f"/catalog/?{query}"))
+
+    def test_walk_forward_and_back(self):
+        expected = list(Product.objects.order_by('-price', 'id').values_list('id', flat=True))
+        seen, page, pages = [], self.page(), []
+        while True:
+            pages.append(page)
+            seen += [p.pk for p in page]
+            if not page.has_next():
+                break
+            page = self.page(page.next_query)
+        self.assertEqual(seen, expected)
+        self.assertEqual([p.number for p in pages], list(range(1, 15)))
+        # Глибокі сторінки — курсором, перші — ?page=N
+        self.assertTrue(pages[2].previous_query.startswith('page='))
+        self.assertTrue(pages[5].previous_query.startswith('cursor='))
+
+        back = self.page(pages[9].previous_query)
+        self.assertEqual([p.pk for p in back], [p.pk for p in pages[8]])
+        self.assertEqual(back.number, 9)
+
+    def test_forged_cursor_falls_back_to_first_page(self):
+        first = [p.pk for p in self.page()]
+        ordering = self.paginator().ordering_key
+        for key in (['abc', 'x'], [None, 1], [{'a': 1}, 2], ['1', '2', '3'], []):
+            with self.subTest(key=key):
+                page = self.page('cursor=' + encode_cursor({'p': 7, 'd': 'next', 'o': ordering, 'k': key}))
+                self.assertEqual([p.pk for p in page], first)
+                self.assertEqual(page.number, 1)
+        self.assertEqual([p.pk for p in self.page('cursor=!!!not-base64')], first)
+
+    def test_deep_page_number_is_clamped(self):
+        self.assertEqual(self.page('page=999').number, 2)
+        self.assertEqual(self.page('page=abc').number, 1)
+        self.assertEqual([p.pk for p in self.page('page=2')], [p.pk for p in self.page('page=50')])
+
+    def test_catalog_view_with_forged_cursor(self):
+        response = self.client.get('/catalog/', {'cursor': encode_cursor({'o': 'price,id', 'k': ['zzz', 'x']})})
+        self.assertEqual(response.status_code, 200)
+
+
+class PageCacheTest(TestCase):
+    URL = '/shiny/205-55-r16/'
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Cache', slug='cache')
+        cls.product = Product.objects.create(name='Cache X 205/55R16 91H', brand=brand, width=205, profile=55,
+                                             diameter=16, price=1000, stock_quantity=8)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_personal_parts_substituted_per_visitor(self):
+        first = self.client.get(self.URL)
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+        self.client.post(f'/add/{self.product.pk}/', {'quantity': 2})
+        second = self.client.get(self.URL)
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+
+        content = second.content.decode()
+        self.assertNotIn(CSRF_PLACEHOLDER, content)
+        self.assertIn('<span id="cart-badge">(2)</span>', content)
+        self.assertIn('<span id="cart-badge-mobile">(2)</span>', content)
+        # Чужий кошик у спільну копію не потрапив
+        other = Client().get(self.URL).content.decode()
+        self.assertIn('<span id="cart-badge">(0)</span>', other)
+
+    def test_cache_key_normalization(self):
+        self.client.get(self.URL, {'season': 'winter', 'utm_source': 'x'})
+        response = self.client.get(self.URL, {'gclid': '1', 'season': 'winter'})
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+
+    def test_cursor_and_unknown_params_bypass_cache(self):
+        for params in ({'cursor': 'abc'}, {'foo': 'bar'}, {'page': '99'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.URL, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('X-Page-Cache', response)
+
+    def test_catalog_change_invalidates(self):
+        self.client.get(self.URL)
+        bump_catalog_version()
+        self.assertEqual(self.client.get(self.URL)['X-Page-Cache'], 'MISS')
+
+
+class CatalogStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.brands = [Brand.objects.create(name=name, slug=name.lower()) for name in ('StatA', 'StatB')]
+        Product.objects.bulk_create(
+            Product(name=f"Stat {i}", slug=f"stat-{i}", brand=cls.brands[i % 2], width=(195, 205)[i % 3 == 0],
+                    profile=55, diameter=16, seasonality=('winter', 'summer')[i % 5 == 0],
+                    price=1000 + i * 10 if i % 7 else 0, stock_quantity=i % 4)
+            for i in range(60))
+
+    def snapshot(self):
+        return {(s.brand_key, s.seasonality, s.width, s.profile, s.diameter): tuple(getattr(s, f) for f in STAT_FIELDS)
+                for s in CatalogStats.objects.all()}
+
+    def expected(self, **filters):
+        qs = Product.objects.filter(**filters)
+        priced = qs.filter(price__gt=0)
+        return (priced.aggregate(v=Min('price'))['v'], priced.aggregate(v=Max('price'))['v'],
+                qs.filter(stock_quantity__gt=0).count(), qs.count())
+
+    def test_full_refresh_matches_products(self):
+        refresh_catalog_stats()
+        brand = self.brands[0]
+        cases = [
+            ({}, {}),
+            ({'brand_id': brand.pk}, {'brand': brand}),
+            ({'season': 'winter'}, {'seasonality': 'winter'}),
+            ({'brand_id': brand.pk, 'season': 'summer', 'width': 205, 'profile': 55, 'diameter': 16},
+             {'brand': brand, 'seasonality': 'summer', 'width': 205, 'profile': 55, 'diameter': 16}),
+            ({'width': 195, 'profile': 55, 'diameter': 16}, {'width': 195, 'profile': 55, 'diameter': 16}),
+        ]
+        for stats_filters, product_filters in cases:
+            with self.subTest(stats_filters):
+                stats = get_catalog_stats(**stats_filters)
+                self.assertEqual(tuple(getattr(stats, f) for f in STAT_FIELDS), self.expected(**product_filters))
+        self.assertIsNone(get_catalog_stats(width=205))
+
+    def test_incremental_refresh_equals_full(self):
+        refresh_catalog_stats()
+        Product.objects.filter(width=205).update(price=5, stock_quantity=0)
+        Product.objects.filter(width=195)[:1].get().delete()
+        refresh_catalog_stats([(205, 55, 16), (195, 55, 16)])
+        incremental = self.snapshot()
+        CatalogStats.objects.all().delete()
+        refresh_catalog_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_emptied_size_is_removed(self):
+        refresh_catalog_stats()
+        Product.objects.filter(width=205).delete()
+        refresh_catalog_stats([(205, 55, 16)])
+        self.assertFalse(CatalogStats.objects.filter(width=205).exists())
+        self.assertEqual(get_catalog_stats().total_count, Product.objects.count())
+
+
+class SearchFallbackTest(TestCase):
+    """Пошук без pg_trgm: індекс слів у пам'яті, кирилиця, опечатки, AND по словах."""
+
+    @classmethod
+    def setUpTestData(cls):
+        michelin = Brand.objects.create(name='Michelin', slug='michelin')
+        nokian = Brand.objects.create(name='Nokian', slug='nokian')
+        cls.alpin = Product.objects.create(name='Alpin 6 205/55R16 91H', brand=michelin, width=205, profile=55,
+                                           diameter=16)
+        cls.primacy = Product.objects.create(name='Primacy 4 205/55R16 91V', brand=michelin, width=205,
+                                             profile=55, diameter=16)
+        cls.hakka = Product.objects.create(name='Hakkapeliitta R5 205/55R16 94R XL', brand=nokian, width=205,
+                                           profile=55, diameter=16)
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, query):
+        return set(search_products(Product.objects.all(), query).values_list('id', flat=True))
+
+    def test_normalize_words(self):
+        self.assertEqual(normalize_words('Шина Мішлен Альпін-6'), ['michelin', 'alpin', '6'])
+
+    def test_queries(self):
+        self.assertEqual(self.ids('мішлен'), {self.alpin.pk, self.primacy.pk})
+        self.assertEqual(self.ids('michelen alpin'), {self.alpin.pk})
+        self.assertEqual(self.ids('hakkapel'), {self.hakka.pk})
+        self.assertEqual(self.ids('michelin hakkapeliitta'), set())
+        self.assertEqual(self.ids(''), {self.alpin.pk, self.primacy.pk, self.hakka.pk})
+
+    def test_rank_prefers_exact_word(self):
+        ranked = search_products(Product.objects.all(), 'michelin alpin').order_by('-search_rank')
+        self.assertEqual(ranked[0].pk, self.alpin.pk)
+
+    def test_index_follows_catalog_version(self):
+        self.assertEqual(self.ids('kumho'), set())
+        new = Product.objects.create(name='Кумхо Wintercraft 205/55R16 91T', brand=None, width=205, profile=55,
+                                     diameter=16)
+        self.assertEqual(self.ids('kumho'), {new.pk})
+
+
+class TyreNameParsingTest(TestCase):
+    def test_parse_name(self):
+        cases = [
+            # назва, бренд, (модель, навантаження, швидкість, XL, RunFlat, шипи, рік)
+            ('Шина Michelin Alpin 6 205/55 R16 94H XL', 'Michelin', ('Alpin 6', '94', 'H', True, False, None, None)),
+            ('Nokian Hakkapeliitta 10 EV 205/55R16 94T шип', 'Nokian', ('Hakkapeliitta 10 EV', '94', 'T', False, False, 'Шип', None)),
+            ('Pirelli P Zero 245/40 R19 94v RunFlat DOT 2523', 'Pirelli', ('P Zero', '94', 'V', False, True, None, 2023)),
+            ('Leao Nova-Force 185/65 R14 86 T (2024)', 'Leao', ('Nova-Force', '86', 'T', False, False, None, 2024)),
+            ('Old Classic 205/55 R16 91VR', '', ('Old Classic', '91', 'VR', False, False, None, None)),
+            ('Росава Snowgard 195/65 R15 91T нешип', 'Росава', ('Snowgard', '91', 'T', False, False, None, None)),
+            ('Kormoran Snowpro 205/55 R16 91H під шип', 'Kormoran', ('Snowpro', '91', 'H', False, False, 'Під шип', None)),
+        ]
+        for name, brand, expected in cases:
+            with self.subTest(name=name):
+                parsed = parse_name(name, brand, 205, 55, 16)
+                self.assertEqual((parsed['model_name'], parsed['load_index'], parsed['speed_index'], parsed['is_xl'],
+                                  parsed['is_runflat'], parsed['stud_type'], parsed['year']), expected)
+
+    def test_display_name_stored_on_save(self):
+        brand = Brand.objects.create(name='Michelin', slug='michelin')
+        product = Product.objects.create(name='Шина Michelin Alpin 6 205/55 R16 94H XL', brand=brand, width=205,
+                                         profile=55, diameter=16)
+        product.refresh_from_db()
+        self.assertEqual(product.display_name, 'Alpin 6 XL 205/55 R16 94H')
+        self.assertEqual((product.load_index, product.speed_index, product.is_xl), ('94', 'H', True))
+        self.assertEqual(product.identity_key, 'michelin|alpin6|205-55-16|94h|xl')
+
+    def test_identity_key_ignores_spelling(self):
+        self.assertEqual(identity_key('Michelin', 'MICHELIN Alpin-6 205/55R16 94H Extra Load', 205, 55, 16),
+                         identity_key('Мішлен', 'alpin 6 205/55 R16 94h XL', 205, 55, 16))
+        self.assertNotEqual(identity_key('Michelin', 'Alpin 6 94H', 205, 55, 16),
+                            identity_key('Michelin', 'Alpin 6 94H', 215, 55, 16))
+
+
+class SyncStageTest(TestCase):
+    """Стейджинг синку: перенос у товари, обнулення, злиття пропозицій і журнал змін."""
+
+    def setUp(self):
+        cache.clear()
+        brand = Brand.objects.create(name='Stage', slug='stage')
+
+        def make(name, stock, supplier):
+            product = Product.objects.create(name=f"{name} 205/55R16 91H", brand=brand, width=205, profile=55,
+                                             diameter=16, cost_price=800, price=1000, stock_quantity=stock)
+            Product.objects.filter(pk=product.pk).update(supplier=supplier)
+            return product
+
+        self.a = make('Stage A', 4, 'omega')
+        self.b = make('Stage B', 5, 'omega')
+        self.c = make('Stage C', 3, 'dist')
+
+    def stage(self, product, supplier='omega', stock=0, cost=900, price=1100, fingerprint='f1'):
+        return SyncStage.objects.create(product=product, supplier=supplier, stock_quantity=stock,
+                                        cost_price=decimal.Decimal(cost), price=price, fingerprint=fingerprint)
+
+    def kinds(self, product):
+        return sorted(product.changes.values_list('kind', flat=True))
+
+    def test_apply_updates_and_zeroes_only_own_products(self):
+        self.stage(self.a)
+        self.assertEqual(apply_stage(['omega']), (1, 1))
+        for product in (self.a, self.b, self.c):
+            product.refresh_from_db()
+        self.assertEqual((self.a.stock_quantity, self.a.price, self.a.supplier_fingerprint), (0, 1100, 'f1'))
+        self.assertEqual(self.b.stock_quantity, 0)
+        self.assertEqual(self.c.stock_quantity, 3)
+        self.assertEqual(self.kinds(self.a), ['out_of_stock', 'price_up'])
+        self.assertEqual(self.kinds(self.b), ['delisted'])
+        self.assertEqual(self.kinds(self.c), [])
+
+    def test_unchanged_fingerprint_is_not_rewritten(self):
+        self.stage(self.a, stock=4)
+        self.stage(self.b, stock=5)
+        apply_stage(['omega'])
+        clear_stage(['omega'])
+        self.stage(self.a, stock=4)
+        self.stage(self.b, stock=5)
+        self.assertEqual(apply_stage(['omega']), (0, 0))
+        self.assertEqual(ProductChange.objects.count(), 2)  # лише price_up з першого переносу
+
+    def test_merge_rules(self):
+        for rule, stock in (('cheapest', 3), ('sum_stock', 5)):
+            with self.subTest(rule=rule):
+                clear_stage(['omega', 'dist'])
+                self.stage(self.a, 'omega', stock=3, cost=900, price=1100, fingerprint='o')
+                self.stage(self.a, 'dist', stock=2, cost=950, price=1150, fingerprint='d')
+                self.stage(self.b, 'omega', stock=1)
+                self.assertEqual(merge_stage(['omega', 'dist'], rule), 1)
+                merged = SyncStage.objects.get(product=self.a)
+                self.assertEqual((merged.supplier, merged.stock_quantity, merged.price), ('omega', stock, 1100))
+        clear_stage(['omega', 'dist'])
+        # Найдешевша без залишку програє дорожчій у наявності
+        self.stage(self.a, 'omega', stock=0, cost=900)
+        self.stage(self.a, 'dist', stock=2, cost=950, price=1150)
+        merge_stage(['omega', 'dist'])
+        self.assertEqual(SyncStage.objects.get(product=self.a).supplier, 'dist')
+        with self.assertRaises(ValueError):
+            merge_stage(['omega'], 'random')
+
+    def test_process_page_creates_and_stages(self):
+        engine = ProductSyncEngine()
+        rows = [SupplierRow('Stage A 205/55R16 91H', 'Stage', 205, 55, 16, cost=900, stock=2),
+                SupplierRow('Stage New 205/55R16 94V', 'Stage', 205, 55, 16, cost=700, stock=6, info='Опис')]
+        self.assertEqual(engine.process_page(rows), (1, 2))
+        new = Product.objects.get(name='Stage New 205/55R16 94V')
+        self.assertEqual((new.stock_quantity, new.description, new.supplier), (6, 'Опис', 'omega'))
+        self.assertTrue(new.price > 0 and new.slug)
+        self.assertEqual(self.kinds(new), ['new'])
+        self.assertEqual(SyncStage.objects.get(product=self.a).stock_quantity, 2)
+
+
+class FlakyTransport(StandinTransport):
+    """StandinTransport, що падає на сторінках fail_from (failures разів на сторінку)."""
+
+    def __init__(self, catalog, fail_from=(), failures=1):
+        super().__init__(catalog)
+        self.fail_left = {start: failures for start in fail_from}
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        self.calls.append(json['From'])
+        if self.fail_left.get(json['From'], 0) > 0:
+            self.fail_left[json['From']] -= 1
+            raise requests.ConnectionError('boom')
+        return super().post(url, json=json, timeout=timeout, stream=stream)
+
+
+@mock.patch('time.sleep')
+class OmegaClientTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def omega(self, transport, retries=2):
+        return OmegaClient('key', session=transport, rate_limit=0, retries=retries, workers=2)
+
+    def test_transient_error_is_retried(self, sleep):
+        transport = FlakyTransport(SyntheticCatalog(50), fail_from=[0], failures=2)
+        rows, count, total = self.omega(transport).fetch_page(0, 20)
+        self.assertEqual((len(rows), count, total), (20, 20, 50))
+        self.assertEqual(transport.calls, [0, 0, 0])
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_retries_exhausted(self, sleep):
+        transport = FlakyTransport(SyntheticCatalog(50), fail_from=[0], failures=5)
+        with self.assertRaises(OmegaError):
+            self.omega(transport, retries=1).fetch_page(0, 20)
+
+    def test_api_error_and_server_error(self, sleep):
+        failing = StandinTransport(SyntheticCatalog(50), error_rate=1.0)
+        with self.assertRaisesMessage(OmegaError, 'HTTP 503'):
+            self.omega(failing, retries=1).fetch_page(0, 20)
+        with self.assertRaisesMessage(OmegaError, 'bad key'):
+            self.omega(failing).read_page([b'{"Success": false, "Errors": ["bad key"], "Data": null}'])
+
+    def test_interrupted_sync_resumes_from_checkpoint(self, sleep):
+        catalog = SyntheticCatalog(120)
+        transport = FlakyTransport(catalog, fail_from=[80], failures=10)
+        result = run_sync(self.omega(transport, retries=1), page_size=40)
+        self.assertIsNotNone(result['error'])
+        self.assertFalse(result['finished'])
+        self.assertEqual(load_checkpoint()['next_from'], 80)
+        # Записані сторінки лишаються: нові товари вже створені, стейджинг — до кінця синку
+        self.assertEqual(Product.objects.count(), 80)
+
+        transport = FlakyTransport(catalog)
+        result = run_sync(self.omega(transport), page_size=40)
+        self.assertTrue(result['finished'])
+        self.assertEqual(min(transport.calls), 80)
+        self.assertIsNone(load_checkpoint())
+        self.assertEqual(Product.objects.count(), 120)
+        self.assertFalse(SyncStage.objects.exists())
+
+
+def _walk_json(stream):
+    # Збирає значення назад через iter_object/iter_array — як OmegaClient.read_page
+    if stream.peek() == '{':
+        return {key: _walk_json(stream) for key in stream.iter_object()}
+    if stream.peek() == '[':
+        return [_walk_json(stream) for _ in stream.iter_array()]
+    return stream.value()
+
+
+class JsonStreamTest(TestCase):
+    DOC = {
+        'Success': True, 'Errors': [], 'Empty': {},
+        'Data': {'Total': 12345678901234, 'Result': [
+            {'DescriptionUkr': 'Шина Nokian "XL" ✓ é', 'CustomerPrice': 1234.5, 'Rests': [{'Value': '>4'}, {'Value': 3}]},
+            {'Info': 'ї' * 3000, 'Flag': False, 'Nothing': None, 'Neg': -0.25e-3},
+        ]},
+        'Tail': 7,
+    }
+
+    def test_every_chunk_size(self):
+        body = json.dumps(self.DOC, ensure_ascii=False, indent=1).encode()
+        for size in (1, 2, 3, 5, 7, 64, 4096, len(body)):
+            with self.subTest(size=size):
+                chunks = (body[i:i + size] for i in range(0, len(body), size))
+                self.assertEqual(_walk_json(JsonStream(chunks)), self.DOC)
+
+    def test_number_at_chunk_end_is_not_cut(self):
+        stream = JsonStream([b'[12', b'34', b'5, 6', b']'])
+        self.assertEqual(_walk_json(stream), [12345, 6])
+
+    def test_truncated_and_broken_input(self):
+        body = json.dumps(self.DOC).encode()
+        for broken in (body[:len(body) // 2], b'{"a" 1}', b'[1, 2', b''):
+            with self.subTest(broken=broken[:20]):
+                with self.assertRaises(ValueError):
+                    _walk_json(JsonStream([broken]))
+
+
+class SlugAllocatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Slug', slug='slug')
+        Product.objects.bulk_create(Product(name=f"Slug {i}", slug=slug, brand=brand)
+                                    for i, slug in enumerate(['slug-alpin', 'slug-alpin-1', 'slug-alpin-3']))
+
+    def test_collisions_in_db_and_in_batch(self):
+        allocator = SlugAllocator()
+        self.assertEqual(allocator.allocate_many(['slug-alpin'] * 3 + ['slug-new'] * 2 + ['']),
+                         ['slug-alpin-2', 'slug-alpin-4', 'slug-alpin-5', 'slug-new', 'slug-new-1', 'product'])
+        # Той самий алокатор пам'ятає роздане між пачками
+        self.assertEqual(allocator.allocate('slug-new'), 'slug-new-2')
+
+    def test_queries_per_batch(self):
+        allocator = SlugAllocator()
+        # Точний збіг для всієї пачки + префікси лише для зайнятих баз
+        with self.assertNumQueries(2):
+            allocator.allocate_many([f"slug-fresh-{i}" for i in range(50)] + ['slug-alpin'])
+
+    def test_exclude_own_slug(self):
+        product = Product.objects.get(slug='slug-alpin-1')
+        self.assertEqual(SlugAllocator(exclude_id=product.pk).allocate('slug-alpin-1'), 'slug-alpin-1')
+
+    def test_product_save(self):
+        brand = Brand.objects.get(slug='slug')
+        product = Product.objects.create(name='Alpin', brand=brand, width=205)
+        self.assertEqual(product.slug, 'slug-alpin-2')
+        product.name = 'Alpin 6'
+        product.save()
+        self.assertEqual(product.slug, 'slug-alpin-2')
+        self.assertEqual(product_slug_base('Michelin', 'Alpin 6 205/55 R16'), 'michelin-alpin-6-20555-r16')
+
+
+def _xlsx(rows, name='import.xlsx'):
+    book = openpyxl.Workbook()
+    for row in rows:
+        book.active.append(row)
+    buf = io.BytesIO()
+    book.save(buf)
+    return SimpleUploadedFile(name, buf.getvalue())
+
+
+PRICE_HEADER = ['Бренд', 'Модель', 'Типоразмер', 'Сезон', 'Цена', 'Кол-во']
+
+
+class ImportDirTestCase(TestCase):
+    # Файли задач — у тимчасовій теці, а не в MEDIA_ROOT
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(IMPORT_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class ImportJobRunnerTest(ImportDirTestCase):
+    def price_rows(self, count, brand='Job'):
+        return [PRICE_HEADER] + [[brand, f"Model {i}", '195/65 R15', 'літо', 1000 + i, 4] for i in range(count)]
+
+    def test_queued_to_done(self):
+        job = enqueue('excel', _xlsx(self.price_rows(7)))
+        self.assertEqual(job.status, 'queued')
+        self.assertTrue(os.path.exists(job.file_path))
+        run_worker(once=True, chunk_rows=3)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count, job.processed, job.position), ('done', 7, 7, 8))
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertIsNone(claim_next())
+
+    def test_failed_jobs(self):
+        missing_column = enqueue('seo', _xlsx([['brand', 'x']]))
+        unknown_kind = ImportJob.objects.create(kind='nope', file_path='/nonexistent.xlsx', original_name='x')
+        run_worker(once=True)
+        for job in (missing_column, unknown_kind):
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'failed')
+        self.assertIn('nope', unknown_kind.message)
+
+    def test_stale_job_resumes_from_position(self):
+        job = enqueue('excel', _xlsx(self.price_rows(6)))
+        runner = JobRunner(claim_next(), chunk_rows=2)
+        flush = runner.flush
+
+        def stop_after_first(batch):
+            # Воркер "впав" після першої частини
+            if runner.job.position:
+                raise KeyboardInterrupt
+            flush(batch)
+        runner.flush = stop_after_first
+        with self.assertRaises(KeyboardInterrupt):
+            runner.run()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.position), ('running', 3))
+        # Свіжий running ще не покинутий
+        self.assertIsNone(claim_next())
+        ImportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        run_worker(once=True, chunk_rows=2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count, job.processed), ('done', 6, 6))
+        self.assertEqual(Product.objects.filter(brand__name='Job').count(), 6)
+
+    def test_broken_row_retried_by_row(self):
+        process = PriceListImport.process
+
+        def broken(importer, rows):
+            if any(excel_row == 4 for excel_row, _ in rows):
+                importer.get_brand('Rolled Back')
+                raise RuntimeError('bad row')
+            return process(importer, rows)
+        job = enqueue('excel', _xlsx(self.price_rows(5)))
+        with mock.patch.object(PriceListImport, 'process', broken):
+            run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count, job.error_count), ('done', 4, 1))
+        self.assertIn('Рядок 4: bad row', job.errors)
+        self.assertFalse(Brand.objects.filter(name='Rolled Back').exists())
+
+
+class PriceListImportTest(ImportDirTestCase):
+    def run_import(self, rows):
+        enqueue('excel', _xlsx([PRICE_HEADER] + rows))
+        run_worker(once=True)
+        return ImportJob.objects.latest('id')
+
+    def test_created_updated_unchanged(self):
+        rows = [['Bulk', f"Model {i} 91V XL", '205/55 R16', 'зима', 1000 + i, 4] for i in range(5)]
+        job = self.run_import(rows + [rows[0][:4] + [777, 1]])
+        # Дубль у файлі — оновлення щойно створеного
+        self.assertEqual((job.status, job.created_count, job.updated_count), ('done', 5, 1))
+        product = Product.objects.get(name='Model 0 91V XL')
+        self.assertEqual(product.cost_price, 777)
+        self.assertTrue(product.slug and product.is_xl and product.identity_key)
+        self.assertEqual(product.load_index, '91')
+
+        job = self.run_import(rows)
+        self.assertEqual((job.created_count, job.updated_count, job.unchanged_count), (0, 1, 4))
+        job = self.run_import(rows[:1] + [rows[1][:4] + [1500, 4]] + rows[2:])
+        self.assertEqual((job.created_count, job.updated_count, job.unchanged_count), (0, 1, 4))
+        self.assertEqual(Product.objects.get(name='Model 1 91V XL').cost_price, 1500)
+
+    def test_unparsed_values_are_errors(self):
+        job = self.run_import([['Err', 'E1', '205/55 R16', 'літо', 'abc', 2],
+                               ['Err', 'E2', '205/55 R16', 'літо', 900, 'x'],
+                               ['Err', 'E3', '205/55 R16', 'літо', 900, 3],
+                               ['Err', 'E4', '205/55 R16', 'літо', '', '']])
+        self.assertEqual((job.created_count, job.error_count), (2, 2))
+        self.assertIn('Рядок 2', job.errors)
+        self.assertIn('Рядок 3', job.errors)
+        self.assertEqual(set(Product.objects.filter(brand__name='Err').values_list('name', flat=True)), {'E3', 'E4'})
+
+
+class ModelLineIndexTest(ImportDirTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Nokian', slug='nokian')
+        for name in ['Nokian Hakkapeliitta R5 205/55R16 94R XL', 'Nokian Hakkapeliitta R5 215/55R17 98R',
+                     'Nokian Hakkapeliitta 10p 205/55R16 94T', 'Nokian Hakkapeliitta 10 EV 205/55R16 94T']:
+            Product.objects.create(name=name, brand=brand, width=205, profile=55, diameter=16, cost_price=1000)
+
+    def test_match(self):
+        index = ModelLineIndex()
+        status, line, ids = index.match('Nokian', 'Hakkapeliitta R5')
+        self.assertEqual((status, len(ids)), (MATCHED, 2))
+        # Інший порядок слів і кирилиця в бренді
+        self.assertEqual(index.match('Нокіан', 'R5 Hakkapeliitta')[:2], (MATCHED, line))
+        self.assertEqual(index.match('Nokian', 'Hakkapeliitta 10 EV')[0], MATCHED)
+        self.assertEqual(index.match('Nokian', 'Hakkapeliitta')[0], AMBIGUOUS)
+        self.assertEqual(index.match('Nokian', 'Nordman')[0], UNMATCHED)
+        self.assertEqual(index.match('Michelin', 'Hakkapeliitta R5')[0], UNMATCHED)
+
+    def test_photo_import_skips_ambiguous(self):
+        enqueue('photos', _xlsx([['Brand', 'Model', 'Url'], ['Nokian', 'Hakkapeliitta R5', 'http://x/r5.jpg'],
+                                 ['Nokian', 'Hakkapeliitta', 'http://x/amb.jpg'], ['Nokian', 'Nordman 8', 'http://x/n.jpg']]))
+        run_worker(once=True)
+        job = ImportJob.objects.latest('id')
+        self.assertEqual((job.status, job.updated_count, job.skipped_count), ('done', 2, 2))
+        self.assertIn('неоднозначно', job.errors)
+        self.assertIn('не знайдено', job.errors)
+        self.assertEqual(Product.objects.filter(photo_url='http://x/r5.jpg').count(), 2)
+        self.assertFalse(Product.objects.filter(photo_url='http://x/amb.jpg').exists())
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('export', password='x')
+        brand = Brand.objects.create(name='Michelin', slug='michelin')
+        for name in ['Michelin Alpin 6 205/55R16 91H', 'Michelin Alpin 6 195/65R15 91T',
+                     'Шина Test<&> "q" \x01 205/55R16 91V']:
+            Product.objects.create(name=name, brand=brand, width=205, profile=55, diameter=16, cost_price=1000)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def download(self, url):
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content), response
+
+    def test_catalog_xlsx(self):
+        data, response = self.download('/admin/store/product/export-catalog/')
+        self.assertTrue(response['Content-Type'].startswith('application/vnd.openxml'))
+        self.assertIn('catalog.xlsx', response['Content-Disposition'])
+        rows = list(openpyxl.load_workbook(io.BytesIO(data)).active.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), CATALOG_HEADER)
+        self.assertEqual([row[0] for row in rows[1:]], list(Product.objects.order_by('id').values_list('id', flat=True)))
+        # Керівні символи XML відкинуті, решта назви ціла
+        self.assertIn('Test<&> "q"', rows[3][2])
+        self.assertNotIn('\x01', rows[3][2])
+
+    def test_catalog_csv(self):
+        data, response = self.download('/admin/store/product/export-catalog/?format=csv')
+        self.assertIn('catalog.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+        self.assertEqual(rows[0], CATALOG_HEADER)
+        self.assertEqual(len(rows), Product.objects.count() + 1)
+
+    def test_unique_models(self):
+        data, _ = self.download('/admin/store/product/export-models/')
+        rows = list(openpyxl.load_workbook(io.BytesIO(data)).active.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), UNIQUE_MODELS_HEADER)
+        # Два розміри Alpin 6 — одна модель
+        self.assertEqual([row[:2] for row in rows[1:]].count(('Michelin', 'Alpin 6')), 1)
+        self.assertEqual(len(rows), 3)
+
+
+class OrderTotalsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Total', slug='total')
+        cls.products = [Product.objects.create(name=f"Total {i}", brand=brand, width=205, profile=55, diameter=16,
+                                               cost_price=1000, stock_quantity=10) for i in range(3)]
+
+    def make_order(self):
+        order = Order.objects.create(full_name='Test', phone='0501234567')
+        for quantity, product in enumerate(self.products, start=1):
+            OrderItem.objects.create(order=order, product=product, quantity=quantity,
+                                     price_at_purchase=decimal.Decimal('100.50'))
+        order.refresh_from_db()
+        return order
+
+    def test_item_save_and_delete(self):
+        order = self.make_order()
+        self.assertEqual((order.total_amount, order.items_count), (decimal.Decimal('603.00'), 6))
+        item = order.items.get(quantity=1)
+        item.quantity = 10
+        item.save()
+        order.refresh_from_db()
+        self.assertEqual(order.items_count, 15)
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.items_count), (decimal.Decimal('502.50'), 5))
+
+    def test_queryset_delete(self):
+        # "Видалити вибрані" в адмінці — delete() queryset-ом
+        order = self.make_order()
+        OrderItem.objects.filter(order=order, quantity__gt=1).delete()
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.items_count), (decimal.Decimal('100.50'), 1))
+
+    def test_cascade_skips_recalculation(self):
+        order = self.make_order()
+        with mock.patch.object(Order, 'recalculate_totals') as recalculate:
+            order.delete()
+        recalculate.assert_not_called()
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_refresh_command(self):
+        order = self.make_order()
+        Order.objects.update(total_amount=0, items_count=0)
+        call_command('refresh_order_totals', stdout=io.StringIO())
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.items_count), (decimal.Decimal('603.00'), 6))
+
+    @mock.patch('store.views.send_telegram')
+    def test_checkout(self, send_telegram):
+        for product in self.products[:2]:
+            self.client.post(f"/add/{product.pk}/", {'quantity': 2})
+        response = self.client.post('/checkout/', {'shipping_type': 'pickup', 'pickup_name': 'Test',
+                                                   'pickup_phone': '050 123 45 67'})
+        self.assertEqual(response.status_code, 302)
+        order = Order.objects.get()
+        price = sum(product.price for product in self.products[:2]) * 2
+        self.assertEqual((order.total_amount, order.items_count), (price, 4))
+        send_telegram.assert_called_once()
+
+
+class InvoiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('invoice', password='x')
+        brand = Brand.objects.create(name='Invoice', slug='invoice')
+        product = Product.objects.create(name='Invoice Alpin', brand=brand, width=205, profile=55, diameter=16,
+                                         cost_price=1000)
+        cls.order = Order.objects.create(full_name='Іван & <Петренко>', phone='0501234567',
+                                         shipping_type='nova_poshta', city='Львів', nova_poshta_branch='№5')
+        OrderItem.objects.create(order=cls.order, product=product, quantity=2, price_at_purchase=1500)
+        OrderItem.objects.create(order=cls.order, product=None, quantity=1, price_at_purchase=5)
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_order(self):
+        return Order.objects.get(pk=self.order.pk)
+
+    def test_admin_print(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(f"/admin/store/order/{self.order.pk}/print/")
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_cached_until_order_changes(self):
+        pdf = invoice_pdf(self.fresh_order())
+        with mock.patch('store.invoice.render_invoice') as render:
+            self.assertEqual(invoice_pdf(self.fresh_order()), pdf)
+        render.assert_not_called()
+
+        item = self.order.items.get(quantity=2)
+        item.quantity = 7
+        item.save()
+        self.assertNotEqual(invoice_pdf(self.fresh_order()), pdf)
+        Order.objects.filter(pk=self.order.pk).update(phone='0509999999')
+        with mock.patch('store.invoice.render_invoice', return_value=b'%PDF-new') as render:
+            self.assertEqual(invoice_pdf(self.fresh_order()), b'%PDF-new')
+        render.assert_called_once()
@@ -0,0 +1,179 @@
+import datetime
+import re
+
+from .search import normalize_words
+
+# --- 🏷️ РОЗБІР НАЗВИ ШИНИ ---
+# Раніше Product.display_name проганяв ~10 регулярок на кожен показ картки.
+# Тепер назва розбирається один раз при збереженні/синку/імпорті,
+# а результат лежить у колонках товару. Product.save (адмінка і все, що
+# зберігає товар поштучно) викликає apply_name_attributes сам; синк
+# постачальників і імпорт Excel пишуть пачками bulk_create/bulk_update без
+# save() і викликають його напряму. Парсер спільний, тож каталог фільтрує
+# по індексованих колонках.
+# Звідси ж ключ ідентичності товару (Product.identity_key): бренд + лінійка
+# + розмір + індекси + XL/RunFlat, нормалізовані так само, як пошук
+# (регістр, кирилиця -> латиниця, пробіли/дефіси). За ним синк, прайси,
+# імпорт фото і SEO знаходять товар одним пошуком по індексу.
+
+XL_RE = re.compile(r'\bXL\b|\bEXTRA LOAD\b', re.IGNORECASE)
+RUNFLAT_RE = re.compile(r'\bRunFlat\b|\bRFT\b', re.IGNORECASE)
+# 94V, 94 V, 94v, 94VR — регістр вирівнюється при розборі
+INDEX_RE = re.compile(r'\b(\d{2,3})\s*([A-Za-z]{1,2})\b')
+SIZE_RE = re.compile(r'\d{3}/\d{2}\s?[R|Z|r|z]\d{1,2}')
+EDGE_RE = re.compile(r'^\W+|\W+$')
+SPACES_RE = re.compile(r'\s+')
+# "під шип" / "п/ш" — раніше за просто "шип"; "нешип" сюди не потрапляє
+STUD_READY_RE = re.compile(r'під\s*шип|под\s*шип|\bп/ш\b', re.IGNORECASE)
+STUDDED_RE = re.compile(r'(?<![а-яіїєa-z])(?:шип\w*|studded)\b', re.IGNORECASE)
+NOT_STUDDED_RE = re.compile(r'не\s*шип|нешип|non[\s-]*stud|studless', re.IGNORECASE)
+DOT_RE = re.compile(r'\bDOT\s*(\d{2})(\d{2})\b', re.IGNORECASE)
+YEAR_RE = re.compile(r'\((20\d{2})\)|\b(20\d{2})\s*(?:р\.|рік|року|год|year)', re.IGNORECASE)
+
+STUD_NONE, STUD_READY, STUD_STUDDED = "Не шип", "Під шип", "Шип"
+STUD_CHOICES = [STUD_NONE, STUD_READY, STUD_STUDDED]
+
+# Порядок символів швидкості — для сортування фільтра
+SPEED_ORDER = 'JKLMNPQRSTUHVWY'
+
+
+def is_speed_symbol(value):
+    # V, v, ZR, VR (старе позначення з R)
+    value = value.upper()
+    return value[0] in SPEED_ORDER + 'Z' and value[1:] in ('', 'R')
+
+
+def parse_stud(text):
+    if not text or NOT_STUDDED_RE.search(text):
+        return None
+    if STUD_READY_RE.search(text):
+        return STUD_READY
+    if STUDDED_RE.search(text):
+        return STUD_STUDDED
+    return None
+
+
+def parse_year(text):
+    # DOT 2523 -> 2023 (тиждень 25); (2023) / 2023 р.
+    if not text:
+        return None
+    max_year = datetime.date.today().year + 1
+    match = DOT_RE.search(text)
+    if match:
+        year = 2000 + int(match.group(2))
+        if int(match.group(1)) <= 53 and 2000 < year <= max_year:
+            return year
+    match = YEAR_RE.search(text)
+    if match:
+        year = int(match.group(1) or match.group(2))
+        if 2000 < year <= max_year:
+            return year
+    return None
+
+
+def parse_name(name, brand_name='', width=0, profile=0, diameter=0):
+    """Розбирає назву товару: модель, XL/RunFlat, індекси та готову назву для вітрини."""
+    text = (name or '').replace("Шина", "").replace("шина", "").strip()
+    if brand_name:
+        brand_re = re.escape(brand_name)
+        text = re.sub(f"^{brand_re}", "", text, flags=re.IGNORECASE)
+        text = re.sub(f"\\({brand_re}\\)", "", text, flags=re.IGNORECASE)
+
+    # Рік, DOT і шипи — окремі колонки товару, з моделі й вітринної назви їх прибираємо
+    for token_re in (DOT_RE, YEAR_RE, NOT_STUDDED_RE, STUD_READY_RE, STUDDED_RE):
+        text = token_re.sub(' ', text)
+
+    features = []
+    is_xl = bool(XL_RE.search(text))
+    if is_xl:
+        features.append("XL")
+        text = XL_RE.sub('', text)
+
+    is_runflat = bool(RUNFLAT_RE.search(text))
+    if is_runflat:
+        features.append("RunFlat")
+        text = RUNFLAT_RE.sub('', text)
+
+    # Розмір прибираємо раніше за індекси: "55 ZR" з розміру не стане індексом
+    text = SIZE_RE.sub('', text)
+
+    load_index = speed_index = index_val = ""
+    # Перший збіг із справжнім символом швидкості: "10 EV" у назві моделі — не індекс
+    index_match = next((m for m in INDEX_RE.finditer(text) if is_speed_symbol(m.group(2))), None)
+    if index_match:
+        load_index, speed_index = index_match.group(1), index_match.group(2).upper()
+        index_val = f"{load_index}{speed_index}"
+        text = text.replace(index_match.group(0), "", 1)
+    model_name = EDGE_RE.sub('', text.strip())
+    model_name = SPACES_RE.sub(' ', model_name).strip()
+
+    final_parts = []
+    if model_name: final_parts.append(model_name)
+    if features: final_parts.extend(features)
+    final_parts.append(f"{width}/{profile} R{diameter}")
+    if index_val: final_parts.append(index_val)
+
+    display_name = " ".join(final_parts)
+    return {
+        'display_name': display_name if len(display_name) > 5 else (name or ''),
+        'model_name': model_name,
+        'is_xl': is_xl,
+        'is_runflat': is_runflat,
+        'load_index': load_index,
+        'speed_index': speed_index,
+        'stud_type': parse_stud(name),
+        'year': parse_year(name),
+    }
+
+
+def model_line_key(brand_name, model_name):
+    # "Мішлен" / "MICHELIN", "Alpin-6" / "alpin 6" -> "michelin|alpin6"
+    brand = ''.join(normalize_words(brand_name))
+    model = ''.join(word for word in normalize_words(model_name) if word != brand)
+    return f"{brand}|{model}"[:200]
+
+
+def compose_identity_key(brand_name, model_name, width, profile, diameter,
+                         load_index='', speed_index='', is_xl=False, is_runflat=False):
+    flags = ('xl' if is_xl else '') + ('rf' if is_runflat else '')
+    index = f"{load_index or ''}{speed_index or ''}".lower()
+    return f"{model_line_key(brand_name, model_name)}|{width}-{profile}-{diameter}|{index}|{flags}"
+
+
+def identity_key(brand_name, name, width=0, profile=0, diameter=0):
+    """Ключ ідентичності для рядка прайсу — той самий, що apply_name_attributes пише в товар."""
+    parsed = parse_name(name, brand_name, width, profile, diameter)
+    return compose_identity_key(brand_name, parsed['model_name'], width, profile, diameter,
+                                parsed['load_index'], parsed['speed_index'], parsed['is_xl'], parsed['is_runflat'])
+
+
+def apply_name_attributes(product, brand_name=None):
+    """Записує розібрані атрибути в товар (без save).
+
+    Індекси з прайсу не перетираємо; шипи і рік — лише якщо знайдені в назві.
+    Ключ ідентичності — лише з розібраного з назви (як identity_key() для
+    рядка прайсу), інакше індекс з колонки прайсу розводить ключі.
+    """
+    if brand_name is None:
+        brand_name = product.brand.name if product.brand else ''
+    parsed = parse_name(product.name, brand_name, product.width, product.profile, product.diameter)
+    product.display_name = parsed['display_name'][:255]
+    product.is_xl = parsed['is_xl']
+    product.is_runflat = parsed['is_runflat']
+    if not product.load_index and parsed['load_index']:
+        product.load_index = parsed['load_index']
+    if not product.speed_index and parsed['speed_index']:
+        product.speed_index = parsed['speed_index']
+    if parsed['stud_type']:
+        product.stud_type = parsed['stud_type']
+    if parsed['year']:
+        product.year = parsed['year']
+    product.identity_key = compose_identity_key(
+        brand_name, parsed['model_name'], product.width, product.profile, product.diameter,
+        parsed['load_index'], parsed['speed_index'], parsed['is_xl'], parsed['is_runflat'])
+    return product
+
+
+# Поля, які змінює apply_name_attributes — для bulk_update
+NAME_ATTRIBUTE_FIELDS = ['display_name', 'is_xl', 'is_runflat', 'load_index', 'speed_index', 'stud_type', 'year',
+                         'identity_key']
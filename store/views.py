@@ -1,7 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
-from django.core.paginator import Paginator
 from django.db.models import Case, When, Value, IntegerField, Min, Max, Count, Q
 from django.conf import settings
 from django.http import JsonResponse, Http404, HttpResponse
@@ -20,6 +19,12 @@ import traceback
 logger = logging.getLogger(__name__)
 
 from .cart import Cart
+from .facets import get_facets, facet_context, facet_filter_options
+from .pagination import KeysetPaginator
+from .page_cache import catalog_page_cache
+from .catalog_stats import get_catalog_stats
+from .search import search_products
+from .models import CatalogStats
 from .models import Product, Order, OrderItem, Brand, SiteBanner, AboutImage, Review
 
 # --- ⚙️ КОНФІГУРАЦІЯ ---
@@ -150,6 +155,16 @@ def send_telegram(message):
     except Exception as e:
         logger.error(f"Telegram send error: {e}")
 
+# GET-параметр каталогу -> індексована колонка Product (store/tyre_attributes.py)
+ATTRIBUTE_FILTERS = {
+    'load': 'load_index',
+    'speed': 'speed_index',
+    'stud': 'stud_type',
+    'year': 'year',
+    'xl': 'is_xl',
+    'runflat': 'is_runflat',
+}
+
 def get_base_products():
     return Product.objects.filter(width__gt=0, diameter__gt=0).annotate(
         status_order=Case(
@@ -268,9 +283,13 @@ def get_cross_links(current_season_slug, current_brand, w, p, d):
 
     links = []
     if w and p and d:
+        # Лише сезони, в яких цей розмір реально є (з CatalogStats, без store_product)
+        size_seasons = set(CatalogStats.objects.filter(
+            brand_key=0, width=w, profile=p, diameter=d, total_count__gt=0,
+        ).exclude(seasonality='').values_list('seasonality', flat=True))
         season_items = []
         for slug, info in SEASONS_MAP.items():
-            if slug == 'zymovi':
+            if slug == 'zymovi' or info['db'] not in size_seasons:
                 continue
             if current_season_slug and slug == current_season_slug:
                 continue
@@ -282,9 +301,10 @@ def get_cross_links(current_season_slug, current_brand, w, p, d):
             links.append({'title': 'Цей розмір за сезоном', 'items': season_items})
 
     if w and p and d:
+        facets = get_facets()
         nearby = []
         for diam in [int(d) - 1, int(d) + 1]:
-            if 13 <= diam <= 22:
+            if 13 <= diam <= 22 and facets.has_size(int(w), int(p), diam):
                 nearby.append({
                     'url': f"/catalog/?width={w}&profile={p}&diameter={diam}",
                     'text': f"Шини {w}/{p} R{diam}",
@@ -302,17 +322,14 @@ def home_view(request):
 
     featured_products = Product.objects.filter(stock_quantity__gt=4).exclude(no_local, no_remote).order_by('?')[:8]
 
-    brands = Brand.objects.all().order_by('name')
-    width_list = Product.objects.filter(width__gt=0).values_list('width', flat=True).distinct().order_by('width')
-    profile_list = Product.objects.filter(profile__gt=0).values_list('profile', flat=True).distinct().order_by('profile')
-    diameter_list = Product.objects.filter(diameter__gt=0).values_list('diameter', flat=True).distinct().order_by('diameter')
-    
+    facets = facet_context()
+
     return render(request, 'store/home.html', {
         'featured_products': featured_products,
-        'brands': brands,
-        'all_widths': width_list,
-        'all_profiles': profile_list,
-        'all_diameters': diameter_list,
+        'brands': facets['all_brands'],
+        'all_widths': facets['all_widths'],
+        'all_profiles': facets['all_profiles'],
+        'all_diameters': facets['all_diameters'],
         'all_seasons': Product.SEASON_CHOICES,
     })
 
@@ -324,19 +341,15 @@ def brand_landing_view(request, brand_slug):
     if not brand:
         raise Http404("Бренд не знайдено")
 
-    products = Product.objects.filter(brand=brand, stock_quantity__gt=0).order_by('price')
-    paginator = Paginator(products, 12)
-    page_obj = paginator.get_page(request.GET.get('page'))
-    custom_page_range = page_obj.paginator.get_elided_page_range(page_obj.number, on_each_side=2, on_ends=1)
+    products = Product.objects.filter(brand=brand, stock_quantity__gt=0)
+    page_obj = KeysetPaginator(products, 12, ['price', 'id']).page_from_request(request)
+    custom_page_range = page_obj.page_range
     
     stats = products.aggregate(min_price=Min('price'), max_price=Max('price'))
     seo_data = generate_seo_content(brand, None, None, None, None, int(stats['min_price'] or 0), int(stats['max_price'] or 0))
     faq_list = get_combined_faq(None)
     faq_schema = get_faq_schema_json(faq_list)
-
-    width_list = Product.objects.filter(width__gt=0).values_list('width', flat=True).distinct().order_by('width')
-    profile_list = Product.objects.filter(profile__gt=0).values_list('profile', flat=True).distinct().order_by('profile')
-    diameter_list = Product.objects.filter(diameter__gt=0).values_list('diameter', flat=True).distinct().order_by('diameter')
+    facets = facet_context()
 
     return render(request, 'store/brand_detail.html', {
         'brand': brand,
@@ -348,12 +361,13 @@ def brand_landing_view(request, brand_slug):
         'faq_schema': faq_schema,
         'faq_list': faq_list,
         'cross_links': [],
-        'all_widths': width_list,
-        'all_profiles': profile_list,
-        'all_diameters': diameter_list,
+        'all_widths': facets['all_widths'],
+        'all_profiles': facets['all_profiles'],
+        'all_diameters': facets['all_diameters'],
         'canonical_url': seo_data['canonical_url'],
     })
 
+@catalog_page_cache
 def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width=None, profile=None, diameter=None):
     req_season   = request.GET.get('season')
     req_brand_id = request.GET.get('brand')
@@ -361,12 +375,16 @@ def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width
     req_profile  = profile  or request.GET.get('profile')
     req_diameter = diameter or request.GET.get('diameter')
 
-    if not any([slug, brand_slug, season_slug, width]) and (req_season or req_brand_id or (req_width and req_profile and req_diameter)):
+    # Фільтри за характеристиками — не SEO-комбінації, тож без редиректу на лендінг
+    req_attrs = {key: request.GET.get(key, '').strip() for key in ATTRIBUTE_FILTERS}
+    has_attrs = any(req_attrs.values())
+
+    if not any([slug, brand_slug, season_slug, width]) and not has_attrs and (req_season or req_brand_id or (req_width and req_profile and req_diameter)):
         target_season_slug = DB_TO_SLUG_MAP.get(req_season) if req_season else None
         target_brand_slug = None
         if req_brand_id:
             try:
-                b_obj = Brand.objects.filter(id=int(req_brand_id)).first()
+                b_obj = get_facets().get_brand(brand_id=int(req_brand_id))
                 if b_obj: target_brand_slug = b_obj.slug
             except (ValueError, TypeError): pass
 
@@ -399,6 +417,7 @@ def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width
             if brand_obj: brand_slug = slug
 
     query = request.GET.get('query', '').strip()
+    text_search = False
     if query:
         clean = re.sub(r'[/\sR\-]', '', query, flags=re.IGNORECASE)
         match = re.fullmatch(r'(\d{6,7})', clean)
@@ -406,7 +425,18 @@ def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width
             dg = match.group(1)
             products = products.filter(width=int(dg[:3]), profile=int(dg[3:5]), diameter=int(dg[5:]))
         else:
-            products = products.filter(Q(name__icontains=query) | Q(brand__name__icontains=query))
+            # "michelin 205/55 r16" — розмір фільтром, решта — пошуком
+            size_match = re.search(r'\b(\d{3})\s*/?\s*(\d{2})\s*[RZ]?\s*(\d{2})\b', query, flags=re.IGNORECASE)
+            rest = query
+            if size_match:
+                w, p, d = (int(g) for g in size_match.groups())
+                products = products.filter(width=w, profile=p, diameter=d)
+                rest = (query[:size_match.start()] + ' ' + query[size_match.end():]).strip()
+            if rest:
+                products = search_products(products, rest)
+                text_search = True
+    # Лічильники фільтрів рахуються в межах знайденого запитом
+    query_ids = list(products.filter(stock_quantity__gt=0).values_list('id', flat=True)) if query else None
 
     if brand_slug:
         products = products.filter(brand__slug=brand_slug)
@@ -430,18 +460,34 @@ def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width
             try: products = products.filter(**{attr: int(val)})
             except (ValueError, TypeError): pass
 
-    real_products = products.filter(price__gt=0)
-    if real_products.exists():
-        stats = real_products.aggregate(min_price=Min('price'), max_price=Max('price'))
-        min_price = int(stats['min_price'] or 0)
-        max_price = int(stats['max_price'] or 0)
-    else:
-        min_price = max_price = 0
+    active_attrs = {}
+    for key, value in req_attrs.items():
+        if not value: continue
+        field = ATTRIBUTE_FILTERS[key]
+        if field in ('is_xl', 'is_runflat'):
+            value = True
+        elif field == 'year':
+            try: value = int(value)
+            except ValueError: continue
+        products = products.filter(**{field: value})
+        active_attrs[key] = value
 
     w_int = int(req_width)    if req_width    else None
     p_int = int(req_profile)  if req_profile  else None
     d_int = int(req_diameter) if req_diameter else None
 
+    # Ціни для title/description — з матеріалізованої статистики, а для
+    # вільного пошуку чи неповного розміру — живим агрегатом
+    price_stats = None
+    if not query and not has_attrs and (brand_obj or not (brand_slug or req_brand_id)):
+        price_stats = get_catalog_stats(brand_obj.id if brand_obj else None, season_db, w_int, p_int, d_int)
+    if price_stats is None:
+        price_stats = products.filter(price__gt=0).aggregate(min_price=Min('price'), max_price=Max('price'))
+    else:
+        price_stats = {'min_price': price_stats.min_price, 'max_price': price_stats.max_price}
+    min_price = int(price_stats['min_price'] or 0)
+    max_price = int(price_stats['max_price'] or 0)
+
     seo_data    = generate_seo_content(brand_obj, season_db, w_int, p_int, d_int, min_price, max_price)
     faq_list    = get_combined_faq(season_db)
     faq_schema  = get_faq_schema_json(faq_list)
@@ -449,34 +495,40 @@ def seo_matrix_view(request, slug=None, brand_slug=None, season_slug=None, width
 
     ordering = request.GET.get('ordering')
     if ordering == 'cheap':
-        products = products.filter(stock_quantity__gt=0).order_by('price')
+        products, sort_keys = products.filter(stock_quantity__gt=0), ['price', 'id']
     elif ordering == 'expensive':
-        products = products.filter(stock_quantity__gt=0).order_by('-price')
+        products, sort_keys = products.filter(stock_quantity__gt=0), ['-price', '-id']
+    elif text_search:
+        sort_keys = ['status_order', '-search_rank', '-id']
     else:
-        products = products.order_by('status_order', '-id')
+        sort_keys = ['status_order', '-id']
 
-    brands = Brand.objects.all().order_by('name')
-    paginator = Paginator(products, 12)
-    page_obj = paginator.get_page(request.GET.get('page'))
-    custom_page_range = page_obj.paginator.get_elided_page_range(page_obj.number, on_each_side=2, on_ends=1)
+    page_obj = KeysetPaginator(products, 12, sort_keys).page_from_request(request)
+    custom_page_range = page_obj.page_range
 
     q_params = request.GET.copy()
     q_params.pop('page', None)
+    q_params.pop('cursor', None)
+
+    selected_brand_id = brand_obj.id if brand_obj else (int(req_brand_id) if req_brand_id else None)
+    filter_options = facet_filter_options({
+        'width': w_int, 'profile': p_int, 'diameter': d_int,
+        'season': season_db, 'brand': selected_brand_id, **active_attrs,
+    }, query_ids)
 
     return render(request, 'store/catalog.html', {
         'page_obj': page_obj,
         'custom_page_range': custom_page_range,
         'filter_query_string': q_params.urlencode(),
-        'all_brands': brands,
-        'all_widths': Product.objects.filter(width__gt=0).values_list('width', flat=True).distinct().order_by('width'),
-        'all_profiles': Product.objects.filter(profile__gt=0).values_list('profile', flat=True).distinct().order_by('profile'),
-        'all_diameters': Product.objects.filter(diameter__gt=0).values_list('diameter', flat=True).distinct().order_by('diameter'),
+        **facet_context(),
+        **filter_options,
         'all_seasons': Product.SEASON_CHOICES,
-        'selected_brand_id': brand_obj.id if brand_obj else (int(req_brand_id) if req_brand_id else None),
+        'selected_brand_id': selected_brand_id,
         'selected_season':   season_db,
         'selected_width':    w_int,
         'selected_profile':  p_int,
         'selected_diameter': d_int,
+        'selected_attrs': req_attrs,
         'search_query': query,
         'seo_title':        seo_data['title'],
         'seo_h1':           seo_data['h1'],
@@ -619,10 +671,14 @@ def checkout_view(request):
                 city=raw_city, nova_poshta_branch=raw_branch,
             )
             items_text = ""
+            order_items = []
             for item in cart:
                 p = item['product']
-                OrderItem.objects.create(order=order, product=p, quantity=item['quantity'], price_at_purchase=item['price'])
+                order_items.append(OrderItem(order=order, product=p, quantity=item['quantity'], price_at_purchase=item['price']))
                 items_text += f"\n🔘 {p.brand.name} {p.name} ({p.width}/{p.profile} R{p.diameter}) — {item['quantity']} шт."
+            # Позиції одним INSERT, підсумки замовлення — одним перерахунком
+            OrderItem.objects.bulk_create(order_items)
+            order.recalculate_totals()
 
         delivery_details = "🏃 САМОВИВІЗ (Київ)" if is_pickup else f"🚚 НОВА ПОШТА\n📍 Місто: {raw_city}\n🏢 Відділення: {raw_branch}"
         send_telegram(